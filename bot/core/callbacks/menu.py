@@ -91,6 +91,12 @@ SETTINGS_FAMILY = "family"
 SETTINGS_CREATE_FAMILY = "create_family"
 SETTINGS_JOIN_FAMILY = "join_family"
 SETTINGS_LEAVE_FAMILY = "leave_family"
+SETTINGS_TIMEZONE = "timezone"
+
+
+class TimezoneAction(CallbackData, prefix="tz"):
+    """Callback data для выбора часового пояса."""
+    tz: str
 
 
 class CategoryAction(CallbackData, prefix="cat"):
@@ -1,8 +1,6 @@
 """Обработка текстовых сообщений: расходы, доходы, быстрый ввод."""
 
-import asyncio
 import re
-from decimal import Decimal, InvalidOperation
 
 from aiogram import Router, types, Bot, F
 from aiogram.fsm.context import FSMContext
@@ -14,64 +12,31 @@ from bot.core.callbacks.menu import (
 )
 from bot.core.states.quick_entry_states import QuickEntryStates
 from bot.core.texts import t
+from bot.services.background_tasks import BackgroundTasks
+from bot.services.deletion_scheduler import DeletionScheduler
 from bot.services.fsm_message_tracker import send_temporary, set_fsm_return_to, send_and_track
-from bot.services.group_notification_service import notify_group_about_expense, notify_group_about_income
+from bot.services.group_notification_service import notify_group_about_expenses, notify_group_about_incomes
 from bot.services.message_service import MessageService
 from bot.services.category_prompt_service import prompt_unknown_category
-from project.apps.core.services.user_start_service import UserService
-from project.apps.expenses.services.category_service import CategoryService
+from project.apps.core.models import User
+from project.apps.expenses.services.category_predictor import UserCategoryPredictor
+from project.apps.expenses.services.category_service import CategoryService, IngestedRecord
 from project.apps.expenses.services.expense_parser import ExpenseParser
 from project.apps.expenses.services.expense_service import ExpenseService
 from project.apps.expenses.services.income_parser import IncomeParser
 from project.apps.expenses.services.income_service import IncomeService
+from project.apps.expenses.services.tokenizer import parse_pure_amount
 
 expenses = Router()
 
 CONFIRMATION_DELETE_DELAY = 5
 
-# Регулярка для определения «голого числа» без текста категории
-_PURE_AMOUNT_RE = re.compile(
-    r"^\s*(\d[\d\s.,]*)\s*(?:₽|руб\.?|rub)?\s*$",
-    re.IGNORECASE,
-)
-
 _TYPE_ONLY_WORDS = {
     "доход": QE_TYPE_INCOME,
     "расход": QE_TYPE_EXPENSE,
 }
 
 
-def _parse_pure_amount(text: str) -> Decimal | None:
-    """Пытается распознать сообщение как одиночное число без категории."""
-    match = _PURE_AMOUNT_RE.match(text.strip())
-    if not match:
-        return None
-    raw = match.group(1).replace("\xa0", "").replace(" ", "")
-    # Нормализация десятичного разделителя
-    if "." in raw and "," in raw:
-        last_dot = raw.rfind(".")
-        last_comma = raw.rfind(",")
-        if last_dot > last_comma:
-            raw = raw.replace(",", "")
-        else:
-            raw = raw.replace(".", "").replace(",", ".")
-    elif "," in raw:
-        tail = raw.split(",")[-1]
-        if 1 <= len(tail) <= 2:
-            raw = raw.replace(",", ".")
-        else:
-            raw = raw.replace(",", "")
-    elif "." in raw:
-        tail = raw.split(".")[-1]
-        if len(tail) > 2:
-            raw = raw.replace(".", "")
-    try:
-        amount = Decimal(raw)
-        return amount if amount > 0 else None
-    except InvalidOperation:
-        return None
-
-
 def _is_category_only(text: str) -> bool:
     stripped = (text or "").strip()
     if not stripped or stripped.startswith("/"):
@@ -100,13 +65,12 @@ async def _start_quick_amount_flow(
 
 
 @expenses.message()
-async def save_expense_or_income(message: types.Message, bot: Bot, state: FSMContext):
+async def save_expense_or_income(message: types.Message, bot: Bot, state: FSMContext, user: User):
     tool_box = MessageService(bot)
-    user, _ = await UserService.get_or_create_from_aiogram(message.from_user)
     text = message.text or ""
 
     # ─── Быстрый ввод: голое число → доход/расход → категория ──
-    pure_amount = _parse_pure_amount(text)
+    pure_amount = parse_pure_amount(text)
     if pure_amount is not None:
         await tool_box.cleaner.delete_user_message(message)
 
@@ -166,10 +130,11 @@ async def save_expense_or_income(message: types.Message, bot: Bot, state: FSMCon
 
     # ─── Доход ─────────────────────────────────────────
     if IncomeParser.is_income_message(text):
-        incomes = await IncomeService.create_from_message(user, message)
-        await tool_box.cleaner.delete_user_message(message)
+        ingested = await IncomeService.ingest_message(user, message)
+        incomes = [entry.record for entry in ingested]
 
         if not incomes:
+            await tool_box.cleaner.delete_user_message(message)
             await send_temporary(bot, message.chat.id, t("income.parse_error"))
             return
 
@@ -184,15 +149,12 @@ async def save_expense_or_income(message: types.Message, bot: Bot, state: FSMCon
                 lines.append(f"  • {category_name} — +{income.amount:.0f} ₽")
             confirmation = "\n".join(lines)
 
-        await send_temporary(bot, message.chat.id, confirmation, delay_seconds=CONFIRMATION_DELETE_DELAY)
-
-        for income in incomes:
-            category_name = income.category.name if income.category else "без категории"
-            await notify_group_about_income(bot, user, category_name, f"{income.amount:.0f}")
-
-        for income in incomes:
-            if (income.description or "").strip() != "Без описания":
-                await prompt_unknown_category(bot, message.chat.id, income.description or "")
+        # Записи закоммичены — ответы в Telegram уходят в фоне
+        await BackgroundTasks.submit(_reply_after_save, bot, message, confirmation, ingested, user)
+        await BackgroundTasks.submit(notify_group_about_incomes, bot, user, [
+            (income.category.name if income.category else "без категории", f"{income.amount:.0f}")
+            for income in incomes
+        ])
         return
 
     # ─── Расход ────────────────────────────────────────
@@ -202,10 +164,11 @@ async def save_expense_or_income(message: types.Message, bot: Bot, state: FSMCon
         await send_temporary(bot, message.chat.id, t("expense.parse_error"))
         return
 
-    created_expenses = await ExpenseService.create_from_message(user, message)
-    await tool_box.cleaner.delete_user_message(message)
+    ingested = await ExpenseService.ingest_message(user, message)
+    created_expenses = [entry.record for entry in ingested]
 
     if not created_expenses:
+        await tool_box.cleaner.delete_user_message(message)
         await send_temporary(bot, message.chat.id, t("expense.save_error"))
         return
 
@@ -220,37 +183,50 @@ async def save_expense_or_income(message: types.Message, bot: Bot, state: FSMCon
             lines.append(f"  • {category_name} — {expense.amount:.0f} ₽")
         confirmation = "\n".join(lines)
 
-    await send_temporary(bot, message.chat.id, confirmation, delay_seconds=CONFIRMATION_DELETE_DELAY)
+    await BackgroundTasks.submit(_reply_after_save, bot, message, confirmation, ingested, user)
+    await BackgroundTasks.submit(notify_group_about_expenses, bot, user, [
+        (expense.category.name if expense.category else "без категории", f"{expense.amount:.0f}")
+        for expense in created_expenses
+    ])
 
-    for expense in created_expenses:
-        category_name = expense.category.name if expense.category else "без категории"
-        await notify_group_about_expense(bot, user, category_name, f"{expense.amount:.0f}")
 
-    for amount, category_text in items:
-        await prompt_unknown_category(bot, message.chat.id, category_text)
+async def _reply_after_save(
+    bot: Bot,
+    message: types.Message,
+    confirmation: str,
+    ingested: list[IngestedRecord],
+    user: User,
+) -> None:
+    """Фоновая задача: убрать сообщение пользователя, подтвердить запись
+    и задать по одному вопросу на каждый нераспознанный текст."""
+    await MessageService(bot).cleaner.delete_user_message(message)
+    await send_temporary(bot, message.chat.id, confirmation, delay_seconds=CONFIRMATION_DELETE_DELAY)
+
+    asked = set()
+    for entry in ingested:
+        if entry.category_text not in asked:
+            asked.add(entry.category_text)
+            await prompt_unknown_category(bot, message.chat.id, entry.category_text, entry.match, user.id)
 
 
 # ─── Обработчики кнопок категорий ─────────────────────
 
 @expenses.callback_query(CategoryAction.filter(F.action == CAT_ADD_NEW))
-async def category_add_new(callback: types.CallbackQuery, callback_data: CategoryAction):
+async def category_add_new(callback: types.CallbackQuery, callback_data: CategoryAction, user: User):
     text = callback.message.text or ""
     category_name = _extract_category_name(text)
     if category_name:
         category = await CategoryService.create_category(category_name)
+        UserCategoryPredictor.learn(user.id, category_name, category)
         await callback.message.edit_text(t("category.created", name=category.name))
-        await asyncio.sleep(3)
-        try:
-            await callback.message.delete()
-        except Exception:
-            pass
+        await DeletionScheduler.schedule(callback.message.chat.id, callback.message.message_id, 3)
     else:
         await callback.answer(t("error.category_name_failed"), show_alert=True)
     await callback.answer()
 
 
 @expenses.callback_query(CategoryAction.filter(F.action == CAT_ADD_ALIAS))
-async def category_add_alias(callback: types.CallbackQuery, callback_data: CategoryAction):
+async def category_add_alias(callback: types.CallbackQuery, callback_data: CategoryAction, user: User):
     text = callback.message.text or ""
     alias_name = _extract_category_name(text)
     if alias_name and callback_data.category_id:
@@ -258,12 +234,9 @@ async def category_add_alias(callback: types.CallbackQuery, callback_data: Categ
         category = await Category.objects.filter(id=callback_data.category_id).afirst()
         if category:
             await CategoryService.add_alias(category, alias_name)
+            UserCategoryPredictor.learn(user.id, alias_name, category)
             await callback.message.edit_text(t("category.alias_added", alias=alias_name, category=category.name))
-            await asyncio.sleep(3)
-            try:
-                await callback.message.delete()
-            except Exception:
-                pass
+            await DeletionScheduler.schedule(callback.message.chat.id, callback.message.message_id, 3)
             await callback.answer()
             return
     await callback.answer(t("error.alias_failed"), show_alert=True)
@@ -0,0 +1,69 @@
+"""/export — выгрузка расходов и доходов файлом.
+
+/export — свои записи в CSV; аргументы в любом порядке:
+xlsx — в Excel, family (семья) — записи всех участников своих групп.
+Файл собирается в фоне (LongRunningJobs) во временном файле и
+отправляется документом."""
+
+import os
+import tempfile
+from datetime import date
+
+from aiogram import Router, types, Bot
+from aiogram.filters import Command, CommandObject
+from asgiref.sync import sync_to_async
+from django.db import connection
+
+from bot.core.texts import t
+from bot.services.background_tasks import LongRunningJobs
+from bot.services.message_service import MessageService
+from project.apps.core.models import User
+from project.apps.core.services.family_group_service import FamilyGroupService
+from project.apps.expenses.services.export_service import FORMAT_CSV, FORMAT_XLSX, ExportService
+
+export_router = Router()
+
+_FAMILY_ARGS = {"family", "семья"}
+
+
+@export_router.message(Command("export"))
+async def export_command(message: types.Message, bot: Bot, user: User, command: CommandObject):
+    tool_box = MessageService(bot)
+    await tool_box.cleaner.delete_user_message(message)
+
+    args = {arg.lower() for arg in (command.args or "").split()}
+    export_format = FORMAT_XLSX if FORMAT_XLSX in args else FORMAT_CSV
+    user_ids = [user.id]
+    if args & _FAMILY_ARGS:
+        user_ids = await FamilyGroupService.get_group_member_ids(user) or user_ids
+
+    await message.answer(t("export.started"))
+    LongRunningJobs.spawn(_send_export, bot, message.chat.id, user, user_ids, export_format)
+
+
+def _export_in_thread(path: str, user: User, user_ids: list[int], export_format: str) -> int:
+    try:
+        return ExportService.export_to_file(path, user, user_ids, export_format)
+    finally:
+        # У потока из пула своё соединение с БД — не оставляем его открытым
+        connection.close()
+
+
+async def _send_export(bot: Bot, chat_id: int, user: User, user_ids: list[int], export_format: str) -> None:
+    fd, path = tempfile.mkstemp(suffix=f".{export_format}")
+    os.close(fd)
+    try:
+        # Отдельный поток: выгрузка не занимает общий поток sync_to_async
+        count = await sync_to_async(_export_in_thread, thread_sensitive=False)(
+            path, user, user_ids, export_format,
+        )
+        if not count:
+            await bot.send_message(chat_id, t("export.empty"))
+            return
+        await bot.send_document(
+            chat_id,
+            types.FSInputFile(path, filename=f"export_{date.today():%Y-%m-%d}.{export_format}"),
+            caption=t("export.caption", count=str(count)),
+        )
+    finally:
+        os.unlink(path)
@@ -7,8 +7,7 @@ from bot.core.states.feedback_states import FeedbackStates
 from bot.core.texts import t
 from bot.services.fsm_message_tracker import edit_and_track, send_and_track, cleanup_tracked, set_fsm_return_to
 from bot.services.message_service import MessageService
-from project.apps.core.services.user_start_service import UserService
-from project.apps.core.models import Feedback
+from project.apps.core.models import Feedback, User
 
 
 feedback_router = Router()
@@ -23,7 +22,7 @@ async def feedback_start(callback: types.CallbackQuery, state: FSMContext, bot:
 
 
 @feedback_router.message(FeedbackStates.entering_message)
-async def feedback_save(message: types.Message, state: FSMContext, bot: Bot):
+async def feedback_save(message: types.Message, state: FSMContext, bot: Bot, user: User):
     tool_box = MessageService(bot)
     await tool_box.cleaner.delete_user_message(message)
 
@@ -32,7 +31,6 @@ async def feedback_save(message: types.Message, state: FSMContext, bot: Bot):
         await send_and_track(bot, message.chat.id, state, t("error.empty_feedback"))
         return
 
-    user, _ = await UserService.get_or_create_from_aiogram(message.from_user)
     await Feedback.objects.acreate(user=user, text=text, chat_id=message.chat.id)
 
     await cleanup_tracked(bot, state)
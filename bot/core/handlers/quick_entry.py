@@ -19,6 +19,7 @@ from bot.core.callbacks.menu import (
 )
 from bot.core.states.quick_entry_states import QuickEntryStates
 from bot.core.texts import t
+from bot.services.background_tasks import BackgroundTasks
 from bot.services.fsm_message_tracker import (
     send_and_track, cleanup_tracked, send_temporary,
 )
@@ -26,6 +27,7 @@ from bot.services.group_notification_service import notify_group_about_expense,
 from bot.services.message_service import MessageService
 from bot.services.category_prompt_service import prompt_unknown_category
 from bot.core.keyboards.menu import main_menu_keyboard
+from project.apps.core.models import User
 from project.apps.core.services.user_start_service import UserService
 from project.apps.expenses.services.category_service import CategoryService
 from project.apps.expenses.services.expense_service import ExpenseService
@@ -137,7 +139,7 @@ async def quick_entry_category_picked(callback: types.CallbackQuery, callback_da
 # ─── Ввод категории текстом (на этапе choosing_category) ──
 
 @quick_entry_router.message(QuickEntryStates.choosing_category)
-async def quick_entry_text_category(message: types.Message, state: FSMContext, bot: Bot):
+async def quick_entry_text_category(message: types.Message, state: FSMContext, bot: Bot, user: User):
     """Пользователь вводит категорию текстом вместо нажатия кнопки."""
     tool_box = MessageService(bot)
     await tool_box.cleaner.delete_user_message(message)
@@ -147,12 +149,12 @@ async def quick_entry_text_category(message: types.Message, state: FSMContext, b
         await send_and_track(bot, message.chat.id, state, t("error.empty_name"))
         return
 
-    match_result = await CategoryService.match(category_name)
+    match_result = await CategoryService.match(category_name, user.id)
     category = match_result.category
 
-    await _save_quick_entry_from_message(message, state, bot, category)
+    await _save_quick_entry_from_message(message, state, bot, category, category_name)
     if match_result.fell_back_to_other:
-        await prompt_unknown_category(bot, message.chat.id, category_name)
+        await prompt_unknown_category(bot, message.chat.id, category_name, match_result, user.id)
 
 
 # ─── Сохранение записи ─────────────────────────────────
@@ -172,11 +174,11 @@ async def _save_quick_entry(callback: types.CallbackQuery, state: FSMContext, bo
     if entry_type == QE_TYPE_INCOME:
         await IncomeService.create_quick(user, amount, category, chat_id)
         confirmation = t("income.confirmed_single", category=category.name, amount=f"{amount:.0f}")
-        await notify_group_about_income(bot, user, category.name, f"{amount:.0f}")
+        await BackgroundTasks.submit(notify_group_about_income, bot, user, category.name, f"{amount:.0f}")
     else:
         await ExpenseService.create_quick(user, amount, category, chat_id)
         confirmation = t("expense.confirmed_single", category=category.name, amount=f"{amount:.0f}")
-        await notify_group_about_expense(bot, user, category.name, f"{amount:.0f}")
+        await BackgroundTasks.submit(notify_group_about_expense, bot, user, category.name, f"{amount:.0f}")
 
     try:
         await callback.message.edit_text(confirmation, parse_mode="HTML")
@@ -187,8 +189,15 @@ async def _save_quick_entry(callback: types.CallbackQuery, state: FSMContext, bo
     await callback.answer()
 
 
-async def _save_quick_entry_from_message(message: types.Message, state: FSMContext, bot: Bot, category):
-    """Сохраняет запись из текстового сообщения."""
+async def _save_quick_entry_from_message(
+    message: types.Message,
+    state: FSMContext,
+    bot: Bot,
+    category,
+    category_text: str | None = None,
+):
+    """Сохраняет запись из текстового сообщения; category_text — введённый
+    пользователем текст категории."""
     data = await state.get_data()
     amount = Decimal(data["quick_amount"])
     entry_type = data["entry_type"]
@@ -200,20 +209,20 @@ async def _save_quick_entry_from_message(message: types.Message, state: FSMConte
     await state.clear()
 
     if entry_type == QE_TYPE_INCOME:
-        await IncomeService.create_quick(user, amount, category, chat_id)
+        await IncomeService.create_quick(user, amount, category, chat_id, category_text)
         confirmation = t("income.confirmed_single", category=category.name, amount=f"{amount:.0f}")
-        await notify_group_about_income(bot, user, category.name, f"{amount:.0f}")
+        await BackgroundTasks.submit(notify_group_about_income, bot, user, category.name, f"{amount:.0f}")
     else:
-        await ExpenseService.create_quick(user, amount, category, chat_id)
+        await ExpenseService.create_quick(user, amount, category, chat_id, category_text)
         confirmation = t("expense.confirmed_single", category=category.name, amount=f"{amount:.0f}")
-        await notify_group_about_expense(bot, user, category.name, f"{amount:.0f}")
+        await BackgroundTasks.submit(notify_group_about_expense, bot, user, category.name, f"{amount:.0f}")
 
     await send_temporary(bot, chat_id, confirmation, delay_seconds=5)
     await bot.send_message(chat_id, t("menu.main.title"), reply_markup=main_menu_keyboard())
 
 
 @quick_entry_router.message(QuickEntryStates.entering_amount)
-async def quick_entry_amount_entered(message: types.Message, state: FSMContext, bot: Bot):
+async def quick_entry_amount_entered(message: types.Message, state: FSMContext, bot: Bot, user: User):
     tool_box = MessageService(bot)
     await tool_box.cleaner.delete_user_message(message)
 
@@ -230,11 +239,11 @@ async def quick_entry_amount_entered(message: types.Message, state: FSMContext,
     await state.update_data(quick_amount=formatted_amount)
 
     if category_text and entry_type == QE_TYPE_EXPENSE:
-        match_result = await CategoryService.match(category_text)
+        match_result = await CategoryService.match(category_text, user.id)
         category = match_result.category
-        await _save_quick_entry_from_message(message, state, bot, category)
+        await _save_quick_entry_from_message(message, state, bot, category, category_text)
         if match_result.fell_back_to_other:
-            await prompt_unknown_category(bot, message.chat.id, category_text)
+            await prompt_unknown_category(bot, message.chat.id, category_text, match_result, user.id)
         return
 
     await _prompt_category_selection(
@@ -45,25 +45,30 @@ async def _get_user_id(callback: types.CallbackQuery) -> int:
 
 
 async def _generate_report(user_id: int, report_type: str, date_from: date, date_to: date) -> str:
+    snapshot = await ReportService.get_period_snapshot(
+        user_id,
+        date_from,
+        date_to,
+        include_expenses=report_type != REPORT_INCOME,
+        include_incomes=report_type != REPORT_EXPENSES,
+    )
     if report_type == REPORT_EXPENSES:
-        summary = await ReportService.get_expense_category_summary_by_period(user_id, date_from, date_to)
-        total = await ReportService.get_expense_total_by_period(user_id, date_from, date_to)
-        return ReportService.format_expense_report(summary, total, date_from, date_to)
+        return ReportService.format_expense_report(
+            snapshot.expense_summary, snapshot.expense_total, date_from, date_to,
+        )
     elif report_type == REPORT_INCOME:
-        summary = await ReportService.get_income_category_summary_by_period(user_id, date_from, date_to)
-        total = await ReportService.get_income_total_by_period(user_id, date_from, date_to)
-        return ReportService.format_income_report(summary, total, date_from, date_to)
+        return ReportService.format_income_report(
+            snapshot.income_summary, snapshot.income_total, date_from, date_to,
+        )
     elif report_type == REPORT_CASHFLOW:
-        income_total = await ReportService.get_income_total_by_period(user_id, date_from, date_to)
-        expense_total = await ReportService.get_expense_total_by_period(user_id, date_from, date_to)
-        return ReportService.format_cashflow_report(income_total, expense_total, date_from, date_to)
+        return ReportService.format_cashflow_report(
+            snapshot.income_total, snapshot.expense_total, date_from, date_to,
+        )
     else:
-        expense_summary = await ReportService.get_expense_category_summary_by_period(user_id, date_from, date_to)
-        expense_total = await ReportService.get_expense_total_by_period(user_id, date_from, date_to)
-        income_summary = await ReportService.get_income_category_summary_by_period(user_id, date_from, date_to)
-        income_total = await ReportService.get_income_total_by_period(user_id, date_from, date_to)
         return ReportService.format_full_report(
-            expense_summary, expense_total, income_summary, income_total, date_from, date_to,
+            snapshot.expense_summary, snapshot.expense_total,
+            snapshot.income_summary, snapshot.income_total,
+            date_from, date_to,
         )
 
 
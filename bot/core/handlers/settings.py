@@ -13,10 +13,12 @@ from bot.core.callbacks.menu import (
     SETTINGS_INCOME_SCHEDULE, SETTINGS_VACATION,
     SETTINGS_ADD_SCHEDULE, SETTINGS_ADD_VACATION,
     SETTINGS_FAMILY, SETTINGS_CREATE_FAMILY, SETTINGS_JOIN_FAMILY,
-    SETTINGS_LEAVE_FAMILY, MENU_SETTINGS,
+    SETTINGS_LEAVE_FAMILY, SETTINGS_TIMEZONE, MENU_SETTINGS, TimezoneAction,
 )
 from bot.core.keyboards.calendar import build_calendar_keyboard
-from bot.core.keyboards.menu import back_to_parent_keyboard, settings_menu_keyboard
+from bot.core.keyboards.menu import (
+    TIMEZONE_CHOICES, back_to_parent_keyboard, settings_menu_keyboard, timezone_keyboard,
+)
 from bot.core.states.settings_states import (
     ScheduleStates, VacationStates, FamilyCreateStates, FamilyJoinStates,
 )
@@ -26,6 +28,7 @@ from bot.services.fsm_message_tracker import (
 )
 from bot.services.message_service import MessageService
 from bot.services.date_parser import parse_user_date
+from project.apps.core.models import User
 from project.apps.core.services.user_start_service import UserService
 from project.apps.core.services.family_group_service import FamilyGroupService
 from project.apps.expenses.models import IncomeSchedule, VacationPeriod
@@ -566,3 +569,33 @@ async def family_leave(callback: types.CallbackQuery, bot: Bot):
         await family_info(callback, SettingsAction(action=SETTINGS_FAMILY))
     else:
         await callback.answer(t("family.leave.admin_error"), show_alert=True)
+
+
+# ═══════════════════════════════════════════════════════════
+# Часовой пояс
+# ═══════════════════════════════════════════════════════════
+
+@settings_router.callback_query(SettingsAction.filter(F.action == SETTINGS_TIMEZONE))
+async def timezone_menu(callback: types.CallbackQuery, callback_data: SettingsAction, user: User):
+    labels = dict(TIMEZONE_CHOICES)
+    await callback.message.edit_text(
+        t("timezone.prompt", current=labels.get(user.timezone, user.timezone)),
+        reply_markup=timezone_keyboard(user.timezone),
+        parse_mode="HTML",
+    )
+    await callback.answer()
+
+
+@settings_router.callback_query(TimezoneAction.filter())
+async def timezone_select(callback: types.CallbackQuery, callback_data: TimezoneAction, user: User):
+    labels = dict(TIMEZONE_CHOICES)
+    if callback_data.tz not in labels:
+        await callback.answer()
+        return
+    await UserService.set_timezone(user, callback_data.tz)
+    await callback.message.edit_text(
+        t("timezone.saved", label=labels[callback_data.tz]),
+        reply_markup=settings_menu_keyboard(),
+        parse_mode="HTML",
+    )
+    await callback.answer()
@@ -0,0 +1,101 @@
+"""Импорт банковской выписки: пользователь присылает CSV-файл документом
+в личном чате с ботом (в группах документы не трогаем — файл, присланный
+участнику семьи, не должен попасть в записи отправителя).
+
+Файл скачивается во временный файл, импорт идёт в фоне (LongRunningJobs)
+в отдельном потоке (StatementImporter), прогресс — правкой одного
+сообщения не чаще раза в _PROGRESS_INTERVAL_SECONDS."""
+
+import logging
+import os
+import tempfile
+import time
+
+from aiogram import F, Router, types, Bot
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connection
+
+from bot.core.texts import t
+from bot.services.background_tasks import LongRunningJobs
+from bot.services.message_service import MessageService
+from project.apps.core.models import User
+from project.apps.expenses.services.statement_import import (
+    ImportResult,
+    StatementFormatError,
+    StatementImporter,
+)
+
+logger = logging.getLogger(__name__)
+
+statement_import_router = Router()
+
+# Ограничение Bot API на скачивание файлов
+_MAX_FILE_SIZE = 20 * 1024 * 1024
+_PROGRESS_INTERVAL_SECONDS = 3.0
+
+
+@statement_import_router.message(F.document, F.chat.type == "private")
+async def statement_document(message: types.Message, bot: Bot, user: User):
+    document = message.document
+    if not (document.file_name or "").lower().endswith(".csv"):
+        await message.answer(t("statement.not_csv"))
+        return
+    if document.file_size and document.file_size > _MAX_FILE_SIZE:
+        await message.answer(t("statement.too_large"))
+        return
+
+    progress_message = await message.answer(t("statement.started"))
+    LongRunningJobs.spawn(_import_statement, bot, document.file_id, user, progress_message)
+
+
+def _import_in_thread(path: str, user: User, chat_id: int, updater, progress_message: types.Message) -> ImportResult:
+    last_update = time.monotonic()
+
+    def progress(rows: int, done: float) -> None:
+        nonlocal last_update
+        if time.monotonic() - last_update < _PROGRESS_INTERVAL_SECONDS:
+            return
+        last_update = time.monotonic()
+        async_to_sync(updater.update_bot_message)(
+            progress_message,
+            t("statement.progress", rows=str(rows), percent=str(int(done * 100))),
+        )
+
+    try:
+        return StatementImporter(user, chat_id=chat_id, progress=progress).run(path)
+    finally:
+        # У потока из пула своё соединение с БД — не оставляем его открытым
+        connection.close()
+
+
+async def _import_statement(bot: Bot, file_id: str, user: User, progress_message: types.Message) -> None:
+    updater = MessageService(bot).updater
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        await bot.download(file_id, destination=path)
+        result = await sync_to_async(_import_in_thread, thread_sensitive=False)(
+            path, user, progress_message.chat.id, updater, progress_message,
+        )
+    except StatementFormatError:
+        await updater.update_bot_message(progress_message, t("statement.bad_format"))
+        return
+    except Exception:
+        # Уже закоммиченные пачки остаются: повторный импорт файла их пропустит
+        logger.exception("Statement import failed for user %s", user.id)
+        await updater.update_bot_message(progress_message, t("statement.failed"))
+        return
+    finally:
+        os.unlink(path)
+
+    await updater.update_bot_message(
+        progress_message,
+        t(
+            "statement.done",
+            expenses=str(result.expenses),
+            incomes=str(result.incomes),
+            duplicates=str(result.duplicates),
+            skipped=str(result.skipped),
+        ),
+        parse_mode="HTML",
+    )
@@ -42,6 +42,8 @@ from bot.core.callbacks.menu import (
     SETTINGS_CREATE_FAMILY,
     SETTINGS_JOIN_FAMILY,
     SETTINGS_CATEGORIES,
+    SETTINGS_TIMEZONE,
+    TimezoneAction,
 )
 from bot.core.texts import t
 
@@ -146,11 +148,43 @@ def settings_menu_keyboard() -> InlineKeyboardMarkup:
             InlineKeyboardButton(text=t("btn.settings_join_family"), callback_data=SettingsAction(action=SETTINGS_JOIN_FAMILY).pack()),
         ],
         [InlineKeyboardButton(text=t("btn.settings_categories"), callback_data=SettingsAction(action=SETTINGS_CATEGORIES).pack())],
+        [InlineKeyboardButton(text=t("btn.settings_timezone"), callback_data=SettingsAction(action=SETTINGS_TIMEZONE).pack())],
         _back_button(MenuAction(action=MENU_BACK).pack()),
         _hint_row("settings"),
     ])
 
 
+# Часовые пояса России (IANA-имя, подпись на кнопке)
+TIMEZONE_CHOICES = (
+    ("Europe/Kaliningrad", "Калининград (UTC+2)"),
+    ("Europe/Moscow", "Москва (UTC+3)"),
+    ("Europe/Samara", "Самара (UTC+4)"),
+    ("Asia/Yekaterinburg", "Екатеринбург (UTC+5)"),
+    ("Asia/Omsk", "Омск (UTC+6)"),
+    ("Asia/Novosibirsk", "Новосибирск (UTC+7)"),
+    ("Asia/Krasnoyarsk", "Красноярск (UTC+7)"),
+    ("Asia/Irkutsk", "Иркутск (UTC+8)"),
+    ("Asia/Yakutsk", "Якутск (UTC+9)"),
+    ("Asia/Vladivostok", "Владивосток (UTC+10)"),
+    ("Asia/Magadan", "Магадан (UTC+11)"),
+    ("Asia/Kamchatka", "Камчатка (UTC+12)"),
+)
+
+
+def timezone_keyboard(current: str) -> InlineKeyboardMarkup:
+    rows = []
+    for index in range(0, len(TIMEZONE_CHOICES), 2):
+        rows.append([
+            InlineKeyboardButton(
+                text=f"✅ {label}" if tz == current else label,
+                callback_data=TimezoneAction(tz=tz).pack(),
+            )
+            for tz, label in TIMEZONE_CHOICES[index:index + 2]
+        ])
+    rows.append(_back_button(MenuAction(action=MENU_SETTINGS).pack()))
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
 def back_to_parent_keyboard(parent_action_callback: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
         _back_button(parent_action_callback),
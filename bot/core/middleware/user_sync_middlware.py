@@ -1,9 +1,14 @@
 from aiogram import BaseMiddleware
+
 from project.apps.core.services.user_start_service import UserService
 
 
 class UserSyncMiddleware(BaseMiddleware):
+    """Один раз за апдейт получает пользователя (из кеша UserService)
+    и передаёт его хэндлерам как `user` и `user_created`."""
+
     async def __call__(self, handler, event, data):
-        if hasattr(event, "from_user"):
-            await UserService.get_or_create_from_aiogram(event.from_user)
+        tg_user = data.get("event_from_user")
+        if tg_user is not None:
+            data["user"], data["user_created"] = await UserService.get_or_create_from_aiogram(tg_user)
         return await handler(event, data)
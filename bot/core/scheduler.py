@@ -1,97 +1,227 @@
+"""Планировщик периодических задач бота.
+
+Состояние задач и журнал запусков хранятся в БД (JobSchedulerService),
+поэтому рестарт не пропускает и не дублирует запуск, а при нескольких
+репликах каждый слот выполняется один раз.
+
+Новая задача добавляется декоратором:
+
+    @register_job(JobSpec("name", Every(3600)))
+    async def my_job(bot: Bot, run: ClaimedRun) -> dict:
+        ...
+        return {"processed": n}   # попадёт в JobRun.stats
+
+Если часть элементов не обработана из-за временной ошибки, задача снимает
+с них отметку (JobSchedulerService.release_deliveries) и бросает RetryRun:
+запуск остаётся в running и через stale_after перезапускается.
+"""
+
 import asyncio
 import logging
-from datetime import datetime, time
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Awaitable, Callable
 
 from aiogram import Bot
-
+from django.utils import timezone
+
+from project.apps.core.models import JobRun
+from project.apps.core.services.job_scheduler_service import (
+    ClaimedRun,
+    DailyAt,
+    Every,
+    JobSchedulerService,
+    JobSpec,
+)
 from project.apps.expenses.services.reminder_service import ReminderService
 
 logger = logging.getLogger(__name__)
 
-# Время ежедневной проверки напоминаний (UTC)
-REMINDER_CHECK_HOUR = 7
-REMINDER_CHECK_MINUTE = 0
+# Как часто реплика проверяет, не пора ли запустить задачи
+SCHEDULER_TICK_SECONDS = 30
 
+# Как часто проверяются часовые пояса, в которых наступило локальное 07:00.
+# Рассылка идёт волнами по часовым поясам, а не одним пиком.
+REMINDER_INTERVAL_SECONDS = 10 * 60
 
-async def run_daily_reminders(bot: Bot):
-    """Фоновая задача: ежедневно проверяет расписания доходов
-    и плановые траты, отправляет напоминания пользователям.
+# Насколько далеко назад догонять окна после простоя бота
+REMINDER_MAX_CATCH_UP = timedelta(hours=6)
 
-    Запускается при старте бота и работает бесконечно."""
-    logger.info("Reminder scheduler started")
+# Одновременных отправок дайджестов (темп всё равно ограничивает SendQueue)
+REMINDER_WORKERS = 20
+
+# Сколько пользователей отмечается в журнале доставок за один запрос
+REMINDER_CLAIM_BATCH = 100
+
+class RetryRun(Exception):
+    """Задача обработала не все элементы: запуск нужно повторить."""
+
+    def __init__(self, stats: dict):
+        super().__init__(stats)
+        self.stats = stats
+
+
+JobHandler = Callable[[Bot, ClaimedRun], Awaitable[dict | None]]
+
+
+@dataclass(frozen=True)
+class _RegisteredJob:
+    spec: JobSpec
+    handler: JobHandler
 
-    while True:
-        try:
-            now = datetime.utcnow()
-            target_time = datetime.combine(now.date(), time(REMINDER_CHECK_HOUR, REMINDER_CHECK_MINUTE))
 
-            if now >= target_time:
-                # Уже прошло время — ждём до завтра
-                from datetime import timedelta
-                target_time += timedelta(days=1)
+_JOBS: dict[str, _RegisteredJob] = {}
 
-            wait_seconds = (target_time - now).total_seconds()
-            logger.info(f"Next reminder check in {wait_seconds:.0f}s at {target_time}")
-            await asyncio.sleep(wait_seconds)
 
-            await _send_reminders(bot)
+def register_job(spec: JobSpec) -> Callable[[JobHandler], JobHandler]:
+    def decorator(handler: JobHandler) -> JobHandler:
+        _JOBS[spec.name] = _RegisteredJob(spec, handler)
+        return handler
+    return decorator
+
+
+async def run_scheduler(bot: Bot):
+    """Фоновая задача: раз в тик забирает и выполняет задачи, которые пора запустить.
+
+    Запускается при старте бота и работает бесконечно."""
+    logger.info("Job scheduler started: %s", ", ".join(_JOBS))
+    running: set[asyncio.Task] = set()
+
+    while True:
+        try:
+            claimed = await JobSchedulerService.claim_due_runs([job.spec for job in _JOBS.values()])
+            for run in claimed:
+                task = asyncio.create_task(_execute(bot, run))
+                running.add(task)
+                task.add_done_callback(running.discard)
+            await asyncio.sleep(SCHEDULER_TICK_SECONDS)
 
         except asyncio.CancelledError:
-            logger.info("Reminder scheduler cancelled")
+            for task in running:
+                task.cancel()
+            logger.info("Job scheduler cancelled")
             break
         except Exception:
-            logger.exception("Error in reminder scheduler")
+            logger.exception("Error in job scheduler")
             # Ждём 60 секунд перед повторной попыткой
             await asyncio.sleep(60)
 
 
-async def _send_reminders(bot: Bot):
-    """Проверяет и отправляет все напоминания на сегодня."""
-    # Напоминания о доходах
-    income_schedules = await ReminderService.get_todays_income_reminders()
-    for schedule in income_schedules:
-        try:
-            text = ReminderService.format_income_reminder(schedule)
-            await bot.send_message(
-                chat_id=schedule.user.tg_id,
-                text=text,
-            )
-            logger.info(f"Sent income reminder to user {schedule.user.tg_id}: {schedule.name}")
-        except Exception:
-            logger.exception(f"Failed to send income reminder to {schedule.user.tg_id}")
-
-    # Напоминания о плановых тратах
-    planned_expenses = await ReminderService.get_todays_planned_expense_reminders()
-    for planned in planned_expenses:
-        try:
-            text = ReminderService.format_planned_expense_reminder(planned)
-            await bot.send_message(
-                chat_id=planned.user.tg_id,
-                text=text,
-            )
-            logger.info(f"Sent planned expense reminder to user {planned.user.tg_id}: {planned.description}")
-        except Exception:
-            logger.exception(f"Failed to send planned reminder to {planned.user.tg_id}")
-
-    # Предстоящие плановые траты (за 3 дня)
-    upcoming = await ReminderService.get_upcoming_planned_expenses(days_ahead=3)
-    for planned in upcoming:
-        # Не дублируем те, что на сегодня — они уже обработаны выше
-        from datetime import date
-        if planned.planned_date == date.today():
-            continue
-        try:
-            days_left = (planned.planned_date - date.today()).days
-            text = (
-                f"📅 Через {days_left} дн.: <b>{planned.description}</b> "
-                f"— {planned.amount:.0f} ₽"
-            )
-            await bot.send_message(
-                chat_id=planned.user.tg_id,
-                text=text,
-            )
-        except Exception:
-            logger.exception(f"Failed to send upcoming reminder to {planned.user.tg_id}")
-
-    total = len(income_schedules) + len(planned_expenses) + len(upcoming)
-    logger.info(f"Daily reminders sent: {total} total")
+async def _execute(bot: Bot, run: ClaimedRun) -> None:
+    job = _JOBS[run.job_name]
+    logger.info(f"Job {run.job_name} started for slot {run.scheduled_for} (attempt {run.attempt})")
+    try:
+        stats = await job.handler(bot, run)
+    except asyncio.CancelledError:
+        # Остаётся в running — после stale_after другая реплика его подхватит
+        raise
+    except RetryRun as retry:
+        # Тоже остаётся в running: повтор через stale_after
+        logger.warning(f"Job {run.job_name} will be retried (attempt {run.attempt}): {retry.stats}")
+        return
+    except Exception:
+        logger.exception(f"Job {run.job_name} failed")
+        await JobSchedulerService.finish_run(run.run_id, JobRun.STATUS_FAILED)
+        return
+    await JobSchedulerService.finish_run(run.run_id, JobRun.STATUS_SUCCESS, stats)
+
+
+# ─── Задачи ───────────────────────────────────────────────
+
+
+@register_job(JobSpec("reminders", Every(REMINDER_INTERVAL_SECONDS), max_lateness=REMINDER_MAX_CATCH_UP))
+async def send_daily_reminders(bot: Bot, run: ClaimedRun) -> dict:
+    """Отправляет дайджест напоминаний пользователям, у которых с прошлого
+    запуска наступило локальное 07:00 (ReminderService.due_timezones).
+
+    Перед отправкой пользователь отмечается в журнале доставок задачи с
+    ключом «пользователь + локальная дата», поэтому ни повтор слота, ни
+    пересечение окон не шлют дайджест повторно. Дайджесты раздаются пулу
+    из REMINDER_WORKERS воркеров; темп отправки ограничивает очередь
+    исходящих запросов бота (SendQueue). С неотправленных дайджестов
+    отметка снимается, а запуск повторяется (RetryRun)."""
+    started_at = time.monotonic()
+    now = timezone.now()
+    window_start = max(
+        run.previous_run_at or now - timedelta(seconds=REMINDER_INTERVAL_SECONDS),
+        now - REMINDER_MAX_CATCH_UP,
+    )
+    # Перекрытие на один интервал — дубли отсекает журнал доставок
+    window_start -= timedelta(seconds=REMINDER_INTERVAL_SECONDS)
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=REMINDER_CLAIM_BATCH)
+    stats = {"digests": 0, "sent": 0, "failed": 0, "already_sent": 0}
+    failed_keys = []
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            key, digest = item
+            try:
+                await bot.send_message(chat_id=digest.tg_id, text=digest.text)
+                stats["sent"] += 1
+            except Exception:
+                stats["failed"] += 1
+                failed_keys.append(key)
+                logger.exception(f"Failed to send reminder digest to {digest.tg_id}")
+
+    async def enqueue(batch: list) -> None:
+        keys = {f"user:{digest.tg_id}:{digest.day.isoformat()}": digest for digest in batch}
+        claimed_keys = await JobSchedulerService.claim_deliveries(run, list(keys))
+        for key, digest in keys.items():
+            if key in claimed_keys:
+                await queue.put((key, digest))
+            else:
+                stats["already_sent"] += 1
+
+    # Дайджесты приходят потоком: пачка отмечается в журнале и уходит
+    # воркерам, пока следующая читается из БД; очередь ограничена, так что
+    # в памяти не больше пары пачек, сколько бы ни было расписаний.
+    workers = [asyncio.create_task(worker()) for _ in range(REMINDER_WORKERS)]
+    try:
+        batch = []
+        for local_day, timezones in (await ReminderService.due_timezones(window_start, now)).items():
+            async for digest in ReminderService.iter_daily_digests(local_day, timezones, days_ahead=3):
+                stats["digests"] += 1
+                batch.append(digest)
+                if len(batch) >= REMINDER_CLAIM_BATCH:
+                    await enqueue(batch)
+                    batch = []
+        if batch:
+            await enqueue(batch)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+
+    elapsed = time.monotonic() - started_at
+    throughput = stats["sent"] / elapsed if elapsed else 0
+    logger.info(
+        f"Daily reminders: {stats['digests']} digests, sent {stats['sent']}, "
+        f"failed {stats['failed']}, already sent {stats['already_sent']} "
+        f"in {elapsed:.1f}s ({throughput:.1f} msg/s)"
+    )
+    stats = {**stats, "elapsed": round(elapsed, 3)}
+    if failed_keys:
+        await JobSchedulerService.release_deliveries(run, failed_keys)
+        raise RetryRun(stats)
+    return stats
+
+
+@register_job(JobSpec("fsm_sweep", Every(60 * 60)))
+async def sweep_fsm_records(bot: Bot, run: ClaimedRun) -> dict:
+    """Удаляет заброшенные FSM-сценарии (DatabaseStorage)."""
+    from bot.core.storage.database_storage import DatabaseStorage
+
+    return {"deleted": await DatabaseStorage.sweep()}
+
+
+@register_job(JobSpec("job_history_prune", DailyAt(3, 0)))
+async def prune_job_history(bot: Bot, run: ClaimedRun) -> dict:
+    """Удаляет старые записи журнала запусков и доставок."""
+    return {"deleted": await JobSchedulerService.prune_history(keep=timedelta(days=30))}
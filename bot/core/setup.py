@@ -4,6 +4,7 @@ from bot.core.handlers.budget import budget_router
 from bot.core.handlers.cancel import cancel_router
 from bot.core.handlers.categories import categories_router
 from bot.core.handlers.expenses import expenses
+from bot.core.handlers.export import export_router
 from bot.core.handlers.goals import goals_router
 from bot.core.handlers.hints import hints_router
 from bot.core.handlers.feedback import feedback_router
@@ -13,11 +14,16 @@ from bot.core.handlers.quick_entry import quick_entry_router
 from bot.core.handlers.recalculate import admin_router
 from bot.core.handlers.reports import reports_router
 from bot.core.handlers.settings import settings_router
+from bot.core.handlers.statement_import import statement_import_router
 from bot.core.handlers.start import start
+from bot.core.middleware.user_sync_middlware import UserSyncMiddleware
 
 
 def setup_handlers(dp: Dispatcher):
-    """Регистрирует все роутеры.
+    """Регистрирует middleware и все роутеры.
+
+    UserSyncMiddleware кладёт пользователя в data (`user`, `user_created`)
+    для любого апдейта с отправителем.
 
     Порядок важен:
     1. cancel_router — перехватывает «Отмена» FSM раньше остальных.
@@ -25,6 +31,7 @@ def setup_handlers(dp: Dispatcher):
     3. quick_entry_router — FSM быстрого ввода (callback + text в FSM-состоянии).
     4. categories_router — CRUD категорий (callback + FSM).
     5. Команды и callback-обработчики идут ДО catch-all expenses."""
+    dp.update.outer_middleware(UserSyncMiddleware())
     dp.include_routers(
         cancel_router,          # ❌ Отмена FSM (callback + /cancel)
         hints_router,           # ❓ Подсказки (callback)
@@ -34,6 +41,8 @@ def setup_handlers(dp: Dispatcher):
         feedback_router,        # ✉️ Обратная связь (callback + FSM)
         menu_router,            # /menu + навигация по inline-кнопкам
         admin_router,           # /recalculate
+        export_router,          # /export
+        statement_import_router,  # CSV-выписка документом
         reports_router,         # Отчёты (callback + calendar FSM)
         budget_router,          # Бюджет (callback + FSM)
         goals_router,           # Цели (callback + FSM)
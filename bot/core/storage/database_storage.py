@@ -0,0 +1,192 @@
+"""FSM-хранилище aiogram поверх PostgreSQL (модель FsmRecord).
+
+Стратегия:
+1. Во время обработки апдейта DatabaseEventIsolation (хук events_isolation
+   диспетчера, внутри которого aiogram читает raw_state и вызывает хэндлер)
+   открывает «единицу работы» (contextvar). Все set_state/set_data/update_data внутри хэндлера
+   пишутся в неё, чтения сначала смотрят туда же — БД читается не более
+   одного раза на ключ за апдейт.
+2. После хэндлера изменения сбрасываются одним upsert (INSERT ... ON CONFLICT)
+   на все изменённые ключи; пустые записи (state=None, data={}) удаляются.
+3. Вне апдейта (фоновые задачи) операции пишутся в БД сразу.
+4. Задача планировщика fsm_sweep периодически удаляет записи,
+   не обновлявшиеся дольше TTL.
+"""
+
+import contextvars
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, AsyncGenerator, Mapping
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import (
+    BaseEventIsolation,
+    BaseStorage,
+    DefaultKeyBuilder,
+    KeyBuilder,
+    StateType,
+    StorageKey,
+)
+from django.utils import timezone
+
+from project.apps.core.models import FsmRecord
+
+logger = logging.getLogger(__name__)
+
+FSM_TTL = timedelta(days=2)
+
+_MISSING = object()
+
+
+@dataclass
+class _Entry:
+    state: str | None = None
+    data: dict[str, Any] = field(default_factory=dict)
+    dirty: bool = False
+
+
+@dataclass
+class _UnitOfWork:
+    entries: dict[str, _Entry] = field(default_factory=dict)
+    closed: bool = False
+
+
+_current_unit: contextvars.ContextVar[_UnitOfWork | None] = contextvars.ContextVar(
+    "fsm_unit_of_work",
+    default=None,
+)
+
+
+class DatabaseStorage(BaseStorage):
+    """Персистентное FSM-хранилище для нескольких реплик бота."""
+
+    def __init__(self, key_builder: KeyBuilder | None = None) -> None:
+        self.key_builder = key_builder or DefaultKeyBuilder(with_bot_id=True)
+
+    # ─── Единица работы ────────────────────────────────────────
+
+    @staticmethod
+    def begin() -> contextvars.Token:
+        return _current_unit.set(_UnitOfWork())
+
+    async def commit(self, token: contextvars.Token) -> None:
+        """Сбрасывает накопленные изменения и закрывает единицу работы."""
+        unit = _current_unit.get()
+        _current_unit.reset(token)
+        if unit is None:
+            return
+        unit.closed = True
+        dirty = {key: entry for key, entry in unit.entries.items() if entry.dirty}
+        if dirty:
+            await self._write(dirty)
+
+    # ─── BaseStorage ───────────────────────────────────────────
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        entry = await self._entry(key)
+        entry.state = state.state if isinstance(state, State) else state
+        await self._touch(key, entry)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        return (await self._entry(key)).state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        entry = await self._entry(key)
+        entry.data = dict(data)
+        await self._touch(key, entry)
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        return dict((await self._entry(key)).data)
+
+    async def update_data(self, key: StorageKey, data: Mapping[str, Any]) -> dict[str, Any]:
+        entry = await self._entry(key)
+        entry.data.update(data)
+        await self._touch(key, entry)
+        return dict(entry.data)
+
+    async def close(self) -> None:
+        pass
+
+    # ─── Очистка ───────────────────────────────────────────────
+
+    @staticmethod
+    async def sweep(ttl: timedelta = FSM_TTL) -> int:
+        """Удаляет заброшенные сценарии. Возвращает число удалённых записей."""
+        deleted, _ = await FsmRecord.objects.filter(updated_at__lt=timezone.now() - ttl).adelete()
+        return deleted
+
+    # ─── Внутреннее ────────────────────────────────────────────
+
+    async def _entry(self, key: StorageKey) -> _Entry:
+        record_key = self.key_builder.build(key)
+        unit = _current_unit.get()
+        if unit is not None and not unit.closed:
+            entry = unit.entries.get(record_key, _MISSING)
+            if entry is _MISSING:
+                entry = await self._read(record_key)
+                unit.entries[record_key] = entry
+            return entry
+        return await self._read(record_key)
+
+    async def _touch(self, key: StorageKey, entry: _Entry) -> None:
+        unit = _current_unit.get()
+        if unit is not None and not unit.closed:
+            entry.dirty = True
+            return
+        await self._write({self.key_builder.build(key): entry})
+
+    @staticmethod
+    async def _read(record_key: str) -> _Entry:
+        record = await FsmRecord.objects.filter(key=record_key).values("state", "data").afirst()
+        if record is None:
+            return _Entry()
+        return _Entry(state=record["state"], data=record["data"] or {})
+
+    @staticmethod
+    async def _write(entries: dict[str, _Entry]) -> None:
+        now = timezone.now()
+        to_upsert = [
+            FsmRecord(key=key, state=entry.state, data=entry.data, updated_at=now)
+            for key, entry in entries.items()
+            if entry.state is not None or entry.data
+        ]
+        to_delete = [
+            key for key, entry in entries.items()
+            if entry.state is None and not entry.data
+        ]
+
+        if to_upsert:
+            await FsmRecord.objects.abulk_create(
+                to_upsert,
+                update_conflicts=True,
+                unique_fields=["key"],
+                update_fields=["state", "data", "updated_at"],
+            )
+        if to_delete:
+            await FsmRecord.objects.filter(key__in=to_delete).adelete()
+
+        for entry in entries.values():
+            entry.dirty = False
+
+
+class DatabaseEventIsolation(BaseEventIsolation):
+    """Открывает единицу работы DatabaseStorage на время обработки апдейта
+    и сбрасывает её в БД после хэндлера. Блокировок не берёт — как и
+    DisabledEventIsolation по умолчанию."""
+
+    def __init__(self, storage: DatabaseStorage) -> None:
+        self.storage = storage
+
+    @asynccontextmanager
+    async def lock(self, key: StorageKey) -> AsyncGenerator[None, None]:
+        token = self.storage.begin()
+        try:
+            yield
+        finally:
+            await self.storage.commit(token)
+
+    async def close(self) -> None:
+        pass
+
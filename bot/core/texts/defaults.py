@@ -92,6 +92,7 @@ DEFAULTS: dict[str, str] = {
     "btn.settings_family": "👨‍👩‍👧‍👦 Семья/Группа",
     "btn.settings_create_family": "➕ Создать группу",
     "btn.settings_join_family": "🔗 Присоединиться",
+    "btn.settings_timezone": "🕖 Часовой пояс",
 
     # ═══════════════════════════════════════════════════════
     # Бюджет — сообщения
@@ -313,6 +314,17 @@ DEFAULTS: dict[str, str] = {
         "Сначала назначьте другого администратора."
     ),
 
+    # ═══════════════════════════════════════════════════════
+    # Настройки — часовой пояс
+    # ═══════════════════════════════════════════════════════
+
+    "timezone.prompt": (
+        "🕖 <b>Часовой пояс</b>\n\n"
+        "Сейчас: <b>{current}</b>\n\n"
+        "Напоминания приходят в 07:00 по вашему времени."
+    ),
+    "timezone.saved": "✅ Часовой пояс: <b>{label}</b>",
+
     # ═══════════════════════════════════════════════════════
     # Расходы / Доходы
     # ═══════════════════════════════════════════════════════
@@ -343,6 +355,8 @@ DEFAULTS: dict[str, str] = {
         "👥 <b>{author}</b> записал доход:\n"
         "💰 {category} — +{amount} ₽"
     ),
+    "notification.group_expense_multi": "👥 <b>{author}</b> записал {count} расход(ов):",
+    "notification.group_income_multi": "👥 <b>{author}</b> записал {count} доход(ов):",
 
     # ═══════════════════════════════════════════════════════
     # Отмена / Общие
@@ -381,6 +395,25 @@ DEFAULTS: dict[str, str] = {
     ),
     "btn.report_confirm": "✅ Подтвердить",
     "btn.report_change": "🔄 Выбрать заново",
+    "export.started": "⏳ Готовлю выгрузку, пришлю файлом.",
+    "export.empty": "📭 Выгружать пока нечего: записей нет.",
+    "export.caption": "📤 Выгрузка: {count} записей",
+    "statement.not_csv": "📎 Импортирую выписки в формате CSV — выгрузите её из банка в CSV и пришлите файлом.",
+    "statement.too_large": "📎 Файл больше 20 МБ — Telegram не даёт боту скачать его. Разбейте выписку на части.",
+    "statement.started": "⏳ Импортирую выписку…",
+    "statement.progress": "⏳ Импортирую выписку: {rows} строк, {percent}%",
+    "statement.done": (
+        "✅ <b>Выписка импортирована</b>\n\n"
+        "Расходов: <b>{expenses}</b>\n"
+        "Доходов: <b>{incomes}</b>\n"
+        "Уже были загружены: {duplicates}\n"
+        "Пропущено строк: {skipped}"
+    ),
+    "statement.bad_format": "⚠️ Не нашёл в файле колонки даты и суммы. Нужна выписка в CSV с заголовком.",
+    "statement.failed": (
+        "⚠️ Импорт прервался с ошибкой. Часть операций могла сохраниться — "
+        "пришлите файл ещё раз: уже загруженные строки не задвоятся."
+    ),
 
     # ═══════════════════════════════════════════════════════
     # Общие ошибки
@@ -464,5 +497,5 @@ DEFAULTS: dict[str, str] = {
     "hint.budget": "Лимит трат на месяц. Общий или по категориям. Статус — сколько осталось.",
     "hint.goals": "Создайте цель с суммой и дедлайном. Пополняйте и следите за прогрессом.",
     "hint.planned": "Запланируйте крупные траты. Бот напомнит о просроченных.",
-    "hint.settings": "Расписания доходов, отпуска, семейные группы и управление категориями.",
+    "hint.settings": "Расписания доходов, отпуска, семейные группы, управление категориями и часовой пояс для напоминаний.",
 }
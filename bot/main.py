@@ -11,40 +11,138 @@ from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.fsm.storage.memory import MemoryStorage
 
-from bot.core.scheduler import run_daily_reminders
+from bot.core.scheduler import run_scheduler
 from bot.core.setup import setup_handlers
+from bot.core.storage.database_storage import DatabaseEventIsolation, DatabaseStorage
+from bot.services.background_tasks import BackgroundTasks, LongRunningJobs
+from bot.services.deletion_scheduler import DeletionScheduler
+from bot.services.send_queue import SendQueue
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 
-bot = Bot(token=BOT_TOKEN, default=DefaultBotProperties(parse_mode="HTML"))
-dp = Dispatcher(storage=MemoryStorage())
+# Режим получения апдейтов: polling (по умолчанию) или webhook
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+WEBHOOK_BASE_URL = os.getenv("WEBHOOK_BASE_URL", "")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/tg/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+HEALTH_PATH = "/health"
 
+# Хранилище FSM: db (PostgreSQL, переживает рестарт и общее для реплик) или memory
+FSM_STORAGE = os.getenv("FSM_STORAGE", "db")
 
-async def main():
-    logger.info("Bot starting...")
 
-    setup_handlers(dp)
+def build_dispatcher() -> Dispatcher:
+    if FSM_STORAGE == "memory":
+        return Dispatcher(storage=MemoryStorage())
+    storage = DatabaseStorage()
+    return Dispatcher(storage=storage, events_isolation=DatabaseEventIsolation(storage))
+
+
+bot = Bot(token=BOT_TOKEN, default=DefaultBotProperties(parse_mode="HTML"))
+# Все исходящие запросы с chat_id проходят через очередь с лимитами Telegram
+send_queue = SendQueue()
+bot.session.middleware(send_queue)
+dp = build_dispatcher()
+
 
+async def on_startup(bot: Bot) -> None:
+    """Общий старт для polling и webhook: тексты, индексы, фоновые задачи."""
     # Загружаем тексты бота из БД (с fallback на дефолты)
     from bot.core.texts.registry import BotTextRegistry
     await BotTextRegistry.load()
 
-    # Запускаем фоновую задачу напоминаний
-    reminder_task = asyncio.create_task(run_daily_reminders(bot))
+    # Индекс категорий/алиасов для матчинга без запросов к БД
+    from project.apps.expenses.services.category_index import CategoryIndex
+    await CategoryIndex.load()
+
+    # Ключевые слова дохода из админки (дополняют встроенные)
+    from project.apps.expenses.services.income_keyword_registry import IncomeKeywordRegistry
+    await IncomeKeywordRegistry.load()
+
+    # Планировщик периодических задач (напоминания, очистка FSM)
+    dp["scheduler_task"] = asyncio.create_task(run_scheduler(bot))
+
+    # Отложенное удаление временных сообщений (переживает рестарт)
+    dp["deletion_task"] = asyncio.create_task(DeletionScheduler.run(bot))
+
+    # Отправки после сохранения записей (подтверждения, уведомления группы)
+    BackgroundTasks.start()
+
+    if BOT_MODE == "webhook":
+        await bot.set_webhook(
+            url=f"{WEBHOOK_BASE_URL.rstrip('/')}{WEBHOOK_PATH}",
+            secret_token=WEBHOOK_SECRET or None,
+            allowed_updates=dp.resolve_used_update_types(),
+        )
+        logger.info("Webhook set to %s%s", WEBHOOK_BASE_URL, WEBHOOK_PATH)
+
+
+async def on_shutdown(bot: Bot) -> None:
+    # Сначала даём доработать долгим задачам и доотправляем очередь: задачи планируют удаления
+    await LongRunningJobs.stop()
+    await BackgroundTasks.stop()
+    for task_name in ("scheduler_task", "deletion_task"):
+        task = dp.workflow_data.pop(task_name, None)
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    logger.info("Bot stopped")
+
+
+def run_webhook() -> None:
+    """Запускает aiohttp-сервер, принимающий апдейты от Telegram.
+    Вебхук не удаляется при остановке: за nginx могут работать другие реплики."""
+    from aiohttp import web
+    from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+    if not WEBHOOK_BASE_URL:
+        raise RuntimeError("BOT_MODE=webhook требует WEBHOOK_BASE_URL")
+    if not WEBHOOK_SECRET:
+        logger.warning("WEBHOOK_SECRET не задан — запросы к вебхуку не проверяются")
+
+    async def health(request: web.Request) -> web.Response:
+        return web.json_response({
+            "status": "ok",
+            "mode": BOT_MODE,
+            "send_queue": send_queue.metrics.snapshot(),
+            "background_tasks": BackgroundTasks.snapshot(),
+            "long_running_jobs": LongRunningJobs.snapshot(),
+        })
+
+    app = web.Application()
+    app.router.add_get(HEALTH_PATH, health)
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=WEBHOOK_SECRET or None,
+    ).register(app, path=WEBHOOK_PATH)
+    setup_application(app, dp, bot=bot)
+
+    web.run_app(app, host=WEBHOOK_HOST, port=WEBHOOK_PORT)
+
+
+async def main():
+    logger.info("Bot starting (polling)...")
+    await bot.delete_webhook(drop_pending_updates=False)
+    await dp.start_polling(bot)
+
 
-    try:
-        await dp.start_polling(bot)
-    finally:
-        reminder_task.cancel()
-        try:
-            await reminder_task
-        except asyncio.CancelledError:
-            pass
-        logger.info("Bot stopped")
+setup_handlers(dp)
+dp.startup.register(on_startup)
+dp.shutdown.register(on_shutdown)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if BOT_MODE == "webhook":
+        logger.info("Bot starting (webhook)...")
+        run_webhook()
+    else:
+        asyncio.run(main())
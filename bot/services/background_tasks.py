@@ -0,0 +1,160 @@
+"""Фоновые задачи после сохранения записи.
+
+Хендлер возвращается, как только запись в БД закоммичена, а отправки в
+Telegram (подтверждение, уведомления группы, вопрос о категории) идут здесь.
+
+Стратегия:
+1. Одна процессная очередь asyncio.Queue на _QUEUE_SIZE задач и
+   _WORKERS воркеров, запускаются в on_startup (start()).
+2. submit() ставит в очередь функцию с аргументами (а не готовую
+   корутину — её не придётся закрывать, если задача не выполнится).
+   Если очередь полна, submit() ждёт места: обратное давление вместо
+   потери уведомлений.
+3. Ошибка задачи логируется и не затрагивает остальные задачи и воркер.
+4. stop() в on_shutdown дожидается выполнения очереди (не дольше
+   _DRAIN_TIMEOUT_SECONDS), затем останавливает воркеры.
+5. Если очередь не запущена (management-команды, скрипты), submit()
+   выполняет задачу сразу.
+
+Долгие задачи (выгрузка, импорт выписки — секунды и десятки секунд) сюда
+не ставятся: они заняли бы воркеры, и подтверждения всех пользователей
+ждали бы за ними. Для них — LongRunningJobs: каждая задача — отдельная
+asyncio-задача, одновременно выполняются не больше _LONG_JOBS_LIMIT,
+остальные ждут семафор.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+_QUEUE_SIZE = 1_000
+_WORKERS = 8
+_DRAIN_TIMEOUT_SECONDS = 10
+
+_LONG_JOBS_LIMIT = 2
+_LONG_JOBS_DRAIN_TIMEOUT_SECONDS = 30
+
+Job = tuple[Callable[..., Awaitable[Any]], tuple, dict]
+
+
+@dataclass
+class BackgroundTasksMetrics:
+    done: int = 0
+    failed: int = 0
+    max_queued: int = 0
+
+    def snapshot(self, queued: int) -> dict:
+        return {
+            "queued": queued,
+            "max_queued": self.max_queued,
+            "done": self.done,
+            "failed": self.failed,
+        }
+
+
+class BackgroundTasks:
+    """Процессная очередь фоновых задач с ограниченным числом воркеров."""
+
+    _queue: asyncio.Queue[Job] | None = None
+    _workers: list[asyncio.Task] = []
+    metrics = BackgroundTasksMetrics()
+
+    @classmethod
+    def start(cls, workers: int = _WORKERS, queue_size: int = _QUEUE_SIZE) -> None:
+        cls._queue = asyncio.Queue(maxsize=queue_size)
+        cls._workers = [asyncio.create_task(cls._worker(cls._queue)) for _ in range(workers)]
+        logger.info("Background tasks started: %d workers, queue %d", workers, queue_size)
+
+    @classmethod
+    async def submit(cls, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> None:
+        """Ставит func(*args, **kwargs) в очередь."""
+        if cls._queue is None:
+            await cls._run((func, args, kwargs))
+            return
+        await cls._queue.put((func, args, kwargs))
+        cls.metrics.max_queued = max(cls.metrics.max_queued, cls._queue.qsize())
+
+    @classmethod
+    async def stop(cls, timeout: float = _DRAIN_TIMEOUT_SECONDS) -> None:
+        """Дожидается выполнения поставленных задач и останавливает воркеры."""
+        queue, cls._queue = cls._queue, None
+        if queue is None:
+            return
+        try:
+            await asyncio.wait_for(queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Background tasks: не выполнено %d задач при остановке", queue.qsize())
+        for worker in cls._workers:
+            worker.cancel()
+        await asyncio.gather(*cls._workers, return_exceptions=True)
+        cls._workers = []
+        logger.info("Background tasks stopped")
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        return cls.metrics.snapshot(cls._queue.qsize() if cls._queue is not None else 0)
+
+    @classmethod
+    async def _worker(cls, queue: asyncio.Queue[Job]) -> None:
+        while True:
+            job = await queue.get()
+            try:
+                await cls._run(job)
+            finally:
+                queue.task_done()
+
+    @classmethod
+    async def _run(cls, job: Job) -> None:
+        func, args, kwargs = job
+        try:
+            await func(*args, **kwargs)
+            cls.metrics.done += 1
+        except Exception:
+            cls.metrics.failed += 1
+            logger.exception("Ошибка фоновой задачи %s", getattr(func, "__qualname__", func))
+
+
+class LongRunningJobs:
+    """Долгие фоновые задачи: отдельные asyncio-задачи под своим семафором."""
+
+    _semaphore = asyncio.Semaphore(_LONG_JOBS_LIMIT)
+    _tasks: set[asyncio.Task] = set()
+    metrics = BackgroundTasksMetrics()
+
+    @classmethod
+    def spawn(cls, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> None:
+        """Запускает func(*args, **kwargs), как только освободится место."""
+        task = asyncio.create_task(cls._run((func, args, kwargs)))
+        cls._tasks.add(task)
+        cls.metrics.max_queued = max(cls.metrics.max_queued, len(cls._tasks))
+        task.add_done_callback(cls._tasks.discard)
+
+    @classmethod
+    async def stop(cls, timeout: float = _LONG_JOBS_DRAIN_TIMEOUT_SECONDS) -> None:
+        """Даёт задачам завершиться (не дольше timeout), остальные отменяет."""
+        if not cls._tasks:
+            return
+        _, pending = await asyncio.wait(set(cls._tasks), timeout=timeout)
+        if pending:
+            logger.warning("Long-running jobs: отменено %d задач при остановке", len(pending))
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        return cls.metrics.snapshot(len(cls._tasks))
+
+    @classmethod
+    async def _run(cls, job: Job) -> None:
+        func, args, kwargs = job
+        async with cls._semaphore:
+            try:
+                await func(*args, **kwargs)
+                cls.metrics.done += 1
+            except Exception:
+                cls.metrics.failed += 1
+                logger.exception("Ошибка долгой задачи %s", getattr(func, "__qualname__", func))
@@ -2,22 +2,29 @@ from aiogram import types, Bot
 
 from bot.core.callbacks.menu import CategoryAction, CAT_ADD_NEW, CAT_ADD_ALIAS, CAT_USE_OTHER
 from bot.core.texts import t
-from project.apps.expenses.services.category_service import CategoryService
+from project.apps.expenses.services.category_service import CategoryMatchResult, CategoryService
 
+# Сколько категорий предложить кнопками
+PROMPT_CATEGORY_COUNT = 5
 
-async def prompt_unknown_category(bot: Bot, chat_id: int, category_text: str) -> None:
+
+async def prompt_unknown_category(
+    bot: Bot,
+    chat_id: int,
+    category_text: str,
+    match_result: CategoryMatchResult,
+    user_id: int,
+) -> None:
+    """Спрашивает, что это за категория, если при сохранении записи текст
+    не распознался (match_result — результат, полученный при сохранении)."""
     if not category_text or category_text in ("Без категории", "Без описания"):
         return
-
-    match_result = await CategoryService.match(category_text)
     if not match_result.fell_back_to_other:
         return
 
-    all_categories = await CategoryService.get_all_categories()
+    categories = await CategoryService.get_top_categories(user_id, PROMPT_CATEGORY_COUNT)
     category_buttons = []
-    for cat in all_categories[:6]:
-        if cat.name == "Прочее":
-            continue
+    for cat in categories:
         category_buttons.append([
             types.InlineKeyboardButton(
                 text=f"📁 {cat.name}",
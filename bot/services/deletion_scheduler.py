@@ -0,0 +1,147 @@
+"""Отложенное удаление временных сообщений бота.
+
+Стратегия:
+1. schedule() записывает (chat_id, message_id, due_at) в таблицу
+   ScheduledDeletion и кладёт элемент в процессную кучу (heapq) —
+   вместо отдельной спящей задачи на каждое сообщение.
+2. Одна фоновая задача run() спит до ближайшего due_at, забирает все
+   удаления, срок которых наступил (с окном _BATCH_WINDOW_SECONDS),
+   и удаляет их пачками через deleteMessages (до 100 сообщений на чат).
+3. При старте run() загружает незавершённые удаления из БД, поэтому
+   рестарт бота их не теряет.
+4. Запись из БД убирается, только когда пачка удалена или Telegram
+   ответил окончательной ошибкой (сообщение уже удалено или слишком
+   старое — TelegramBadRequest; бота нет в чате — TelegramForbiddenError).
+   Пачка с временной ошибкой (сеть, flood control) возвращается в кучу
+   через _RETRY_DELAY_SECONDS или retry_after.
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
+from django.db.models import Q
+from django.utils import timezone
+
+from project.apps.core.models import ScheduledDeletion
+
+logger = logging.getLogger(__name__)
+
+_BATCH_WINDOW_SECONDS = 0.5
+_MAX_IDS_PER_REQUEST = 100
+_RETRY_DELAY_SECONDS = 60
+
+
+class DeletionScheduler:
+    """Процессная очередь удалений с персистентной копией в БД."""
+
+    # (due_ts, chat_id, message_id)
+    _heap: list[tuple[float, int, int]] = []
+    _wakeup: asyncio.Event | None = None
+
+    @classmethod
+    async def schedule(cls, chat_id: int, message_id: int, delay_seconds: float) -> None:
+        """Ставит сообщение в очередь на удаление через delay_seconds."""
+        due_at = timezone.now() + timedelta(seconds=delay_seconds)
+        await ScheduledDeletion.objects.abulk_create(
+            [ScheduledDeletion(chat_id=chat_id, message_id=message_id, due_at=due_at)],
+            ignore_conflicts=True,
+        )
+        cls._push(due_at.timestamp(), chat_id, message_id)
+
+    @classmethod
+    async def run(cls, bot: Bot) -> None:
+        """Фоновая задача: удаляет сообщения по мере наступления срока."""
+        await cls._load()
+        logger.info("Deletion scheduler started, pending: %d", len(cls._heap))
+        while True:
+            try:
+                due = cls._pop_due()
+                if due:
+                    await cls._delete_batch(bot, due)
+                    continue
+                timeout = cls._heap[0][0] - time.time() if cls._heap else None
+                cls._get_wakeup().clear()
+                try:
+                    await asyncio.wait_for(cls._get_wakeup().wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                logger.info("Deletion scheduler cancelled")
+                break
+            except Exception:
+                logger.exception("Error in deletion scheduler")
+                await asyncio.sleep(5)
+
+    # ─── Внутреннее ────────────────────────────────────────────
+
+    @classmethod
+    def _get_wakeup(cls) -> asyncio.Event:
+        if cls._wakeup is None:
+            cls._wakeup = asyncio.Event()
+        return cls._wakeup
+
+    @classmethod
+    def _push(cls, due_ts: float, chat_id: int, message_id: int) -> None:
+        is_new_head = not cls._heap or due_ts < cls._heap[0][0]
+        heapq.heappush(cls._heap, (due_ts, chat_id, message_id))
+        if is_new_head:
+            cls._get_wakeup().set()
+
+    @classmethod
+    async def _load(cls) -> None:
+        cls._heap = []
+        async for chat_id, message_id, due_at in ScheduledDeletion.objects.values_list(
+            "chat_id", "message_id", "due_at",
+        ):
+            cls._heap.append((due_at.timestamp(), chat_id, message_id))
+        heapq.heapify(cls._heap)
+
+    @classmethod
+    def _pop_due(cls) -> list[tuple[int, int]]:
+        horizon = time.time() + _BATCH_WINDOW_SECONDS
+        due = []
+        while cls._heap and cls._heap[0][0] <= horizon:
+            _, chat_id, message_id = heapq.heappop(cls._heap)
+            due.append((chat_id, message_id))
+        return due
+
+    @classmethod
+    async def _delete_batch(cls, bot: Bot, due: list[tuple[int, int]]) -> None:
+        by_chat: dict[int, list[int]] = defaultdict(list)
+        for chat_id, message_id in due:
+            by_chat[chat_id].append(message_id)
+
+        done: dict[int, list[int]] = defaultdict(list)
+        for chat_id, message_ids in by_chat.items():
+            for start in range(0, len(message_ids), _MAX_IDS_PER_REQUEST):
+                chunk = message_ids[start:start + _MAX_IDS_PER_REQUEST]
+                try:
+                    await bot.delete_messages(chat_id=chat_id, message_ids=chunk)
+                except (TelegramBadRequest, TelegramForbiddenError):
+                    # Сообщение уже удалено пользователем, слишком старое или бота нет в чате
+                    logger.debug("Не удалось удалить сообщения %s в чате %s", chunk, chat_id)
+                except Exception as error:
+                    delay = error.retry_after if isinstance(error, TelegramRetryAfter) else _RETRY_DELAY_SECONDS
+                    logger.warning(
+                        "Удаление сообщений в чате %s отложено на %s с: %s", chat_id, delay, error,
+                    )
+                    for message_id in chunk:
+                        cls._push(time.time() + delay, chat_id, message_id)
+                    continue
+                done[chat_id] += chunk
+
+        if not done:
+            return
+        condition = reduce(or_, (
+            Q(chat_id=chat_id, message_id__in=message_ids)
+            for chat_id, message_ids in done.items()
+        ))
+        await ScheduledDeletion.objects.filter(condition).adelete()
@@ -5,12 +5,11 @@
 чтобы пользователь мог выйти из FSM-потока в любой момент.
 """
 
-import asyncio
-
 from aiogram import Bot, types
 from aiogram.fsm.context import FSMContext
 
 from bot.core.callbacks.menu import FsmCancelAction
+from bot.services.deletion_scheduler import DeletionScheduler
 
 _TRACKED_KEY = "_tracked_bot_msg_id"
 _TRACKED_CHAT_KEY = "_tracked_chat_id"
@@ -128,7 +127,7 @@ async def send_temporary(
         reply_markup=reply_markup,
         parse_mode="HTML",
     )
-    asyncio.create_task(_delayed_delete(bot, chat_id, msg.message_id, delay_seconds))
+    await DeletionScheduler.schedule(chat_id, msg.message_id, delay_seconds)
 
 
 async def _delete_tracked(bot: Bot, state: FSMContext) -> None:
@@ -143,11 +142,3 @@ async def _delete_tracked(bot: Bot, state: FSMContext) -> None:
             pass
 
         await state.update_data(**{_TRACKED_KEY: None, _TRACKED_CHAT_KEY: None})
-
-
-async def _delayed_delete(bot: Bot, chat_id: int, message_id: int, delay: int) -> None:
-    await asyncio.sleep(delay)
-    try:
-        await bot.delete_message(chat_id=chat_id, message_id=message_id)
-    except Exception:
-        pass
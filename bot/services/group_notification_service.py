@@ -1,6 +1,9 @@
 """Сервис групповых уведомлений.
 
-Отправляет временные уведомления участникам группы о расходах/доходах.
+Отправляет временные уведомления участникам группы о расходах/доходах:
+одно уведомление на сообщение (чек из нескольких строк — одним списком),
+получателям — параллельно, не более _FANOUT_CONCURRENCY отправок сразу.
+Список получателей кешируется в FamilyGroupService.
 """
 
 import asyncio
@@ -9,20 +12,44 @@ import logging
 from aiogram import Bot
 
 from bot.core.texts import t
+from bot.services.deletion_scheduler import DeletionScheduler
 from project.apps.core.services.family_group_service import FamilyGroupService
 
 logger = logging.getLogger(__name__)
 
 _NOTIFICATION_TTL_SECONDS = 15
+_FANOUT_CONCURRENCY = 10
 
 
 async def notify_group_about_expense(bot: Bot, author, category_name: str, amount: str) -> None:
-    text = t("notification.group_expense", author=_display_name(author), category=category_name, amount=amount)
-    await _send_to_group_recipients(bot, author, text)
+    await notify_group_about_expenses(bot, author, [(category_name, amount)])
 
 
 async def notify_group_about_income(bot: Bot, author, category_name: str, amount: str) -> None:
-    text = t("notification.group_income", author=_display_name(author), category=category_name, amount=amount)
+    await notify_group_about_incomes(bot, author, [(category_name, amount)])
+
+
+async def notify_group_about_expenses(bot: Bot, author, items: list[tuple[str, str]]) -> None:
+    """Одно уведомление о расходах из сообщения: items — (категория, сумма)."""
+    if len(items) == 1:
+        category_name, amount = items[0]
+        text = t("notification.group_expense", author=_display_name(author), category=category_name, amount=amount)
+    else:
+        lines = [t("notification.group_expense_multi", author=_display_name(author), count=str(len(items)))]
+        lines += [f"  • {category_name} — {amount} ₽" for category_name, amount in items]
+        text = "\n".join(lines)
+    await _send_to_group_recipients(bot, author, text)
+
+
+async def notify_group_about_incomes(bot: Bot, author, items: list[tuple[str, str]]) -> None:
+    """Одно уведомление о доходах из сообщения: items — (категория, сумма)."""
+    if len(items) == 1:
+        category_name, amount = items[0]
+        text = t("notification.group_income", author=_display_name(author), category=category_name, amount=amount)
+    else:
+        lines = [t("notification.group_income_multi", author=_display_name(author), count=str(len(items)))]
+        lines += [f"  • {category_name} — +{amount} ₽" for category_name, amount in items]
+        text = "\n".join(lines)
     await _send_to_group_recipients(bot, author, text)
 
 
@@ -32,21 +59,20 @@ def _display_name(user) -> str:
 
 async def _send_to_group_recipients(bot: Bot, author, text: str) -> None:
     recipient_ids = await FamilyGroupService.get_notification_recipients(author)
-    for tg_id in recipient_ids:
-        await _send_temporary_notification(bot, tg_id, text)
+    if not recipient_ids:
+        return
+    semaphore = asyncio.Semaphore(_FANOUT_CONCURRENCY)
+
+    async def send(tg_id: int) -> None:
+        async with semaphore:
+            await _send_temporary_notification(bot, tg_id, text)
+
+    await asyncio.gather(*(send(tg_id) for tg_id in recipient_ids))
 
 
 async def _send_temporary_notification(bot: Bot, chat_id: int, text: str) -> None:
     try:
         message = await bot.send_message(chat_id=chat_id, text=text)
-        asyncio.create_task(_delayed_delete(bot, chat_id, message.message_id))
+        await DeletionScheduler.schedule(chat_id, message.message_id, _NOTIFICATION_TTL_SECONDS)
     except Exception:
         logger.exception("Не удалось отправить уведомление в чат %s", chat_id)
-
-
-async def _delayed_delete(bot: Bot, chat_id: int, message_id: int) -> None:
-    await asyncio.sleep(_NOTIFICATION_TTL_SECONDS)
-    try:
-        await bot.delete_message(chat_id=chat_id, message_id=message_id)
-    except Exception:
-        pass
@@ -0,0 +1,177 @@
+"""Очередь исходящих запросов к Telegram с ограничением скорости.
+
+Подключается как request-middleware сессии бота (bot.session.middleware),
+поэтому через неё проходят все вызовы API с chat_id: bot.send_message,
+message.answer, edit_*, delete_message и т. д.
+
+Стратегия:
+1. Глобальный token bucket (~30 запросов/с на бота) — для всех методов с chat_id.
+2. Бакет на чат: токены тратит только отправка новых сообщений
+   (send*/copy*/forward*) — ~1 сообщение/с в личке, ~20 в минуту в группах;
+   паузу чата (п. 5) соблюдают все его методы.
+3. Места в бакетах резервируются в порядке вызова, поэтому ожидающие
+   запросы обслуживаются FIFO — это и есть очередь.
+4. Не более _MAX_CONCURRENCY запросов одновременно в полёте.
+5. TelegramRetryAfter: на паузу в retry_after секунд ставится только чат
+   запроса — для любых методов, не только отправки (флуд правками одного
+   чата не останавливает остальные); запрос повторяется до _MAX_RETRIES раз.
+6. Метрики (глубина очереди, задержка отправки) доступны через metrics.snapshot().
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+logger = logging.getLogger(__name__)
+
+_GLOBAL_RATE = 30.0
+_PRIVATE_CHAT_RATE = 1.0
+_GROUP_CHAT_RATE = 20 / 60
+_CHAT_BURST = 3
+_MAX_CONCURRENCY = 20
+_MAX_RETRIES = 3
+_IDLE_BUCKETS_LIMIT = 10_000
+
+_SEND_PREFIXES = ("Send", "Copy", "Forward")
+
+
+class TokenBucket:
+    """Token bucket с резервированием: reserve() сразу списывает токен
+    (баланс может уйти в минус) и возвращает, сколько ждать до отправки."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+
+    def reserve(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        self.tokens -= 1
+        delay = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+        return max(delay, self.paused_until - now)
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def pause_left(self) -> float:
+        return max(0.0, self.paused_until - time.monotonic())
+
+    def is_idle(self) -> bool:
+        now = time.monotonic()
+        refilled = self.tokens + (now - self.updated_at) * self.rate
+        return refilled >= self.capacity and now >= self.paused_until
+
+
+@dataclass
+class SendQueueMetrics:
+    queued: int = 0
+    in_flight: int = 0
+    max_queued: int = 0
+    sent: int = 0
+    failed: int = 0
+    retried: int = 0
+    # Задержка от постановки в очередь до ответа Telegram, секунды
+    latencies: deque = field(default_factory=lambda: deque(maxlen=1000))
+
+    def snapshot(self) -> dict:
+        samples = sorted(self.latencies)
+
+        def percentile(p: float) -> float:
+            if not samples:
+                return 0.0
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))], 3)
+
+        return {
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "max_queued": self.max_queued,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "latency_p50": percentile(0.5),
+            "latency_p95": percentile(0.95),
+        }
+
+
+class SendQueue(BaseRequestMiddleware):
+    """Ограничитель исходящих запросов бота."""
+
+    def __init__(self) -> None:
+        self.global_bucket = TokenBucket(_GLOBAL_RATE, _GLOBAL_RATE)
+        self.chat_buckets: dict[int | str, TokenBucket] = {}
+        self.semaphore = asyncio.Semaphore(_MAX_CONCURRENCY)
+        self.metrics = SendQueueMetrics()
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            # getUpdates, answerCallbackQuery, setWebhook и т. п. — без очереди
+            return await make_request(bot, method)
+
+        is_send = type(method).__name__.startswith(_SEND_PREFIXES)
+        enqueued_at = time.monotonic()
+        self.metrics.queued += 1
+        self.metrics.max_queued = max(self.metrics.max_queued, self.metrics.queued)
+        try:
+            for attempt in range(_MAX_RETRIES + 1):
+                await self._wait_turn(chat_id, is_send)
+                try:
+                    async with self.semaphore:
+                        self.metrics.in_flight += 1
+                        try:
+                            response = await make_request(bot, method)
+                        finally:
+                            self.metrics.in_flight -= 1
+                except TelegramRetryAfter as e:
+                    if attempt == _MAX_RETRIES:
+                        raise
+                    self.metrics.retried += 1
+                    logger.warning("Flood control в чате %s: пауза %s с", chat_id, e.retry_after)
+                    self._chat_bucket(chat_id).pause(e.retry_after)
+                    continue
+                self.metrics.sent += 1
+                self.metrics.latencies.append(time.monotonic() - enqueued_at)
+                return response
+        except Exception:
+            self.metrics.failed += 1
+            raise
+        finally:
+            self.metrics.queued -= 1
+
+    async def _wait_turn(self, chat_id: int | str, is_send: bool) -> None:
+        delay = self.global_bucket.reserve()
+        chat_bucket = self._chat_bucket(chat_id)
+        # Правки и удаления не тратят токены чата, но ждут его паузу после flood control
+        delay = max(delay, chat_bucket.reserve() if is_send else chat_bucket.pause_left())
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _chat_bucket(self, chat_id: int | str) -> TokenBucket:
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self.chat_buckets) >= _IDLE_BUCKETS_LIMIT:
+                self.chat_buckets = {
+                    key: value for key, value in self.chat_buckets.items() if not value.is_idle()
+                }
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            rate = _GROUP_CHAT_RATE if is_group else _PRIVATE_CHAT_RATE
+            bucket = TokenBucket(rate, _CHAT_BURST)
+            self.chat_buckets[chat_id] = bucket
+        return bucket
@@ -1,6 +1,9 @@
 from django.contrib import admin
 
-from project.apps.core.models import User, FamilyGroup, FamilyGroupMembership, BotText, Feedback
+from project.apps.core.models import (
+    User, FamilyGroup, FamilyGroupMembership, BotText, Feedback, FsmRecord, ScheduledDeletion,
+    ScheduledJob, JobRun,
+)
 
 
 @admin.register(User)
@@ -58,3 +61,29 @@ class FeedbackAdmin(admin.ModelAdmin):
     list_filter = ("created_at",)
     search_fields = ("user__username", "text", "chat_id")
     readonly_fields = ("created_at", "updated_at")
+
+
+@admin.register(FsmRecord)
+class FsmRecordAdmin(admin.ModelAdmin):
+    list_display = ("key", "state", "updated_at")
+    list_filter = ("state",)
+    search_fields = ("key",)
+    readonly_fields = ("updated_at",)
+
+
+@admin.register(ScheduledDeletion)
+class ScheduledDeletionAdmin(admin.ModelAdmin):
+    list_display = ("chat_id", "message_id", "due_at")
+    search_fields = ("chat_id",)
+
+
+@admin.register(ScheduledJob)
+class ScheduledJobAdmin(admin.ModelAdmin):
+    list_display = ("name", "next_run_at", "last_run_at")
+
+
+@admin.register(JobRun)
+class JobRunAdmin(admin.ModelAdmin):
+    list_display = ("job", "scheduled_for", "status", "attempt", "started_at", "finished_at")
+    list_filter = ("status", "job")
+    readonly_fields = ("stats",)
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_feedback"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FsmRecord",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("key", models.CharField(max_length=255, unique=True, verbose_name="Ключ")),
+                ("state", models.CharField(blank=True, max_length=255, null=True, verbose_name="Состояние")),
+                ("data", models.JSONField(blank=True, default=dict, verbose_name="Данные")),
+                ("updated_at", models.DateTimeField(db_index=True, verbose_name="Дата обновления")),
+            ],
+            options={
+                "verbose_name": "Состояние FSM",
+                "verbose_name_plural": "Состояния FSM",
+                "ordering": ["-updated_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_fsmrecord"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScheduledDeletion",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("chat_id", models.BigIntegerField(verbose_name="ID чата")),
+                ("message_id", models.BigIntegerField(verbose_name="ID сообщения")),
+                ("due_at", models.DateTimeField(db_index=True, verbose_name="Удалить в")),
+            ],
+            options={
+                "verbose_name": "Отложенное удаление",
+                "verbose_name_plural": "Отложенные удаления",
+                "ordering": ["due_at"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="scheduleddeletion",
+            constraint=models.UniqueConstraint(fields=("chat_id", "message_id"), name="unique_scheduled_deletion"),
+        ),
+    ]
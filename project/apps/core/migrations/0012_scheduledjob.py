@@ -0,0 +1,98 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_scheduleddeletion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScheduledJob",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=100, unique=True, verbose_name="Задача")),
+                ("next_run_at", models.DateTimeField(verbose_name="Следующий запуск")),
+                ("last_run_at", models.DateTimeField(blank=True, null=True, verbose_name="Последний запуск")),
+            ],
+            options={
+                "verbose_name": "Периодическая задача",
+                "verbose_name_plural": "Периодические задачи",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="JobRun",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("scheduled_for", models.DateTimeField(verbose_name="Слот расписания")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("running", "Выполняется"),
+                            ("success", "Успешно"),
+                            ("failed", "Ошибка"),
+                            ("skipped", "Пропущен"),
+                        ],
+                        default="running",
+                        max_length=10,
+                        verbose_name="Статус",
+                    ),
+                ),
+                ("attempt", models.PositiveSmallIntegerField(default=1, verbose_name="Попытка")),
+                ("started_at", models.DateTimeField(verbose_name="Начало")),
+                ("finished_at", models.DateTimeField(blank=True, null=True, verbose_name="Окончание")),
+                ("stats", models.JSONField(blank=True, default=dict, verbose_name="Статистика")),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="runs",
+                        to="core.scheduledjob",
+                        verbose_name="Задача",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Запуск задачи",
+                "verbose_name_plural": "Запуски задач",
+                "ordering": ["-scheduled_for"],
+            },
+        ),
+        migrations.CreateModel(
+            name="JobDelivery",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("key", models.CharField(max_length=100, verbose_name="Элемент")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Дата")),
+                (
+                    "run",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="deliveries",
+                        to="core.jobrun",
+                        verbose_name="Запуск",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Доставка",
+                "verbose_name_plural": "Доставки",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="jobrun",
+            constraint=models.UniqueConstraint(fields=("job", "scheduled_for"), name="unique_job_run_slot"),
+        ),
+        migrations.AddIndex(
+            model_name="jobrun",
+            index=models.Index(fields=["status", "started_at"], name="core_jobrun_status_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="jobdelivery",
+            constraint=models.UniqueConstraint(fields=("run", "key"), name="unique_job_delivery"),
+        ),
+    ]
@@ -0,0 +1,67 @@
+"""Часовой пояс пользователя и журнал доставок, уникальный в пределах задачи."""
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_delivery_job(apps, schema_editor):
+    JobDelivery = apps.get_model("core", "JobDelivery")
+    JobRun = apps.get_model("core", "JobRun")
+    JobDelivery.objects.update(
+        job_id=Subquery(JobRun.objects.filter(id=OuterRef("run_id")).values("job_id")[:1]),
+    )
+
+
+def noop_reverse(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_scheduledjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="timezone",
+            field=models.CharField(
+                default="Europe/Moscow",
+                help_text="IANA-имя, например Europe/Moscow. Определяет локальное время напоминаний.",
+                max_length=64,
+                verbose_name="Часовой пояс",
+            ),
+        ),
+        migrations.AddField(
+            model_name="jobdelivery",
+            name="job",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="deliveries",
+                to="core.scheduledjob",
+                verbose_name="Задача",
+            ),
+        ),
+        migrations.RunPython(fill_delivery_job, noop_reverse),
+        migrations.AlterField(
+            model_name="jobdelivery",
+            name="job",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="deliveries",
+                to="core.scheduledjob",
+                verbose_name="Задача",
+            ),
+        ),
+        migrations.RemoveConstraint(
+            model_name="jobdelivery",
+            name="unique_job_delivery",
+        ),
+        migrations.AddConstraint(
+            model_name="jobdelivery",
+            constraint=models.UniqueConstraint(fields=("job", "key"), name="unique_job_delivery_key"),
+        ),
+    ]
@@ -0,0 +1,23 @@
+"""Версия состава семейной группы — ключ кеша получателей уведомлений."""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0013_user_timezone_jobdelivery_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="familygroup",
+            name="members_version",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Растёт при вступлении, выходе и переключении уведомлений: "
+                "по ней реплики бота сбрасывают кеш получателей уведомлений",
+                verbose_name="Версия состава",
+            ),
+        ),
+    ]
@@ -3,6 +3,9 @@ from project.apps.core.models.user import User
 from project.apps.core.models.family_group import FamilyGroup, FamilyGroupMembership
 from project.apps.core.models.bot_text import BotText
 from project.apps.core.models.feedback import Feedback
+from project.apps.core.models.fsm_record import FsmRecord
+from project.apps.core.models.scheduled_deletion import ScheduledDeletion
+from project.apps.core.models.scheduled_job import ScheduledJob, JobRun, JobDelivery
 
 __all__ = [
     "BaseModelMixin",
@@ -11,4 +14,9 @@ __all__ = [
     "FamilyGroupMembership",
     "BotText",
     "Feedback",
+    "FsmRecord",
+    "ScheduledDeletion",
+    "ScheduledJob",
+    "JobRun",
+    "JobDelivery",
 ]
@@ -24,6 +24,12 @@ class FamilyGroup(BaseModelMixin):
         verbose_name="Код приглашения",
         help_text="Уникальный код для присоединения к группе",
     )
+    members_version = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Версия состава",
+        help_text="Растёт при вступлении, выходе и переключении уведомлений: "
+                  "по ней реплики бота сбрасывают кеш получателей уведомлений",
+    )
 
     class Meta:
         verbose_name = "Семейная группа"
@@ -0,0 +1,39 @@
+from django.db import models
+
+
+class FsmRecord(models.Model):
+    """Состояние и данные FSM aiogram для одного ключа (бот/чат/пользователь).
+
+    Хранилище бота (DatabaseStorage) пишет сюда одним upsert на апдейт,
+    поэтому незавершённые сценарии переживают рестарт и видны всем репликам.
+    Заброшенные записи удаляются по updated_at. Служебная таблица —
+    без мягкого удаления, поэтому не наследует BaseModelMixin."""
+
+    key = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name="Ключ",
+    )
+    state = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        verbose_name="Состояние",
+    )
+    data = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="Данные",
+    )
+    updated_at = models.DateTimeField(
+        verbose_name="Дата обновления",
+        db_index=True,
+    )
+
+    class Meta:
+        verbose_name = "Состояние FSM"
+        verbose_name_plural = "Состояния FSM"
+        ordering = ["-updated_at"]
+
+    def __str__(self):
+        return f"{self.key}: {self.state or '—'}"
@@ -0,0 +1,34 @@
+from django.db import models
+
+
+class ScheduledDeletion(models.Model):
+    """Сообщение бота, которое нужно удалить в due_at.
+
+    Персистентная очередь DeletionScheduler: при рестарте бота
+    незавершённые удаления загружаются отсюда. Служебная таблица —
+    без мягкого удаления, поэтому не наследует BaseModelMixin."""
+
+    chat_id = models.BigIntegerField(
+        verbose_name="ID чата",
+    )
+    message_id = models.BigIntegerField(
+        verbose_name="ID сообщения",
+    )
+    due_at = models.DateTimeField(
+        verbose_name="Удалить в",
+        db_index=True,
+    )
+
+    class Meta:
+        verbose_name = "Отложенное удаление"
+        verbose_name_plural = "Отложенные удаления"
+        ordering = ["due_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["chat_id", "message_id"],
+                name="unique_scheduled_deletion",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.chat_id}/{self.message_id} @ {self.due_at}"
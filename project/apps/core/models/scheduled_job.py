@@ -0,0 +1,140 @@
+from django.db import models
+
+
+class ScheduledJob(models.Model):
+    """Состояние периодической задачи планировщика бота.
+
+    Расписание и обработчик задачи описываются в коде (bot/core/scheduler.py),
+    здесь хранится только, когда задача должна запуститься в следующий раз.
+    Служебная таблица — без мягкого удаления, поэтому не наследует BaseModelMixin."""
+
+    name = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name="Задача",
+    )
+    next_run_at = models.DateTimeField(
+        verbose_name="Следующий запуск",
+    )
+    last_run_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Последний запуск",
+    )
+
+    class Meta:
+        verbose_name = "Периодическая задача"
+        verbose_name_plural = "Периодические задачи"
+        ordering = ["name"]
+
+    def __str__(self):
+        return f"{self.name} → {self.next_run_at:%Y-%m-%d %H:%M}"
+
+
+class JobRun(models.Model):
+    """Один запуск задачи за конкретный слот расписания.
+
+    Уникальность (job, scheduled_for) гарантирует, что слот выполняется
+    один раз даже при нескольких репликах бота."""
+
+    STATUS_RUNNING = "running"
+    STATUS_SUCCESS = "success"
+    STATUS_FAILED = "failed"
+    STATUS_SKIPPED = "skipped"
+    STATUS_CHOICES = (
+        (STATUS_RUNNING, "Выполняется"),
+        (STATUS_SUCCESS, "Успешно"),
+        (STATUS_FAILED, "Ошибка"),
+        (STATUS_SKIPPED, "Пропущен"),
+    )
+
+    job = models.ForeignKey(
+        ScheduledJob,
+        on_delete=models.CASCADE,
+        related_name="runs",
+        verbose_name="Задача",
+    )
+    scheduled_for = models.DateTimeField(
+        verbose_name="Слот расписания",
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_RUNNING,
+        verbose_name="Статус",
+    )
+    attempt = models.PositiveSmallIntegerField(
+        default=1,
+        verbose_name="Попытка",
+    )
+    started_at = models.DateTimeField(
+        verbose_name="Начало",
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Окончание",
+    )
+    stats = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="Статистика",
+    )
+
+    class Meta:
+        verbose_name = "Запуск задачи"
+        verbose_name_plural = "Запуски задач"
+        ordering = ["-scheduled_for"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["job", "scheduled_for"],
+                name="unique_job_run_slot",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["status", "started_at"], name="core_jobrun_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.job.name} @ {self.scheduled_for:%Y-%m-%d %H:%M}: {self.status}"
+
+
+class JobDelivery(models.Model):
+    """Отметка о том, что задача обработала элемент (например, отправила
+    напоминание пользователю за конкретный день). Ключ уникален в пределах
+    задачи, поэтому ни повтор слота, ни пересекающиеся окна соседних
+    запусков не обрабатывают элемент дважды."""
+
+    job = models.ForeignKey(
+        ScheduledJob,
+        on_delete=models.CASCADE,
+        related_name="deliveries",
+        verbose_name="Задача",
+    )
+    run = models.ForeignKey(
+        JobRun,
+        on_delete=models.CASCADE,
+        related_name="deliveries",
+        verbose_name="Запуск",
+    )
+    key = models.CharField(
+        max_length=100,
+        verbose_name="Элемент",
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата",
+    )
+
+    class Meta:
+        verbose_name = "Доставка"
+        verbose_name_plural = "Доставки"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["job", "key"],
+                name="unique_job_delivery_key",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.run_id}: {self.key}"
@@ -1,6 +1,9 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+# Часовой пояс по умолчанию: основная аудитория бота — Россия
+DEFAULT_USER_TIMEZONE = "Europe/Moscow"
+
 
 class User(AbstractUser):
     tg_id = models.BigIntegerField(
@@ -44,6 +47,13 @@ class User(AbstractUser):
         blank=True,
     )
 
+    timezone = models.CharField(
+        verbose_name="Часовой пояс",
+        max_length=64,
+        default=DEFAULT_USER_TIMEZONE,
+        help_text="IANA-имя, например Europe/Moscow. Определяет локальное время напоминаний.",
+    )
+
     USERNAME_FIELD = "username"
     REQUIRED_FIELDS = []
 
@@ -1,14 +1,23 @@
 import secrets
 import string
+import time
 
 from asgiref.sync import sync_to_async
+from django.db.models import F
 
 from project.apps.core.models import User, FamilyGroup, FamilyGroupMembership
 
+# Правки групп из админки (без смены members_version) подхватываются через TTL
+_RECIPIENTS_TTL_SECONDS = 5 * 60
+_RECIPIENTS_CACHE_MAX_SIZE = 10_000
+
 
 class FamilyGroupService:
     """Сервис управления семейными группами."""
 
+    # user_id → (версии групп пользователя, Telegram ID получателей, monotonic-время загрузки)
+    _recipients_cache: dict[int, tuple[tuple, list[int], float]] = {}
+
     @staticmethod
     def _generate_invite_code(length: int = 8) -> str:
         alphabet = string.ascii_uppercase + string.digits
@@ -33,6 +42,7 @@ class FamilyGroupService:
             user=user,
             role=FamilyGroupMembership.ROLE_ADMIN,
         )
+        FamilyGroupService._bump_members_version(group)
         return group
 
     @staticmethod
@@ -56,6 +66,7 @@ class FamilyGroupService:
 
         if not created:
             return None
+        FamilyGroupService._bump_members_version(group)
 
         # select_related для доступа к group.name без дополнительного запроса
         return FamilyGroupMembership.objects.select_related("group").get(pk=membership.pk)
@@ -99,13 +110,54 @@ class FamilyGroupService:
 
         return list(member_user_ids)
 
-    @staticmethod
-    @sync_to_async
-    def get_notification_recipients(user: User) -> list[int]:
+    @classmethod
+    async def get_notification_recipients(cls, user: User) -> list[int]:
         """Возвращает список Telegram ID участников групп пользователя,
         у которых включены уведомления. Исключает самого пользователя.
 
-        Используется для отправки уведомлений о расходах/доходах."""
+        Используется для отправки уведомлений о расходах/доходах, поэтому
+        кешируется на процесс. Кеш сверяется с members_version групп
+        пользователя (один лёгкий запрос): вступление, выход и переключение
+        уведомлений на любой реплике сразу меняют версию, и устаревший
+        список не отправит уведомление вышедшему участнику."""
+        versions = await cls._load_group_versions(user)
+        cached = cls._recipients_cache.get(user.id)
+        if (
+            cached is not None
+            and cached[0] == versions
+            and time.monotonic() - cached[2] <= _RECIPIENTS_TTL_SECONDS
+        ):
+            return cached[1]
+
+        recipients = await cls._load_notification_recipients(user)
+        if len(cls._recipients_cache) >= _RECIPIENTS_CACHE_MAX_SIZE:
+            cls._recipients_cache.clear()
+        cls._recipients_cache[user.id] = (versions, recipients, time.monotonic())
+        return recipients
+
+    @classmethod
+    def invalidate_recipients(cls) -> None:
+        """Сбрасывает кеш получателей этого процесса (другие реплики
+        узнают об изменениях по members_version)."""
+        cls._recipients_cache.clear()
+
+    @classmethod
+    def _bump_members_version(cls, group: FamilyGroup) -> None:
+        FamilyGroup.objects.filter(pk=group.pk).update(members_version=F("members_version") + 1)
+        cls.invalidate_recipients()
+
+    @staticmethod
+    @sync_to_async
+    def _load_group_versions(user: User) -> tuple:
+        return tuple(
+            FamilyGroupMembership.objects.filter(user=user, deleted_at__isnull=True)
+            .order_by("group_id")
+            .values_list("group_id", "group__members_version")
+        )
+
+    @staticmethod
+    @sync_to_async
+    def _load_notification_recipients(user: User) -> list[int]:
         # Группы, в которых состоит пользователь
         user_group_ids = FamilyGroupMembership.objects.filter(
             user=user,
@@ -143,6 +195,7 @@ class FamilyGroupService:
 
         membership.notifications_enabled = not membership.notifications_enabled
         membership.save(update_fields=["notifications_enabled", "updated_at"])
+        FamilyGroupService._bump_members_version(group)
         return membership.notifications_enabled
 
     @staticmethod
@@ -168,4 +221,5 @@ class FamilyGroupService:
                 return False
 
         membership.soft_delete()
+        FamilyGroupService._bump_members_version(group)
         return True
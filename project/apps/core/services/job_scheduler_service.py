@@ -0,0 +1,226 @@
+"""Персистентный планировщик периодических задач (сторона БД).
+
+Стратегия:
+1. Расписание задачи (JobSpec) описывается в коде, в ScheduledJob хранится
+   только next_run_at. Новая задача впервые запускается в ближайший слот
+   после деплоя — история не догоняется.
+2. Раз в тик каждая реплика вызывает claim_due_runs(). Внутри транзакции
+   берётся pg_try_advisory_xact_lock: тик выполняет только реплика,
+   получившая блокировку (лидер), остальные сразу получают [].
+3. Для просроченной задачи создаётся JobRun на слот next_run_at, а
+   next_run_at переносится на первый слот после «сейчас» — пропущенные
+   слоты (бот был выключен) схлопываются в один запуск. Если запуск
+   опоздал больше чем на max_lateness, он записывается как skipped.
+4. Уникальность (job, scheduled_for) не даёт выполнить слот дважды.
+   Запуск, застрявший в running дольше stale_after (реплика упала или
+   задача попросила повтор), перезапускается; уже обработанные элементы
+   отмечены в JobDelivery (ключ уникален в пределах задачи) и повторно не
+   обрабатываются, а с необработанных отметка снимается
+   (release_deliveries).
+5. ClaimedRun.previous_run_at — начало предыдущего запуска задачи:
+   задачи с «окнами» (напоминания по часовым поясам) обрабатывают
+   интервал (previous_run_at, сейчас], поэтому простой бота не теряет окна.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.utils import timezone
+
+from project.apps.core.models import JobDelivery, JobRun, ScheduledJob
+
+logger = logging.getLogger(__name__)
+
+# Ключ advisory-блокировки лидера планировщика
+_LEADER_LOCK_ID = 0x6A6F6273
+
+_MAX_ATTEMPTS = 3
+
+
+@dataclass(frozen=True)
+class DailyAt:
+    """Каждый день в hour:minute (UTC)."""
+
+    hour: int
+    minute: int = 0
+
+    def next_after(self, moment: datetime) -> datetime:
+        candidate = datetime.combine(
+            moment.astimezone(dt_timezone.utc).date(),
+            time(self.hour, self.minute),
+            tzinfo=dt_timezone.utc,
+        )
+        if candidate <= moment:
+            candidate += timedelta(days=1)
+        return candidate
+
+
+@dataclass(frozen=True)
+class Every:
+    """Каждые seconds секунд, слоты выровнены от начала эпохи."""
+
+    seconds: int
+
+    def next_after(self, moment: datetime) -> datetime:
+        timestamp = (int(moment.timestamp()) // self.seconds + 1) * self.seconds
+        return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    name: str
+    schedule: DailyAt | Every
+    max_lateness: timedelta = timedelta(hours=12)
+    stale_after: timedelta = timedelta(minutes=30)
+
+
+@dataclass(frozen=True)
+class ClaimedRun:
+    run_id: int
+    job_id: int
+    job_name: str
+    scheduled_for: datetime
+    attempt: int
+    previous_run_at: datetime | None = None
+
+
+class JobSchedulerService:
+
+    @staticmethod
+    @sync_to_async
+    def claim_due_runs(specs: list[JobSpec]) -> list[ClaimedRun]:
+        """Забирает запуски, которые пора выполнить этой реплике."""
+        specs_by_name = {spec.name: spec for spec in specs}
+        now = timezone.now()
+        claimed: list[ClaimedRun] = []
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", [_LEADER_LOCK_ID])
+                if not cursor.fetchone()[0]:
+                    return []
+
+            jobs = {job.name: job for job in ScheduledJob.objects.select_for_update()}
+            missing = [
+                ScheduledJob(name=spec.name, next_run_at=spec.schedule.next_after(now))
+                for spec in specs if spec.name not in jobs
+            ]
+            if missing:
+                ScheduledJob.objects.bulk_create(missing, ignore_conflicts=True)
+
+            for name, job in jobs.items():
+                spec = specs_by_name.get(name)
+                if spec is None or job.next_run_at > now:
+                    continue
+
+                slot = job.next_run_at
+                job.next_run_at = spec.schedule.next_after(now)
+                job.last_run_at = now
+                job.save(update_fields=["next_run_at", "last_run_at"])
+
+                if now - slot > spec.max_lateness:
+                    JobRun.objects.get_or_create(
+                        job=job,
+                        scheduled_for=slot,
+                        defaults={
+                            "status": JobRun.STATUS_SKIPPED,
+                            "started_at": now,
+                            "finished_at": now,
+                        },
+                    )
+                    logger.warning("Job %s: слот %s пропущен (опоздание %s)", name, slot, now - slot)
+                    continue
+
+                run, created = JobRun.objects.get_or_create(
+                    job=job,
+                    scheduled_for=slot,
+                    defaults={"started_at": now},
+                )
+                if created:
+                    claimed.append(_claimed(run, name))
+
+            # Запуски упавших реплик
+            for run in JobRun.objects.select_for_update().filter(
+                status=JobRun.STATUS_RUNNING,
+                job__name__in=specs_by_name,
+            ).select_related("job"):
+                spec = specs_by_name[run.job.name]
+                if run.started_at > now - spec.stale_after:
+                    continue
+                if run.attempt >= _MAX_ATTEMPTS:
+                    run.status = JobRun.STATUS_FAILED
+                    run.finished_at = now
+                    run.save(update_fields=["status", "finished_at"])
+                    continue
+                run.attempt += 1
+                run.started_at = now
+                run.save(update_fields=["attempt", "started_at"])
+                claimed.append(_claimed(run, run.job.name))
+
+        return claimed
+
+    @staticmethod
+    @sync_to_async
+    def prune_history(keep: timedelta) -> int:
+        """Удаляет завершённые запуски старше keep вместе с их доставками."""
+        deleted, _ = JobRun.objects.filter(
+            scheduled_for__lt=timezone.now() - keep,
+        ).exclude(status=JobRun.STATUS_RUNNING).delete()
+        return deleted
+
+    @staticmethod
+    async def finish_run(run_id: int, status: str, stats: dict | None = None) -> None:
+        await JobRun.objects.filter(id=run_id).aupdate(
+            status=status,
+            finished_at=timezone.now(),
+            stats=stats or {},
+        )
+
+    @staticmethod
+    @sync_to_async
+    def claim_deliveries(run: ClaimedRun, keys: list[str]) -> set[str]:
+        """Отмечает элементы как обработанные задачей (от имени запуска run).
+        Возвращает только те ключи, которые ещё не были отмечены —
+        их и нужно обработать."""
+        if not keys:
+            return set()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {JobDelivery._meta.db_table} (job_id, run_id, key, created_at)
+                SELECT %s, %s, unnest(%s::varchar[]), now()
+                ON CONFLICT ON CONSTRAINT unique_job_delivery_key DO NOTHING
+                RETURNING key
+                """,
+                [run.job_id, run.run_id, keys],
+            )
+            return {row[0] for row in cursor.fetchall()}
+
+    @staticmethod
+    @sync_to_async
+    def release_deliveries(run: ClaimedRun, keys: list[str]) -> None:
+        """Снимает отметки с элементов, которые не удалось обработать:
+        повтор запуска (или следующее окно) обработает их снова."""
+        if keys:
+            JobDelivery.objects.filter(job_id=run.job_id, run_id=run.run_id, key__in=keys).delete()
+
+
+def _claimed(run: JobRun, job_name: str) -> ClaimedRun:
+    previous_run_at = (
+        JobRun.objects.filter(job_id=run.job_id, scheduled_for__lt=run.scheduled_for)
+        .exclude(status=JobRun.STATUS_SKIPPED)
+        .order_by("-scheduled_for")
+        .values_list("started_at", flat=True)
+        .first()
+    )
+    return ClaimedRun(
+        run_id=run.id,
+        job_id=run.job_id,
+        job_name=job_name,
+        scheduled_for=run.scheduled_for,
+        attempt=run.attempt,
+        previous_run_at=previous_run_at,
+    )
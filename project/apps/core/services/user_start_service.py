@@ -1,20 +1,93 @@
-from asgiref.sync import sync_to_async
+"""Получение пользователя по Telegram-профилю с процессным кешем.
+
+Стратегия:
+1. Кеш tg_id → (User, профиль из Telegram) с LRU-вытеснением и TTL.
+2. Попадание в кеш не делает запросов к БД. Промах — один aget_or_create.
+3. Поля профиля (username, first_name, ...) обновляются в БД только если
+   Telegram прислал значения, отличные от последних увиденных.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+
+from django.db import IntegrityError
 
 from project.apps.core.models import User
 
+logger = logging.getLogger(__name__)
+
+_CACHE_MAX_SIZE = 10_000
+_CACHE_TTL_SECONDS = 10 * 60
+
+_PROFILE_FIELDS = ("username", "first_name", "last_name", "is_bot", "language_code")
+
+
+def _profile(tg_user) -> dict:
+    return {name: getattr(tg_user, name) for name in _PROFILE_FIELDS}
+
 
 class UserService:
-    @staticmethod
-    async def get_or_create_from_aiogram(tg_user):
+    # tg_id → (user, профиль, monotonic-время загрузки)
+    _cache: OrderedDict[int, tuple[User, dict, float]] = OrderedDict()
+
+    @classmethod
+    async def get_or_create_from_aiogram(cls, tg_user):
+        profile = _profile(tg_user)
+
+        cached = cls._cache.get(tg_user.id)
+        if cached is not None and time.monotonic() - cached[2] <= _CACHE_TTL_SECONDS:
+            user, seen_profile, loaded_at = cached
+            cls._cache.move_to_end(tg_user.id)
+            if profile != seen_profile:
+                await cls._sync_profile(user, profile)
+                cls._cache[tg_user.id] = (user, profile, loaded_at)
+            return user, False
+
         user, created = await User.objects.aget_or_create(
             tg_id=tg_user.id,
-            defaults={
-                "username": tg_user.username,
-                "first_name": tg_user.first_name,
-                "last_name": tg_user.last_name,
-                "is_bot": tg_user.is_bot,
-                "language_code": tg_user.language_code,
-            },
+            defaults=profile,
         )
+        if not created:
+            await cls._sync_profile(user, profile)
+        cls._remember(tg_user.id, user, profile)
         return user, created
 
+    @staticmethod
+    async def set_timezone(user: User, tz_name: str) -> None:
+        """Сохраняет часовой пояс; объект user — тот же, что лежит в кеше."""
+        await User.objects.filter(pk=user.pk).aupdate(timezone=tz_name)
+        user.timezone = tz_name
+
+    @classmethod
+    def invalidate(cls, tg_id: int | None = None) -> None:
+        """Сбрасывает кеш целиком или для одного пользователя."""
+        if tg_id is None:
+            cls._cache.clear()
+        else:
+            cls._cache.pop(tg_id, None)
+
+    @classmethod
+    def _remember(cls, tg_id: int, user: User, profile: dict) -> None:
+        cls._cache[tg_id] = (user, profile, time.monotonic())
+        cls._cache.move_to_end(tg_id)
+        while len(cls._cache) > _CACHE_MAX_SIZE:
+            cls._cache.popitem(last=False)
+
+    @staticmethod
+    async def _sync_profile(user: User, profile: dict) -> None:
+        """Записывает в БД только изменившиеся поля профиля."""
+        changed = {
+            name: value for name, value in profile.items()
+            if getattr(user, name) != value
+        }
+        if not changed:
+            return
+        try:
+            await User.objects.filter(pk=user.pk).aupdate(**changed)
+        except IntegrityError:
+            # username уникален: его может занимать устаревшая запись
+            logger.warning("Не удалось обновить профиль tg:%s: %s", user.tg_id, sorted(changed))
+            return
+        for name, value in changed.items():
+            setattr(user, name, value)
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db import transaction
 
 from project.apps.expenses.models import (
     Expense,
@@ -6,16 +7,46 @@ from project.apps.expenses.models import (
     Category,
     CategoryAlias,
     Income,
+    IncomeKeyword,
     PlannedExpense,
     SavingGoal,
     IncomeSchedule,
     VacationPeriod,
     MonthlyBudgetPlan,
+    DailyCategoryTotal,
 )
+from project.apps.expenses.services.daily_totals_service import DailyTotalsService
+
+
+class DailyTotalsTrackedAdmin(admin.ModelAdmin):
+    """Админка Expense/Income: правка суммы, категории, пользователя или
+    deleted_at и удаление записи переносятся в DailyCategoryTotal.
+    Если агрегат всё же разошёлся с записями — rebuild_daily_totals."""
+
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            if change:
+                previous = type(obj).objects.select_for_update().get(pk=obj.pk)
+                if not previous.is_deleted:
+                    DailyTotalsService.apply_sync([previous], sign=-1)
+            super().save_model(request, obj, form, change)
+            if not obj.is_deleted:
+                DailyTotalsService.apply_sync([obj])
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            if not obj.is_deleted:
+                DailyTotalsService.apply_sync([obj], sign=-1)
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            DailyTotalsService.apply_sync(queryset.filter(deleted_at__isnull=True), sign=-1)
+            super().delete_queryset(request, queryset)
 
 
 @admin.register(Expense)
-class ExpenseAdmin(admin.ModelAdmin):
+class ExpenseAdmin(DailyTotalsTrackedAdmin):
     list_display = [
         "id",
         "user",
@@ -61,7 +92,7 @@ class CategoryAliasAdmin(admin.ModelAdmin):
 
 
 @admin.register(Income)
-class IncomeAdmin(admin.ModelAdmin):
+class IncomeAdmin(DailyTotalsTrackedAdmin):
     list_display = [
         "id",
         "user",
@@ -75,6 +106,16 @@ class IncomeAdmin(admin.ModelAdmin):
     search_fields = ["user__username", "description"]
 
 
+@admin.register(IncomeKeyword)
+class IncomeKeywordAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "keyword",
+        "deleted_at",
+    ]
+    search_fields = ["keyword"]
+
+
 @admin.register(PlannedExpense)
 class PlannedExpenseAdmin(admin.ModelAdmin):
     list_display = [
@@ -143,3 +184,29 @@ class MonthlyBudgetPlanAdmin(admin.ModelAdmin):
         "carry_over_applied",
     ]
     list_filter = ["month", "carry_over_applied", "category"]
+
+
+@admin.register(DailyCategoryTotal)
+class DailyCategoryTotalAdmin(admin.ModelAdmin):
+    """Только просмотр: таблица производная, чинится командой rebuild_daily_totals."""
+
+    list_display = [
+        "id",
+        "user",
+        "day",
+        "category",
+        "kind",
+        "total",
+        "count",
+    ]
+    list_filter = ["kind", "day", "category"]
+    search_fields = ["user__username"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ExpensesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "project.apps.expenses"
+
+    def ready(self):
+        from project.apps.expenses import signals  # noqa: F401
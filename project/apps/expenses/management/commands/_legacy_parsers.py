@@ -0,0 +1,129 @@
+"""Реализации разбора сообщений до перехода на общий лексер (tokenizer.py).
+
+Используются только бенчмарком bench_parsers как точка отсчёта."""
+
+import re
+from decimal import Decimal, InvalidOperation
+
+_CURRENCY = r"(?P<cur>(?:₽|руб(?:\.|лей)?|r|rub)?)"
+
+AMOUNT_RE = re.compile(rf"(?P<sign>[+-]?)\s*(?P<num>\d[\d\s.,]*)\s*{_CURRENCY}", re.IGNORECASE)
+INCOME_PLUS_AMOUNT_RE = re.compile(rf"^\s*\+\s*(?P<num>\d[\d\s.,]*)\s*{_CURRENCY}", re.IGNORECASE)
+INCOME_AMOUNT_RE = re.compile(rf"(?P<num>\d[\d\s.,]*)\s*{_CURRENCY}", re.IGNORECASE)
+PURE_AMOUNT_RE = re.compile(r"^\s*(\d[\d\s.,]*)\s*(?:₽|руб\.?|rub)?\s*$", re.IGNORECASE)
+
+INCOME_KEYWORDS = (
+    "доход", "зарплата", "аванс", "приход", "получил", "получила", "заработал",
+    "заработала", "перевод", "премия", "гонорар", "возврат", "кэшбэк", "кешбэк", "cashback",
+)
+
+
+def normalize_number(raw: str) -> Decimal | None:
+    s = raw.replace("\xa0", " ").strip().replace(" ", "")
+    if "." in s and "," in s:
+        cand = "." if s.rfind(".") > s.rfind(",") else ","
+        tail = s.split(cand)[-1]
+        dec = cand if 1 <= len(tail) <= 2 else None
+    elif "." in s:
+        dec = "." if 1 <= len(s.split(".")[-1]) <= 2 else None
+    elif "," in s:
+        dec = "," if 1 <= len(s.split(",")[-1]) <= 2 else None
+    else:
+        dec = None
+    if dec:
+        other = "," if dec == "." else "."
+        s = s.replace(other, "").replace(dec, ".")
+    else:
+        s = s.replace(".", "").replace(",", "")
+    try:
+        return Decimal(s)
+    except InvalidOperation:
+        return None
+
+
+def _strip_match(line: str, match: re.Match) -> str:
+    start, end = match.span()
+    return (line[:start] + line[end:]).strip()
+
+
+def parse_expense(text: str) -> list[tuple[Decimal, str]]:
+    lines = [ln.strip() for ln in (text or "").splitlines()]
+    lines = [ln for ln in lines if ln]
+    results = []
+    for i, line in enumerate(lines):
+        m = AMOUNT_RE.search(line)
+        if not m:
+            continue
+        amount = normalize_number(m.group("num").strip())
+        if amount is None:
+            continue
+        if m.group("sign") == "-":
+            amount = abs(amount)
+        category = _strip_match(line, m)
+        if not category:
+            prev = lines[i - 1] if i - 1 >= 0 else ""
+            if prev and not AMOUNT_RE.search(prev):
+                category = prev
+            else:
+                nxt = lines[i + 1] if i + 1 < len(lines) else ""
+                if nxt and not AMOUNT_RE.search(nxt):
+                    category = nxt
+        results.append((amount, category or "Без категории"))
+    return results
+
+
+def is_income_message(text: str) -> bool:
+    if not text:
+        return False
+    stripped = text.strip()
+    if INCOME_PLUS_AMOUNT_RE.search(stripped):
+        return True
+    lowered = stripped.lower()
+    return any(keyword in lowered for keyword in INCOME_KEYWORDS)
+
+
+def _remove_income_keywords(text: str) -> str:
+    for keyword in INCOME_KEYWORDS:
+        text = re.sub(rf"\b{re.escape(keyword)}\b", "", text, flags=re.IGNORECASE)
+    return text.strip()
+
+
+def parse_income(text: str) -> list[tuple[Decimal, str]]:
+    if not is_income_message(text):
+        return []
+    results = []
+    for line in (ln.strip() for ln in (text or "").splitlines()):
+        if not line:
+            continue
+        m = INCOME_PLUS_AMOUNT_RE.search(line) or INCOME_AMOUNT_RE.search(line)
+        if not m:
+            continue
+        amount = normalize_number(m.group("num").strip())
+        if amount is None:
+            continue
+        description = _remove_income_keywords(_strip_match(line, m))
+        results.append((abs(amount), description or "Без описания"))
+    return results
+
+
+def parse_pure_amount(text: str) -> Decimal | None:
+    match = PURE_AMOUNT_RE.match(text.strip())
+    if not match:
+        return None
+    raw = match.group(1).replace("\xa0", "").replace(" ", "")
+    if "." in raw and "," in raw:
+        if raw.rfind(".") > raw.rfind(","):
+            raw = raw.replace(",", "")
+        else:
+            raw = raw.replace(".", "").replace(",", ".")
+    elif "," in raw:
+        tail = raw.split(",")[-1]
+        raw = raw.replace(",", ".") if 1 <= len(tail) <= 2 else raw.replace(",", "")
+    elif "." in raw:
+        if len(raw.split(".")[-1]) > 2:
+            raw = raw.replace(".", "")
+    try:
+        amount = Decimal(raw)
+        return amount if amount > 0 else None
+    except InvalidOperation:
+        return None
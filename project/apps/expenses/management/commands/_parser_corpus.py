@@ -0,0 +1,160 @@
+"""Генератор сообщений для bench_parsers и fuzz_parsers.
+
+Сообщения похожи на реальные: расходы одной строкой и чеками в
+несколько строк, суммы с разделителями тысяч, копейками и валютой,
+доходы с «+» и ключевыми словами, голые числа, даты. Генераторы
+возвращают вместе с текстом ожидаемый результат разбора, поэтому
+корпус годится и для бенчмарка, и для проверки свойств."""
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+# Без слов, начинающихся с «руб»/«r»: парсер принял бы начало слова
+# за валюту после суммы
+CATEGORIES = (
+    "кофе",
+    "такси",
+    "продукты",
+    "Пятёрочка",
+    "обед в столовой",
+    "аптека",
+    "бензин",
+    "коммуналка",
+    "интернет",
+    "мобильная связь",
+    "кино",
+    "подарок маме",
+    "Озон",
+    "парковка",
+    "химчистка",
+    "книги",
+    "спортзал",
+    "доставка еды",
+)
+
+INCOME_KEYWORDS = ("зарплата", "аванс", "премия", "доход", "кэшбэк", "получила", "перевод")
+
+INCOME_DESCRIPTIONS = ("", "", "от клиента", "за март", "Иван", "по вкладу")
+
+CURRENCIES = ("", "", "", " ₽", "₽", " руб", " руб.", "руб", " рублей", " rub")
+
+_GROUP_SEPARATORS = ("", "", " ", "\xa0", ".", ",")
+
+_MONTH_NAMES = (
+    ("января", "янв"),
+    ("февраля", "фев"),
+    ("марта", "мар"),
+    ("апреля", "апр"),
+    ("мая", "май"),
+    ("июня", "июн"),
+    ("июля", "июл"),
+    ("августа", "авг"),
+    ("сентября", "сен"),
+    ("октября", "окт"),
+    ("ноября", "ноя"),
+    ("декабря", "дек"),
+)
+
+
+def random_amount(rng: random.Random) -> Decimal:
+    scale = rng.choice((100, 1_000, 10_000, 100_000, 1_000_000))
+    whole = rng.randint(1, scale)
+    if rng.random() < 0.25:
+        return Decimal(f"{whole}.{rng.randint(0, 99):02d}")
+    return Decimal(whole)
+
+
+def format_amount(amount: Decimal, rng: random.Random) -> str:
+    """Записывает сумму так, как её пишут в чате: «1 234,50», «1.234», «1234.5»."""
+    whole, _, cents = f"{amount:f}".partition(".")
+    group = rng.choice(_GROUP_SEPARATORS)
+    if cents:
+        decimal_sep = rng.choice((",", ".")) if group not in (",", ".") else ("," if group == "." else ".")
+        if cents.endswith("0") and rng.random() < 0.5:
+            cents = cents[0]
+    if group and len(whole) > 3:
+        head = len(whole) % 3 or 3
+        whole = group.join([whole[:head]] + [whole[i:i + 3] for i in range(head, len(whole), 3)])
+    return f"{whole}{decimal_sep}{cents}" if cents else whole
+
+
+def expense_message(rng: random.Random) -> tuple[str, list[tuple[Decimal, str]]]:
+    """Расход одной строкой или чек из нескольких строк."""
+    expected = []
+    lines = []
+    for _ in range(rng.choice((1, 1, 1, 2, 3, 5))):
+        category = rng.choice(CATEGORIES)
+        amount = random_amount(rng)
+        written = format_amount(amount, rng) + rng.choice(CURRENCIES)
+        layout = rng.random()
+        if layout < 0.6:
+            lines.append(f"{category} {written}")
+        elif layout < 0.85:
+            lines.append(f"{written} {category}")
+        else:
+            lines.append(f"-{written} {category}")
+        expected.append((amount, category))
+    if len(lines) == 1 and rng.random() < 0.15:
+        # Название магазина строкой выше суммы
+        category = rng.choice(CATEGORIES)
+        amount = random_amount(rng)
+        lines = [category, format_amount(amount, rng) + rng.choice(CURRENCIES)]
+        expected = [(amount, category)]
+    return "\n".join(lines), expected
+
+
+def income_message(rng: random.Random) -> tuple[str, list[tuple[Decimal, str]]]:
+    """Доход с «+» или с ключевым словом."""
+    amount = random_amount(rng)
+    written = format_amount(amount, rng) + rng.choice(CURRENCIES)
+    description = rng.choice(INCOME_DESCRIPTIONS)
+    if rng.random() < 0.4:
+        text = f"+{written} {description}".strip()
+    else:
+        text = f"{rng.choice(INCOME_KEYWORDS)} {written} {description}".strip()
+    return text, [(amount, description or "Без описания")]
+
+
+def pure_amount_message(rng: random.Random) -> tuple[str, Decimal]:
+    amount = random_amount(rng)
+    return format_amount(amount, rng) + rng.choice(CURRENCIES), amount
+
+
+def date_message(rng: random.Random) -> tuple[str, date]:
+    """Дата в одном из форматов parse_user_date; год всегда указан явно."""
+    day = date(2020, 1, 1) + timedelta(days=rng.randint(0, 3_000))
+    full, short = _MONTH_NAMES[day.month - 1]
+    style = rng.randrange(4)
+    if style == 0:
+        text = f"{day.day:02d}.{day.month:02d}.{day.year}"
+    elif style == 1:
+        separator = rng.choice(".-/")
+        text = f"{day.day}{separator}{day.month}{separator}{day.year % 100:02d}"
+    elif style == 2:
+        text = f"{day.day} {full} {day.year}"
+    else:
+        text = f"{day.day} {short}{rng.choice(('', '.'))} {day.year}"
+    return text, day
+
+
+def build_corpus(size: int, seed: int = 0) -> list[str]:
+    """Смесь сообщений примерно в пропорциях реального трафика бота."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        kind = rng.random()
+        if kind < 0.65:
+            corpus.append(expense_message(rng)[0])
+        elif kind < 0.85:
+            corpus.append(income_message(rng)[0])
+        elif kind < 0.95:
+            corpus.append(pure_amount_message(rng)[0])
+        else:
+            corpus.append(rng.choice(CATEGORIES))
+    return corpus
+
+
+def build_date_corpus(size: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [date_message(rng)[0] for _ in range(size)]
@@ -0,0 +1,125 @@
+import random
+import time
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from project.apps.expenses.models import Category, CategoryAlias
+from project.apps.expenses.services.category_index import CategorySnapshot
+from project.apps.expenses.services.category_service import CategoryService, _pg_trgm_installed
+
+_LETTERS = "абвгдеёжзийклмнопрстуфхцчшщыэюя"
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _random_word(rng: random.Random) -> str:
+    return "".join(rng.choice(_LETTERS) for _ in range(rng.randint(5, 12)))
+
+
+def _typo(word: str, rng: random.Random) -> str:
+    """Одна правка: перестановка соседних букв, замена, вставка или удаление."""
+    i = rng.randrange(len(word) - 1)
+    kind = rng.randrange(4)
+    if kind == 0:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if kind == 1:
+        return word[:i] + rng.choice(_LETTERS) + word[i + 1:]
+    if kind == 2:
+        return word[:i] + rng.choice(_LETTERS) + word[i:]
+    return word[:i] + word[i + 1:]
+
+
+class Command(BaseCommand):
+    help = (
+        "Бенчмарк поиска категории: p50/p95 на точных названиях, названиях с "
+        "опечаткой и неизвестных словах на синтетическом наборе алиасов. "
+        "С --pg дополнительно меряет поиск через pg_trgm; данные вставляются "
+        "в транзакции и откатываются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--categories", type=int, default=200, help="Сколько категорий сгенерировать")
+        parser.add_argument("--aliases", type=int, default=10_000, help="Сколько алиасов сгенерировать")
+        parser.add_argument("--queries", type=int, default=2_000, help="Запросов каждого вида")
+        parser.add_argument("--seed", type=int, default=0, help="Seed генератора")
+        parser.add_argument("--pg", action="store_true", help="Сравнить с поиском через pg_trgm")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        names = list({_random_word(rng).title() for _ in range(options["categories"])})
+        aliases = list({_random_word(rng).title() for _ in range(options["aliases"])} - set(names))
+        targets = [rng.randrange(len(names)) for _ in aliases]
+
+        snapshot = CategorySnapshot()
+        categories = [Category(id=i + 1, name=name) for i, name in enumerate(names)]
+        for category in categories:
+            snapshot.add_category(category)
+        for alias, target in zip(aliases, targets):
+            snapshot.add_alias(alias, categories[target])
+
+        keys = names + aliases
+        queries = {
+            "точное": [rng.choice(keys) for _ in range(options["queries"])],
+            "опечатка": [_typo(rng.choice(keys), rng) for _ in range(options["queries"])],
+            "неизвестное": [_random_word(rng).title() for _ in range(options["queries"])],
+        }
+
+        self.stdout.write(f"Категорий {len(names)}, алиасов {len(aliases)}, по {options['queries']} запросов")
+        self._report("память", queries, lambda text: CategoryService._match_in_index(snapshot, text))
+
+        if options["pg"]:
+            self._bench_pg(names, aliases, targets, queries)
+
+    def _bench_pg(self, names, aliases, targets, queries) -> None:
+        if connection.vendor != "postgresql":
+            raise CommandError("Режим --pg рассчитан на PostgreSQL.")
+        if not _pg_trgm_installed():
+            self.stdout.write(self.style.WARNING("Расширение pg_trgm не установлено — режим --pg пропущен."))
+            return
+
+        try:
+            with transaction.atomic():
+                categories = Category.objects.bulk_create([Category(name=f"{name}Бенч") for name in names])
+                CategoryAlias.objects.bulk_create(
+                    [
+                        CategoryAlias(alias=alias, category=categories[target])
+                        for alias, target in zip(aliases, targets)
+                    ]
+                )
+                with connection.cursor() as cursor:
+                    cursor.execute(f"ANALYZE {CategoryAlias._meta.db_table}")
+                snapshot = CategorySnapshot()
+                for category in categories:
+                    snapshot.add_category(category)
+
+                # Только нечёткий шаг: точные и частичные совпадения ищутся в памяти в любом режиме
+                fuzzy = {label: texts for label, texts in queries.items() if label != "точное"}
+                self._report(
+                    "pg_trgm",
+                    fuzzy,
+                    lambda text: async_to_sync(CategoryService._match_trigram_db)(snapshot, text),
+                )
+                raise _Rollback
+        except _Rollback:
+            self.stdout.write("Тестовые данные откачены.")
+
+    def _report(self, label: str, queries: dict[str, list[str]], match) -> None:
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n── {label} ──"))
+        for kind, texts in queries.items():
+            timings = []
+            found = 0
+            for text in texts:
+                started = time.perf_counter()
+                result = match(text)
+                timings.append((time.perf_counter() - started) * 1_000_000)
+                found += result is not None
+            timings.sort()
+            self.stdout.write(
+                f"{kind:<12} p50 {timings[len(timings) // 2]:>8.1f} µs  "
+                f"p95 {timings[int(len(timings) * 0.95)]:>8.1f} µs  "
+                f"найдено {found}/{len(texts)}"
+            )
@@ -0,0 +1,117 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from bot.services.date_parser import parse_user_date
+from project.apps.expenses.management.commands import _legacy_parsers as legacy
+from project.apps.expenses.management.commands._parser_corpus import build_corpus, build_date_corpus
+from project.apps.expenses.services.expense_parser import ExpenseParser
+from project.apps.expenses.services.income_parser import IncomeParser
+from project.apps.expenses.services.tokenizer import parse_pure_amount, tokenize
+
+
+def _cold(func):
+    # Кеш лексера сбрасывается перед каждым вызовом:
+    # измеряется разбор сообщения, которое ещё не встречалось
+    def wrapper(text):
+        tokenize.cache_clear()
+        return func(text)
+    return wrapper
+
+
+def _handler_pipeline(text):
+    # Порядок вызовов в save_expense_or_income: голое число,
+    # проверка на доход, затем parse в хендлере и в сервисе
+    tokenize.cache_clear()
+    if parse_pure_amount(text) is not None:
+        return
+    if IncomeParser.is_income_message(text):
+        IncomeParser.parse(text)
+    else:
+        ExpenseParser.parse(text)
+        ExpenseParser.parse(text)
+
+
+def _legacy_pipeline(text):
+    if legacy.parse_pure_amount(text) is not None:
+        return
+    if legacy.is_income_message(text):
+        legacy.parse_income(text)
+    else:
+        legacy.parse_expense(text)
+        legacy.parse_expense(text)
+
+
+class Command(BaseCommand):
+    help = (
+        "Бенчмарк разбора сообщений на синтетическом корпусе (_parser_corpus): "
+        "сообщений в секунду и память на сообщение для ExpenseParser, IncomeParser, "
+        "parse_pure_amount и parse_user_date, а также сравнение с реализацией "
+        "до общего лексера (_legacy_parsers)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=5_000, help="Размер корпуса")
+        parser.add_argument("--repeat", type=int, default=5, help="Сколько раз прогнать корпус")
+        parser.add_argument("--seed", type=int, default=0, help="Seed генератора корпуса")
+        parser.add_argument("--no-legacy", action="store_true", help="Не сравнивать с прежней реализацией")
+
+    def handle(self, *args, **options):
+        corpus = build_corpus(options["messages"], options["seed"])
+        dates = build_date_corpus(options["messages"], options["seed"])
+        repeat = options["repeat"]
+
+        cases = (
+            ("ExpenseParser.parse", corpus, _cold(ExpenseParser.parse), legacy.parse_expense),
+            ("IncomeParser.parse", corpus, _cold(IncomeParser.parse), legacy.parse_income),
+            ("is_income_message", corpus, _cold(IncomeParser.is_income_message), legacy.is_income_message),
+            ("parse_pure_amount", corpus, _cold(parse_pure_amount), legacy.parse_pure_amount),
+            ("хендлер целиком", corpus, _handler_pipeline, _legacy_pipeline),
+            ("parse_user_date", dates, parse_user_date, None),
+        )
+
+        self.stdout.write(f"Корпус: {len(corpus)} сообщений × {repeat} прогонов, seed {options['seed']}")
+        self.stdout.write(
+            f"{'':<20} {'msg/s':>10} {'µs/msg':>8} {'байт/msg':>9} {'было µs/msg':>12} {'было байт/msg':>14}"
+        )
+        for label, messages, func, before in cases:
+            after_us = self._measure(func, messages, repeat)
+            line = (
+                f"{label:<20} {1_000_000 / after_us:>10,.0f} {after_us:>8.2f} "
+                f"{self._peak_bytes(func, messages):>9,.0f}"
+            )
+            if before is not None and not options["no_legacy"]:
+                before_us = self._measure(before, messages, repeat)
+                line += (
+                    f" {before_us:>12.2f} {self._peak_bytes(before, messages):>14,.0f}"
+                    f"  (×{before_us / after_us:.2f})"
+                )
+            self.stdout.write(line)
+
+    @staticmethod
+    def _measure(func, messages: list[str], repeat: int) -> float:
+        """Лучшее из repeat прогонов, микросекунд на сообщение."""
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for text in messages:
+                func(text)
+            best = min(best, time.perf_counter() - started)
+        return best / len(messages) * 1_000_000
+
+    @staticmethod
+    def _peak_bytes(func, messages: list[str], sample: int = 1_000) -> float:
+        """Средний пик памяти, выделенной на разбор одного сообщения (tracemalloc)."""
+        messages = messages[:sample]
+        total = 0
+        tracemalloc.start()
+        try:
+            for text in messages:
+                baseline = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                func(text)
+                total += tracemalloc.get_traced_memory()[1] - baseline
+        finally:
+            tracemalloc.stop()
+        return total / len(messages)
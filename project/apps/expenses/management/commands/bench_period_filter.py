@@ -0,0 +1,108 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.db.models.functions import Abs
+
+from project.apps.core.models import User
+from project.apps.expenses.models import Expense
+from project.apps.expenses.services.period_filter import in_period
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Бенчмарк фильтра по периоду: сравнивает план и время запроса "
+        "created_at__date__gte/lte и полуоткрытого диапазона in_period(). "
+        "Тестовые данные вставляются в транзакции и откатываются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=2_000_000, help="Сколько расходов сгенерировать")
+        parser.add_argument("--users", type=int, default=1_000, help="Между сколькими пользователями распределить")
+        parser.add_argument("--days", type=int, default=730, help="Глубина истории в днях")
+        parser.add_argument("--repeat", type=int, default=5, help="Сколько раз выполнить каждый запрос")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Бенчмарк рассчитан на PostgreSQL (нужны generate_series и EXPLAIN ANALYZE).")
+
+        try:
+            with transaction.atomic():
+                user_id = self._seed(options["rows"], options["users"], options["days"])
+                self._compare(user_id, options["repeat"])
+                raise _Rollback
+        except _Rollback:
+            self.stdout.write("Тестовые данные откачены.")
+
+    def _seed(self, rows: int, users: int, days: int) -> int:
+        self.stdout.write(f"Генерация {users} пользователей и {rows} расходов за {days} дн...")
+        base_tg_id = -10_000_000_000
+        created_users = User.objects.bulk_create(
+            [
+                User(tg_id=base_tg_id - i, username=f"bench_period_{i}", password="")
+                for i in range(users)
+            ]
+        )
+        user_ids = [user.id for user in created_users]
+
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {Expense._meta.db_table}
+                    (created_at, updated_at, add_attr, amount, user_id)
+                SELECT ts, ts, '{{}}'::jsonb, round((random() * 5000)::numeric, 2), (%s::bigint[])[1 + g %% %s]
+                FROM (
+                    SELECT g, now() - (random() * %s) * interval '1 day' AS ts
+                    FROM generate_series(1, %s) AS g
+                ) AS series
+                """,
+                [user_ids, users, days, rows],
+            )
+            cursor.execute(f"ANALYZE {Expense._meta.db_table}")
+        self.stdout.write(f"Вставлено за {time.perf_counter() - started:.1f}s")
+        return user_ids[0]
+
+    def _compare(self, user_id: int, repeat: int) -> None:
+        date_to = date.today()
+        date_from = date_to.replace(day=1) - timedelta(days=60)
+
+        legacy = Expense.objects.filter(
+            user_id=user_id,
+            deleted_at__isnull=True,
+            created_at__date__gte=date_from,
+            created_at__date__lte=date_to,
+        )
+        sargable = Expense.objects.filter(
+            in_period(date_from, date_to),
+            user_id=user_id,
+            deleted_at__isnull=True,
+        )
+
+        for label, queryset in (("created_at__date", legacy), ("in_period", sargable)):
+            plan = queryset.values("category_id").annotate(total=Sum(Abs("amount"))).explain(
+                analyze=True,
+                buffers=True,
+            )
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                queryset.aggregate(total=Sum(Abs("amount")))
+                timings.append((time.perf_counter() - started) * 1000)
+
+            range_scan = any(
+                "Index Cond" in line and "created_at" in line
+                for line in plan.splitlines()
+            )
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n── {label} ──"))
+            self.stdout.write(plan)
+            self.stdout.write(
+                f"range scan по created_at: {'да' if range_scan else 'нет'}; "
+                f"median {sorted(timings)[len(timings) // 2]:.2f} ms, min {min(timings):.2f} ms"
+            )
@@ -0,0 +1,42 @@
+import time
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand, CommandError
+
+from project.apps.core.models import User
+from project.apps.core.services.family_group_service import FamilyGroupService
+from project.apps.expenses.services.export_service import EXPORT_FORMATS, FORMAT_CSV, ExportService
+
+
+class Command(BaseCommand):
+    help = (
+        "Выгрузить расходы и доходы пользователя (или всех участников его групп) "
+        "в CSV/XLSX. Записи читаются server-side курсором и пишутся в файл "
+        "потоково, память не зависит от их числа."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tg-id", type=int, required=True, help="Telegram ID пользователя")
+        parser.add_argument("--family", action="store_true", help="Записи всех участников групп пользователя")
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default=FORMAT_CSV, help="Формат файла")
+        parser.add_argument("--output", default=None, help="Путь к файлу (по умолчанию export_<tg_id>.<формат>)")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(tg_id=options["tg_id"]).first()
+        if user is None:
+            raise CommandError(f"Пользователь с tg_id {options['tg_id']} не найден")
+
+        user_ids = [user.id]
+        if options["family"]:
+            user_ids = async_to_sync(FamilyGroupService.get_group_member_ids)(user) or user_ids
+
+        export_format = options["format"]
+        path = options["output"] or f"export_{user.tg_id}.{export_format}"
+        started = time.perf_counter()
+        count = ExportService.export_to_file(path, user, user_ids, export_format)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Выгружено {count} записей ({len(user_ids)} польз.) в {path} "
+                f"за {time.perf_counter() - started:.1f}s"
+            )
+        )
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from project.apps.core.models import User
+from project.apps.expenses.services.statement_import import StatementFormatError, StatementImporter
+
+
+class Command(BaseCommand):
+    help = (
+        "Импортировать банковскую выписку (CSV) пользователю. Файл читается "
+        "потоково, записи вставляются пачками; уже загруженные операции "
+        "пропускаются по хешу содержимого, повторный запуск безопасен."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tg-id", type=int, required=True, help="Telegram ID пользователя")
+        parser.add_argument("--file", required=True, help="Путь к CSV-выписке")
+        parser.add_argument("--chat-id", type=int, default=None, help="Chat ID для записей (по умолчанию пусто)")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(tg_id=options["tg_id"]).first()
+        if user is None:
+            raise CommandError(f"Пользователь с tg_id {options['tg_id']} не найден")
+
+        def progress(rows: int, done: float) -> None:
+            self.stdout.write(f"  {rows} строк ({done:.0%})")
+
+        started = time.perf_counter()
+        try:
+            result = StatementImporter(user, chat_id=options["chat_id"], progress=progress).run(options["file"])
+        except StatementFormatError as error:
+            raise CommandError(str(error))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Импортировано: расходов {result.expenses}, доходов {result.incomes}; "
+                f"дубликатов {result.duplicates}, пропущено {result.skipped} "
+                f"за {time.perf_counter() - started:.1f}s"
+            )
+        )
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from project.apps.expenses.services.daily_totals_service import DailyTotalsService
+
+
+class Command(BaseCommand):
+    help = "Пересобрать дневные агрегаты DailyCategoryTotal из расходов и доходов"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user-id", type=int, default=None, help="Пересобрать только для одного пользователя")
+
+    def handle(self, *args, **options):
+        user_id = options["user_id"]
+        started = time.perf_counter()
+        rows = DailyTotalsService.rebuild_sync(user_id)
+        scope = f"пользователя {user_id}" if user_id is not None else "всех пользователей"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Агрегаты для {scope} пересобраны: {rows} строк за {time.perf_counter() - started:.1f}s"
+            )
+        )
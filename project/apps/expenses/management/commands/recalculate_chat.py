@@ -0,0 +1,81 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from project.apps.expenses.services.recalculate_chat import (
+    BACKFILL_BATCH_SIZE,
+    BackfillResult,
+    ChatBackfill,
+    ChatExportError,
+    bot_id_from_token,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитать чат: добавить расходы и доходы из сообщений, которые не были "
+        "сохранены. Источник — JSON-экспорт чата из Telegram Desktop. Прогресс "
+        "сохраняется в файл-чекпоинт: прерванный запуск продолжается с места остановки."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "chat_id",
+            type=int,
+            help=(
+                "ID чата для пересчёта (как в Bot API). В супергруппах (-100…) уже сохранённые "
+                "сообщения узнаются по message_id, в личных чатах и обычных группах — "
+                "по автору, времени и тексту: там номера сообщений у бота и в экспорте разные"
+            ),
+        )
+        parser.add_argument("--file", required=True, help="Путь к result.json из экспорта чата")
+        parser.add_argument(
+            "--checkpoint",
+            default=None,
+            help="Файл чекпоинта (по умолчанию <file>.<chat_id>.checkpoint.json)",
+        )
+        parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE, help="Сообщений в пачке")
+        parser.add_argument(
+            "--bot-id",
+            type=int,
+            action="append",
+            default=[],
+            help="Telegram ID бота, чьи сообщения пропустить (можно несколько; id из BOT_TOKEN добавляется сам)",
+        )
+
+    def handle(self, *args, **options):
+        bot_ids = set(options["bot_id"])
+        token_bot_id = bot_id_from_token(os.getenv("BOT_TOKEN"))
+        if token_bot_id is not None:
+            bot_ids.add(token_bot_id)
+        if not bot_ids:
+            self.stderr.write("⚠️ BOT_TOKEN не задан и --bot-id не указан: отчёты бота в чате не отличить от расходов")
+
+        def progress(result: BackfillResult) -> None:
+            self.stdout.write(
+                f"  до сообщения {result.last_message_id}: "
+                f"+{result.expenses} расходов, +{result.incomes} доходов"
+            )
+
+        backfill = ChatBackfill(
+            options["chat_id"],
+            options["file"],
+            checkpoint_path=options["checkpoint"],
+            batch_size=options["batch_size"],
+            progress=progress,
+            bot_ids=bot_ids,
+        )
+        self.stdout.write(f"🔄 Пересчитываем чат {options['chat_id']} (чекпоинт {backfill.checkpoint_path})...")
+        started = time.perf_counter()
+        try:
+            result = backfill.run()
+        except (ChatExportError, FileNotFoundError) as error:
+            raise CommandError(str(error))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Добавлено расходов {result.expenses}, доходов {result.incomes}; "
+                f"уже были {result.known}, пропущено {result.skipped} сообщений "
+                f"за {time.perf_counter() - started:.1f}s"
+            )
+        )
@@ -0,0 +1,98 @@
+"""Добавляет дневной агрегат DailyCategoryTotal и заполняет его
+из существующих расходов и доходов."""
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_daily_totals(apps, schema_editor):
+    tz_name = settings.TIME_ZONE
+    with schema_editor.connection.cursor() as cursor:
+        for table, kind in (
+            ("expenses_expense", "expense"),
+            ("expenses_income", "income"),
+        ):
+            cursor.execute(
+                f"""
+                INSERT INTO expenses_dailycategorytotal (user_id, day, category_id, kind, total, count)
+                SELECT user_id, (created_at AT TIME ZONE %s)::date, category_id, %s,
+                       SUM(ABS(amount)), COUNT(*)
+                FROM {table}
+                WHERE deleted_at IS NULL
+                GROUP BY 1, 2, 3
+                """,
+                [tz_name, kind],
+            )
+
+
+def noop_reverse(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("expenses", "0012_income_planned_expense_saving_goal_income_schedule_vacation_period_monthly_budget_plan"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyCategoryTotal",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField(verbose_name="День")),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("expense", "Расход"), ("income", "Доход")],
+                        max_length=10,
+                        verbose_name="Тип",
+                    ),
+                ),
+                ("total", models.DecimalField(decimal_places=2, default=Decimal("0.00"), max_digits=14, verbose_name="Сумма")),
+                ("count", models.IntegerField(default=0, verbose_name="Количество записей")),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="NULL = без категории",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_totals",
+                        to="expenses.category",
+                        verbose_name="Категория",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_category_totals",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Дневной итог по категории",
+                "verbose_name_plural": "Дневные итоги по категориям",
+                "ordering": ["-day"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="dailycategorytotal",
+            index=models.Index(fields=["user", "kind", "day"], name="expenses_dct_user_kind_day_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="dailycategorytotal",
+            constraint=models.UniqueConstraint(
+                fields=("user", "day", "category", "kind"),
+                name="unique_daily_category_total",
+                nulls_distinct=False,
+            ),
+        ),
+        migrations.RunPython(backfill_daily_totals, noop_reverse),
+    ]
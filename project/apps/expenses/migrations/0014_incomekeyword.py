@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("expenses", "0013_dailycategorytotal"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IncomeKeyword",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="Дата обновления")),
+                ("deleted_at", models.DateTimeField(blank=True, null=True, verbose_name="Дата удаления")),
+                ("add_attr", models.JSONField(blank=True, default=dict, verbose_name="Доп. данные")),
+                (
+                    "keyword",
+                    models.CharField(
+                        help_text="Регистр не важен; должно начинаться с буквы",
+                        max_length=50,
+                        unique=True,
+                        verbose_name="Ключевое слово",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Ключевое слово дохода",
+                "verbose_name_plural": "Ключевые слова дохода",
+                "ordering": ["keyword"],
+            },
+        ),
+    ]
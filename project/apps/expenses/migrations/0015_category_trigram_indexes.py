@@ -0,0 +1,51 @@
+"""GIN-индексы pg_trgm по lower(name) категорий и lower(alias) алиасов
+для CATEGORY_FUZZY_BACKEND=pg_trgm.
+
+Расширение необязательное: если его нет среди доступных или у пользователя
+БД нет прав на CREATE EXTENSION, миграция ничего не делает, а нечёткий
+поиск работает в памяти процесса."""
+
+from django.db import DatabaseError, migrations, transaction
+
+
+def create_trigram_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm')")
+        if not cursor.fetchone()[0]:
+            return
+        try:
+            with transaction.atomic(using=connection.alias):
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS expenses_category_name_trgm_idx
+                    ON expenses_category USING gin (lower(name) gin_trgm_ops);
+                """)
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS expenses_categoryalias_alias_trgm_idx
+                    ON expenses_categoryalias USING gin (lower(alias) gin_trgm_ops);
+                """)
+        except DatabaseError:
+            pass
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("DROP INDEX IF EXISTS expenses_categoryalias_alias_trgm_idx;")
+        cursor.execute("DROP INDEX IF EXISTS expenses_category_name_trgm_idx;")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("expenses", "0014_incomekeyword"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
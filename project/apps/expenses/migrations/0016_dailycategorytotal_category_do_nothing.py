@@ -0,0 +1,25 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("expenses", "0015_category_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="dailycategorytotal",
+            name="category",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="NULL = без категории",
+                null=True,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="daily_totals",
+                to="expenses.category",
+                verbose_name="Категория",
+            ),
+        ),
+    ]
@@ -3,11 +3,13 @@ from project.apps.expenses.models.category_alias import CategoryAlias
 from project.apps.expenses.models.expenses import Expense
 from project.apps.expenses.models.budget import Budget
 from project.apps.expenses.models.income import Income
+from project.apps.expenses.models.income_keyword import IncomeKeyword
 from project.apps.expenses.models.planned_expense import PlannedExpense
 from project.apps.expenses.models.saving_goal import SavingGoal
 from project.apps.expenses.models.income_schedule import IncomeSchedule
 from project.apps.expenses.models.vacation_period import VacationPeriod
 from project.apps.expenses.models.monthly_budget_plan import MonthlyBudgetPlan
+from project.apps.expenses.models.daily_category_total import DailyCategoryTotal
 
 __all__ = [
     "Category",
@@ -15,9 +17,11 @@ __all__ = [
     "Expense",
     "Budget",
     "Income",
+    "IncomeKeyword",
     "PlannedExpense",
     "SavingGoal",
     "IncomeSchedule",
     "VacationPeriod",
     "MonthlyBudgetPlan",
+    "DailyCategoryTotal",
 ]
@@ -0,0 +1,101 @@
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.conf import settings
+
+
+class DailyCategoryTotal(models.Model):
+    """Дневной агрегат расходов/доходов пользователя по категории.
+
+    Производная таблица: поддерживается инкрементально сервисом
+    DailyTotalsService при создании, мягком удалении и восстановлении
+    Expense/Income, при правке и удалении их в админке и при удалении
+    категории (сигнал pre_delete). Любое изменение записей мимо этих путей
+    (SQL, queryset.update) агрегат не видит — тогда его нужно пересобрать
+    командой rebuild_daily_totals. Не наследует BaseModelMixin — мягкое
+    удаление и add_attr для неё не имеют смысла."""
+
+    KIND_EXPENSE = "expense"
+    KIND_INCOME = "income"
+    KIND_CHOICES = (
+        (KIND_EXPENSE, "Расход"),
+        (KIND_INCOME, "Доход"),
+    )
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="daily_category_totals",
+        verbose_name="Пользователь",
+    )
+    day = models.DateField(
+        verbose_name="День",
+    )
+    # DO_NOTHING: строки категории перед её удалением переносятся в
+    # «без категории» (signals.detach_category_totals), каскад их бы стёр
+    category = models.ForeignKey(
+        "expenses.Category",
+        on_delete=models.DO_NOTHING,
+        null=True,
+        blank=True,
+        related_name="daily_totals",
+        verbose_name="Категория",
+        help_text="NULL = без категории",
+    )
+    kind = models.CharField(
+        max_length=10,
+        choices=KIND_CHOICES,
+        verbose_name="Тип",
+    )
+    total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal("0.00"),
+        verbose_name="Сумма",
+    )
+    count = models.IntegerField(
+        default=0,
+        verbose_name="Количество записей",
+    )
+
+    class Meta:
+        verbose_name = "Дневной итог по категории"
+        verbose_name_plural = "Дневные итоги по категориям"
+        ordering = ["-day"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "day", "category", "kind"],
+                name="unique_daily_category_total",
+                nulls_distinct=False,
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["user", "kind", "day"], name="expenses_dct_user_kind_day_idx"),
+        ]
+
+    def __str__(self):
+        category_label = self.category or "Без категории"
+        return f"{self.user} | {self.day} | {category_label} ({self.kind}): {self.total} ₽"
+
+
+class DailyTotalTrackedMixin:
+    """Поддерживает DailyCategoryTotal при мягком удалении и восстановлении.
+    Подмешивается к Expense и Income перед BaseModelMixin."""
+
+    def soft_delete(self):
+        from project.apps.expenses.services.daily_totals_service import DailyTotalsService
+
+        if self.is_deleted:
+            return
+        with transaction.atomic():
+            super().soft_delete()
+            DailyTotalsService.apply_sync([self], sign=-1)
+
+    def restore(self):
+        from project.apps.expenses.services.daily_totals_service import DailyTotalsService
+
+        if not self.is_deleted:
+            return
+        with transaction.atomic():
+            super().restore()
+            DailyTotalsService.apply_sync([self], sign=1)
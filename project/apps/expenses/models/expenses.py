@@ -2,9 +2,10 @@ from django.db import models
 from django.conf import settings
 
 from project.apps.core.models.base_model_mixin import BaseModelMixin
+from project.apps.expenses.models.daily_category_total import DailyTotalTrackedMixin
 
 
-class Expense(BaseModelMixin):
+class Expense(DailyTotalTrackedMixin, BaseModelMixin):
 
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -2,9 +2,10 @@ from django.db import models
 from django.conf import settings
 
 from project.apps.core.models.base_model_mixin import BaseModelMixin
+from project.apps.expenses.models.daily_category_total import DailyTotalTrackedMixin
 
 
-class Income(BaseModelMixin):
+class Income(DailyTotalTrackedMixin, BaseModelMixin):
     """Доход пользователя. Хранится отдельно от расходов (Expense),
     чтобы избежать путаницы знаков и упростить аналитику."""
 
@@ -0,0 +1,36 @@
+from django.core.exceptions import ValidationError
+from django.db import models
+
+from project.apps.core.models.base_model_mixin import BaseModelMixin
+
+
+class IncomeKeyword(BaseModelMixin):
+    """Дополнительное ключевое слово-маркер дохода.
+
+    Дополняет встроенный список INCOME_KEYWORDS (services/tokenizer.py):
+    сообщение, содержащее слово, считается доходом, а само слово
+    убирается из описания. Бот загружает слова при старте
+    (IncomeKeywordRegistry)."""
+
+    keyword = models.CharField(
+        max_length=50,
+        unique=True,
+        verbose_name="Ключевое слово",
+        help_text="Регистр не важен; должно начинаться с буквы",
+    )
+
+    class Meta:
+        verbose_name = "Ключевое слово дохода"
+        verbose_name_plural = "Ключевые слова дохода"
+        ordering = ["keyword"]
+
+    def clean(self):
+        super().clean()
+        self.keyword = (self.keyword or "").strip().lower()
+        if not self.keyword[:1].isalpha():
+            raise ValidationError(
+                {"keyword": "Ключевое слово должно начинаться с буквы."}
+            )
+
+    def __str__(self):
+        return self.keyword
@@ -0,0 +1,34 @@
+"""Пакетная вставка записей с датой из прошлого (импорт выписок, бэкфилл чата).
+
+created_at у моделей — auto_now_add: bulk_create всегда пишет текущее
+время. Поэтому записи вставляются bulk_create, а затем одним UPDATE ...
+FROM unnest(...) получают исходные даты; дневные агрегаты обновляются
+уже по ним. Всё — в одной транзакции, два запроса на пачку."""
+
+from django.db import connection, transaction
+
+from project.apps.expenses.models import Expense, Income
+from project.apps.expenses.services.daily_totals_service import DailyTotalsService
+
+
+def bulk_create_backdated(model: type[Expense] | type[Income], records: list[Expense | Income]) -> list:
+    """Вставляет записи с их created_at и обновляет дневные агрегаты."""
+    if not records:
+        return []
+    created_at = [record.created_at for record in records]
+    with transaction.atomic():
+        created = model.objects.bulk_create(records)
+        for record, value in zip(created, created_at):
+            record.created_at = value
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {model._meta.db_table} AS record
+                SET created_at = data.created_at
+                FROM unnest(%s::bigint[], %s::timestamptz[]) AS data(id, created_at)
+                WHERE record.id = data.id
+                """,
+                [[record.id for record in created], created_at],
+            )
+        DailyTotalsService.apply_sync(created)
+    return created
@@ -4,17 +4,17 @@ from decimal import Decimal
 
 from asgiref.sync import sync_to_async
 from django.db.models import Sum
-from django.db.models.functions import Abs
 
 from project.apps.core.models import User
 from project.apps.expenses.models import (
     Budget,
-    Expense,
+    DailyCategoryTotal,
     MonthlyBudgetPlan,
     PlannedExpense,
     VacationPeriod,
     Category,
 )
+from project.apps.expenses.services.daily_totals_service import DailyTotalsService
 
 
 @dataclass(frozen=True)
@@ -154,19 +154,10 @@ class BudgetPlanningService:
         else:
             effective_limit = plan.effective_limit
 
-        # Считаем фактически потраченное
-        expense_filter = {
-            "user": user,
-            "deleted_at__isnull": True,
-            "created_at__date__gte": month_first_day,
-            "created_at__date__lte": month_end,
-        }
-        if category:
-            expense_filter["category"] = category
-
-        spent = Expense.objects.filter(**expense_filter).aggregate(
-            total=Sum(Abs("amount"))
-        )["total"] or Decimal("0.00")
+        # Считаем фактически потраченное (по дневным агрегатам)
+        spent = DailyTotalsService.total_sync(
+            user.id, DailyCategoryTotal.KIND_EXPENSE, month_first_day, month_end, category,
+        )
 
         # Считаем плановые траты до конца месяца
         planned_filter = {
@@ -215,24 +206,9 @@ class BudgetPlanningService:
         if not plan:
             return None
 
-        spent = Expense.objects.filter(
-            user=user,
-            category=category if category else None,
-            deleted_at__isnull=True,
-            created_at__date__gte=from_first,
-            created_at__date__lte=from_end,
+        total_spent = DailyTotalsService.total_sync(
+            user.id, DailyCategoryTotal.KIND_EXPENSE, from_first, from_end, category,
         )
-        if not category:
-            spent = Expense.objects.filter(
-                user=user,
-                deleted_at__isnull=True,
-                created_at__date__gte=from_first,
-                created_at__date__lte=from_end,
-            )
-
-        total_spent = spent.aggregate(
-            total=Sum(Abs("amount"))
-        )["total"] or Decimal("0.00")
 
         carry_over = plan.effective_limit - total_spent
 
@@ -321,14 +297,9 @@ class BudgetPlanningService:
         else:
             effective_limit = plan.effective_limit
 
-        total_spent = Expense.objects.filter(
-            user=user,
-            deleted_at__isnull=True,
-            created_at__date__gte=month_first,
-            created_at__date__lte=today,
-        ).aggregate(
-            total=Sum(Abs("amount"))
-        )["total"] or Decimal("0.00")
+        total_spent = DailyTotalsService.total_sync(
+            user.id, DailyCategoryTotal.KIND_EXPENSE, month_first, today,
+        )
 
         expected_pace = effective_limit / days_in_month * days_passed
         remaining_budget = effective_limit - total_spent
@@ -3,11 +3,10 @@ from datetime import date
 from decimal import Decimal
 
 from asgiref.sync import sync_to_async
-from django.db.models import Sum
-from django.db.models.functions import Abs, TruncMonth
 
 from project.apps.core.models import User
-from project.apps.expenses.models import Expense, Income
+from project.apps.expenses.models import DailyCategoryTotal
+from project.apps.expenses.services.daily_totals_service import DailyTotalsService
 
 
 @dataclass(frozen=True)
@@ -50,27 +49,13 @@ class CashflowService:
         date_from: date | None = None,
         date_to: date | None = None,
     ) -> CashflowSummary:
-        income_queryset = Income.objects.filter(user=user, deleted_at__isnull=True)
-        expense_queryset = Expense.objects.filter(user=user, deleted_at__isnull=True)
-
-        if date_from:
-            income_queryset = income_queryset.filter(created_at__date__gte=date_from)
-            expense_queryset = expense_queryset.filter(created_at__date__gte=date_from)
-        if date_to:
-            income_queryset = income_queryset.filter(created_at__date__lte=date_to)
-            expense_queryset = expense_queryset.filter(created_at__date__lte=date_to)
-
-        total_income = income_queryset.aggregate(
-            total=Sum("amount")
-        )["total"] or Decimal("0.00")
-
-        total_expense = expense_queryset.aggregate(
-            total=Sum(Abs("amount"))
-        )["total"] or Decimal("0.00")
-
         return CashflowSummary(
-            total_income=total_income,
-            total_expense=total_expense,
+            total_income=DailyTotalsService.total_sync(
+                user.id, DailyCategoryTotal.KIND_INCOME, date_from, date_to,
+            ),
+            total_expense=DailyTotalsService.total_sync(
+                user.id, DailyCategoryTotal.KIND_EXPENSE, date_from, date_to,
+            ),
         )
 
     @staticmethod
@@ -80,35 +65,15 @@ class CashflowService:
         date_from: date | None = None,
         date_to: date | None = None,
     ) -> list[MonthlyCashflowRow]:
-        income_queryset = Income.objects.filter(user=user, deleted_at__isnull=True)
-        expense_queryset = Expense.objects.filter(user=user, deleted_at__isnull=True)
-
-        if date_from:
-            income_queryset = income_queryset.filter(created_at__date__gte=date_from)
-            expense_queryset = expense_queryset.filter(created_at__date__gte=date_from)
-        if date_to:
-            income_queryset = income_queryset.filter(created_at__date__lte=date_to)
-            expense_queryset = expense_queryset.filter(created_at__date__lte=date_to)
-
-        income_by_month = {
-            row["month"]: row["total"]
-            for row in income_queryset.annotate(
-                month=TruncMonth("created_at")
-            ).values("month").annotate(total=Sum("amount")).order_by("month")
-        }
-
-        expense_by_month = {
-            row["month"]: row["total"]
-            for row in expense_queryset.annotate(
-                month=TruncMonth("created_at")
-            ).values("month").annotate(total=Sum(Abs("amount"))).order_by("month")
-        }
+        monthly = DailyTotalsService.monthly_totals_sync(user.id, date_from, date_to)
+        income_by_month = monthly[DailyCategoryTotal.KIND_INCOME]
+        expense_by_month = monthly[DailyCategoryTotal.KIND_EXPENSE]
 
         all_months = sorted(set(income_by_month) | set(expense_by_month))
 
         return [
             MonthlyCashflowRow(
-                month=month.date() if hasattr(month, "date") else month,
+                month=month,
                 income=income_by_month.get(month, Decimal("0.00")),
                 expense=expense_by_month.get(month, Decimal("0.00")),
             )
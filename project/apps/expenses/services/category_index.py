@@ -0,0 +1,176 @@
+"""Процессный индекс категорий и алиасов для CategoryService.match.
+
+Стратегия:
+1. При старте бота вызывается load() — категории и алиасы загружаются в память.
+2. Точные совпадения ищутся по нормализованным словарям (O(1)).
+3. Частичные совпадения (аналог icontains) ищутся через триграммный
+   инвертированный индекс: кандидаты — пересечение постингов триграмм
+   запроса, затем проверка подстроки.
+4. Названия с опечаткой ищутся нечётко (fuzzy_match.FuzzyIndex) по
+   объединённому набору имён категорий и алиасов.
+5. Любое изменение категорий/алиасов через CategoryService вызывает
+   invalidate(); кроме того, снимок устаревает через _TTL_SECONDS, чтобы
+   подхватывать правки из админки (другой процесс).
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+
+from project.apps.expenses.models import Category, CategoryAlias
+from project.apps.expenses.services.fuzzy_match import FuzzyIndex
+
+logger = logging.getLogger(__name__)
+
+_TTL_SECONDS = 300
+
+
+def normalize_key(text: str) -> str:
+    """Ключ для сравнения без учёта регистра (аналог iexact/icontains)."""
+    return (text or "").strip().lower()
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+@dataclass
+class _SubstringIndex:
+    """Триграммный индекс для поиска ключей, содержащих подстроку."""
+    keys: list[str] = field(default_factory=list)
+    postings: dict[str, set[int]] = field(default_factory=dict)
+
+    def add(self, key: str) -> None:
+        position = len(self.keys)
+        self.keys.append(key)
+        for trigram in _trigrams(key):
+            self.postings.setdefault(trigram, set()).add(position)
+
+    def first_containing(self, needle: str) -> str | None:
+        """Возвращает минимальный (в алфавитном порядке) ключ, содержащий needle.
+        Порядок совпадает с ordering моделей, поэтому результат тот же,
+        что и у прежнего `.filter(...__icontains=...).afirst()`."""
+        if not needle:
+            return None
+
+        if len(needle) < 3:
+            candidates = range(len(self.keys))
+        else:
+            postings = sorted(
+                (self.postings.get(trigram, set()) for trigram in _trigrams(needle)),
+                key=len,
+            )
+            if not postings or not postings[0]:
+                return None
+            candidates = set.intersection(*postings)
+
+        matches = [self.keys[i] for i in candidates if needle in self.keys[i]]
+        return min(matches) if matches else None
+
+
+@dataclass
+class CategorySnapshot:
+    """Неизменяемый (после сборки) срез категорий и алиасов."""
+    by_id: dict[int, Category] = field(default_factory=dict)
+    by_name: dict[str, Category] = field(default_factory=dict)
+    by_alias: dict[str, Category] = field(default_factory=dict)
+    names: _SubstringIndex = field(default_factory=_SubstringIndex)
+    aliases: _SubstringIndex = field(default_factory=_SubstringIndex)
+    # Имена и алиасы вместе: ключ → категория (имя важнее алиаса)
+    fuzzy: FuzzyIndex = field(default_factory=FuzzyIndex)
+    fuzzy_targets: dict[str, Category] = field(default_factory=dict)
+    loaded_at: float = field(default_factory=time.monotonic)
+
+    def add_category(self, category: Category) -> None:
+        key = normalize_key(category.name)
+        if key not in self.by_name:
+            self.names.add(key)
+        self.by_name[key] = category
+        self.by_id[category.id] = category
+        self._add_fuzzy(key, category, override=True)
+
+    def add_alias(self, alias: str, category: Category) -> None:
+        key = normalize_key(alias)
+        if key not in self.by_alias:
+            self.aliases.add(key)
+        self.by_alias[key] = category
+        self._add_fuzzy(key, category, override=False)
+
+    def _add_fuzzy(self, key: str, category: Category, override: bool) -> None:
+        if key not in self.fuzzy_targets:
+            self.fuzzy.add(key)
+        elif not override:
+            return
+        self.fuzzy_targets[key] = category
+
+    def find_by_name(self, text: str) -> Category | None:
+        return self.by_name.get(normalize_key(text))
+
+    def find_by_alias(self, text: str) -> Category | None:
+        return self.by_alias.get(normalize_key(text))
+
+    def find_alias_containing(self, text: str) -> Category | None:
+        key = self.aliases.first_containing(normalize_key(text))
+        return self.by_alias[key] if key is not None else None
+
+    def find_name_containing(self, text: str) -> Category | None:
+        key = self.names.first_containing(normalize_key(text))
+        return self.by_name[key] if key is not None else None
+
+    def find_fuzzy(self, text: str) -> tuple[Category, float] | None:
+        """Категория, на имя или алиас которой text похож с опечаткой, и уверенность."""
+        found = self.fuzzy.find(normalize_key(text))
+        if found is None:
+            return None
+        key, score = found
+        return self.fuzzy_targets[key], score
+
+
+class CategoryIndex:
+    """Кеш категорий/алиасов на уровне процесса."""
+
+    _snapshot: CategorySnapshot | None = None
+
+    @classmethod
+    async def load(cls) -> CategorySnapshot:
+        """Загружает все категории и алиасы двумя запросами."""
+        snapshot = CategorySnapshot()
+
+        categories_by_id = {}
+        async for category in Category.objects.all().order_by("name"):
+            categories_by_id[category.id] = category
+            snapshot.add_category(category)
+
+        alias_count = 0
+        async for alias, category_id in CategoryAlias.objects.values_list("alias", "category_id"):
+            category = categories_by_id.get(category_id)
+            if category is not None:
+                snapshot.add_alias(alias, category)
+                alias_count += 1
+
+        cls._snapshot = snapshot
+        logger.info(
+            "CategoryIndex: загружено %d категорий, %d алиасов",
+            len(categories_by_id),
+            alias_count,
+        )
+        return snapshot
+
+    @classmethod
+    async def get(cls) -> CategorySnapshot:
+        """Возвращает актуальный снимок, перезагружая его при необходимости."""
+        snapshot = cls._snapshot
+        if snapshot is None or time.monotonic() - snapshot.loaded_at > _TTL_SECONDS:
+            snapshot = await cls.load()
+        return snapshot
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Сбрасывает снимок — следующий get() перечитает БД."""
+        cls._snapshot = None
+
+    @classmethod
+    def remember_alias(cls, alias: str, category: Category) -> None:
+        """Добавляет только что созданный алиас в текущий снимок без перезагрузки."""
+        if cls._snapshot is not None:
+            cls._snapshot.add_alias(alias, category)
@@ -0,0 +1,179 @@
+"""Персональные предсказания категории по истории пользователя.
+
+Стратегия:
+1. Для пользователя строится таблица частот: текст категории из сообщения
+   (в нижнем регистре) → {id категории: вес}. Источник — последние
+   _HISTORY_LIMIT расходов и доходов: у расходов текст лежит в
+   add_attr["category_text"] (старые записи разбираются из raw_text),
+   у доходов — в description.
+2. Таблицы хранятся в процессном кеше на _CACHE_MAX_SIZE пользователей
+   с LRU-вытеснением и TTL. Промах — два запроса к БД. Из той же таблицы
+   считается (и запоминается до её изменения) список самых частых
+   категорий пользователя для кнопок вопроса о неизвестной категории.
+3. Новые записи (observe) и ответы на вопрос о неизвестной категории
+   (learn) дописываются в загруженную таблицу без перезагрузки; ответ
+   пользователя весит _ANSWER_WEIGHT сохранений. Записи, категория которых
+   угадана нечётко (опечатка), в историю не идут: вызывающий код их не
+   передаёт в observe, а в БД у них есть add_attr[CATEGORY_CONFIDENCE_ATTR],
+   и _load их пропускает.
+4. Предсказание выдаётся, если у лидирующей категории вес не меньше
+   _MIN_WEIGHT и доля не меньше _MIN_SHARE. «Прочее» не запоминается:
+   туда попадает всё нераспознанное, это не выбор пользователя.
+"""
+
+import logging
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+
+from project.apps.expenses.models import Category, Expense, Income
+from project.apps.expenses.services.category_index import normalize_key
+from project.apps.expenses.services.expense_parser import ExpenseParser
+
+logger = logging.getLogger(__name__)
+
+_CACHE_MAX_SIZE = 5_000
+_CACHE_TTL_SECONDS = 30 * 60
+_HISTORY_LIMIT = 500
+
+_ANSWER_WEIGHT = 3.0
+_MIN_WEIGHT = 2.0
+_MIN_SHARE = 0.75
+
+_OTHER_CATEGORY = "Прочее"
+
+# Ключ add_attr с уверенностью нечёткого совпадения категории (< 1)
+CATEGORY_CONFIDENCE_ATTR = "category_confidence"
+
+# Тексты-заглушки парсеров: категория по ним не угадывается
+_PLACEHOLDERS = {"без категории", "без описания"}
+
+# текст → {id категории: вес}
+Table = dict[str, dict[int, float]]
+
+
+@dataclass
+class _UserHistory:
+    table: Table
+    loaded_at: float = field(default_factory=time.monotonic)
+    # id категорий по убыванию суммарного веса; None — пересчитать
+    top: list[int] | None = None
+
+
+class UserCategoryPredictor:
+    _cache: OrderedDict[int, _UserHistory] = OrderedDict()
+
+    @classmethod
+    async def predict(cls, user_id: int, text: str) -> tuple[int, float] | None:
+        """id категории и её доля в истории пользователя либо None."""
+        weights = (await cls._history(user_id)).table.get(normalize_key(text))
+        if not weights:
+            return None
+        category_id, weight = max(weights.items(), key=lambda item: item[1])
+        share = weight / sum(weights.values())
+        if weight < _MIN_WEIGHT or share < _MIN_SHARE:
+            return None
+        return category_id, share
+
+    @classmethod
+    async def top_categories(cls, user_id: int, limit: int) -> list[int]:
+        """id самых частых категорий пользователя, не больше limit."""
+        history = await cls._history(user_id)
+        if history.top is None:
+            totals = Counter()
+            for weights in history.table.values():
+                totals.update(weights)
+            history.top = [category_id for category_id, _ in totals.most_common()]
+        return history.top[:limit]
+
+    @classmethod
+    def observe(cls, user_id: int, text: str, category: Category | None) -> None:
+        """Учитывает только что сохранённую запись."""
+        cls._add(user_id, text, category, 1.0)
+
+    @classmethod
+    def learn(cls, user_id: int, text: str, category: Category) -> None:
+        """Учитывает ответ на вопрос о неизвестной категории. В БД ответ
+        остаётся глобальным алиасом, вес живёт до перезагрузки таблицы."""
+        cls._add(user_id, text, category, _ANSWER_WEIGHT)
+
+    @classmethod
+    def invalidate(cls, user_id: int | None = None) -> None:
+        """Сбрасывает кеш целиком или для одного пользователя."""
+        if user_id is None:
+            cls._cache.clear()
+        else:
+            cls._cache.pop(user_id, None)
+
+    @classmethod
+    def _add(cls, user_id: int, text: str, category: Category | None, weight: float) -> None:
+        history = cls._cache.get(user_id)
+        if history is None or category is None or category.name == _OTHER_CATEGORY:
+            return
+        _bump(history.table, text, category.id, weight)
+        history.top = None
+
+    @classmethod
+    async def _history(cls, user_id: int) -> _UserHistory:
+        history = cls._cache.get(user_id)
+        if history is not None and time.monotonic() - history.loaded_at <= _CACHE_TTL_SECONDS:
+            cls._cache.move_to_end(user_id)
+            return history
+
+        history = _UserHistory(table=await cls._load(user_id))
+        cls._cache[user_id] = history
+        cls._cache.move_to_end(user_id)
+        while len(cls._cache) > _CACHE_MAX_SIZE:
+            cls._cache.popitem(last=False)
+        return history
+
+    @staticmethod
+    async def _load(user_id: int) -> Table:
+        table: Table = {}
+        expenses = Expense.objects.filter(
+            user_id=user_id,
+            deleted_at__isnull=True,
+            category__isnull=False,
+        ).exclude(
+            category__name=_OTHER_CATEGORY,
+        ).order_by("-created_at").values_list("category_id", "amount", "add_attr")[:_HISTORY_LIMIT]
+        async for category_id, amount, add_attr in expenses:
+            if CATEGORY_CONFIDENCE_ATTR in add_attr:
+                continue
+            text = add_attr.get("category_text")
+            if text is None:
+                text = _category_text_from_raw(add_attr.get("raw_text"), amount)
+            if text:
+                _bump(table, text, category_id, 1.0)
+
+        incomes = Income.objects.filter(
+            user_id=user_id,
+            deleted_at__isnull=True,
+            category__isnull=False,
+        ).exclude(
+            category__name=_OTHER_CATEGORY,
+        ).order_by("-created_at").values_list("category_id", "description", "add_attr")[:_HISTORY_LIMIT]
+        async for category_id, description, add_attr in incomes:
+            if CATEGORY_CONFIDENCE_ATTR not in (add_attr or {}):
+                _bump(table, description, category_id, 1.0)
+
+        logger.debug("UserCategoryPredictor: user %s — %d текстов", user_id, len(table))
+        return table
+
+
+def _bump(table: Table, text: str, category_id: int, weight: float) -> None:
+    key = normalize_key(text)
+    if key and key not in _PLACEHOLDERS:
+        weights = table.setdefault(key, {})
+        weights[category_id] = weights.get(category_id, 0.0) + weight
+
+
+def _category_text_from_raw(raw_text: str | None, amount) -> str | None:
+    """Текст категории для записи, созданной до add_attr["category_text"]:
+    строка исходного сообщения с той же суммой."""
+    if not raw_text:
+        return None
+    for item_amount, category_text in ExpenseParser.parse(raw_text):
+        if abs(item_amount) == amount:
+            return category_text
+    return None
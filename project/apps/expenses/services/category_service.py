@@ -1,6 +1,25 @@
+import logging
 from dataclasses import dataclass
+from typing import Iterable
 
-from project.apps.expenses.models import Category, CategoryAlias
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+
+from project.apps.expenses.models import Category, CategoryAlias, Expense, Income
+from project.apps.expenses.services.category_index import CategoryIndex, CategorySnapshot, normalize_key
+from project.apps.expenses.services.category_predictor import CATEGORY_CONFIDENCE_ATTR, UserCategoryPredictor
+from project.apps.expenses.services.fuzzy_match import FUZZY_CANDIDATES, best_match
+
+logger = logging.getLogger(__name__)
+
+FUZZY_BACKEND_MEMORY = "memory"
+FUZZY_BACKEND_PG_TRGM = "pg_trgm"
+FUZZY_BACKEND_OFF = "off"
+
+# Порог pg_trgm-похожести для отбора кандидатов в режиме pg_trgm
+# (окончательное решение принимает best_match, как и в памяти)
+PG_TRGM_SIMILARITY_THRESHOLD = 0.2
 
 
 @dataclass
@@ -9,6 +28,25 @@ class CategoryMatchResult:
     category: Category
     is_exact_match: bool
     fell_back_to_other: bool  # True = категория неизвестна, попала в «Прочее»
+    confidence: float = 1.0  # < 1 — найдено нечётко (опечатка) или предсказано
+    predicted: bool = False  # True = категория взята из истории пользователя
+
+    @property
+    def is_guess(self) -> bool:
+        """Категория найдена нечётко (опечатка): в историю пользователя не идёт."""
+        return not (self.is_exact_match or self.fell_back_to_other) and self.confidence < 1.0
+
+    def record_attrs(self) -> dict:
+        """Поля add_attr записи с этой категорией: у догадки — её уверенность."""
+        return {CATEGORY_CONFIDENCE_ATTR: round(self.confidence, 3)} if self.is_guess else {}
+
+
+@dataclass
+class IngestedRecord:
+    """Запись, созданная из сообщения, и то, как для неё нашлась категория."""
+    record: Expense | Income
+    category_text: str
+    match: CategoryMatchResult
 
 
 class CategoryService:
@@ -19,49 +57,174 @@ class CategoryService:
         return result.category
 
     @staticmethod
-    async def match(name: str) -> CategoryMatchResult:
-        """Ищет категорию с подробным результатом матчинга."""
-        normalized = name.strip().title()
+    async def match(name: str, user_id: int | None = None) -> CategoryMatchResult:
+        """Ищет категорию с подробным результатом матчинга.
+
+        Поиск идёт по процессному индексу (CategoryIndex), поэтому в обычном
+        случае не делает ни одного запроса к БД. Запись в БД происходит только
+        при создании нового алиаса или категории «Прочее»."""
+        results = await CategoryService.match_many([name], user_id)
+        return results[name]
 
+    @staticmethod
+    async def match_many(
+        names: Iterable[str],
+        user_id: int | None = None,
+        persist_aliases: bool = True,
+    ) -> dict[str, CategoryMatchResult]:
+        """Матчит несколько названий за один проход.
+
+        Ключ результата — исходная строка. Новые алиасы создаются одним
+        bulk-запросом, «Прочее» запрашивается не более одного раза.
+        С user_id сначала проверяется история пользователя (UserCategoryPredictor).
+        persist_aliases=False — для массового импорта: тексты вроде описаний
+        банковских операций не становятся общими алиасами."""
+        index = await CategoryIndex.get()
+        backend = await CategoryService._fuzzy_backend()
+        results: dict[str, CategoryMatchResult | None] = {}
+        new_aliases: dict[str, Category] = {}
+
+        for name in names:
+            if name in results:
+                continue
+            normalized = name.strip().title()
+            if user_id is not None:
+                result = await CategoryService._predict(index, user_id, normalized)
+                if result:
+                    results[name] = result
+                    continue
+            result = CategoryService._match_in_index(
+                index,
+                normalized,
+                fuzzy=backend == FUZZY_BACKEND_MEMORY,
+            )
+            if result is None and backend == FUZZY_BACKEND_PG_TRGM:
+                result = await CategoryService._match_trigram_db(index, normalized)
+            # Нечёткое совпадение (опечатка) — догадка: в общий для всех
+            # пользователей алиас она не превращается
+            if result and not result.is_exact_match and result.confidence >= 1.0:
+                new_aliases.setdefault(normalized, result.category)
+            results[name] = result
+
+        if new_aliases and persist_aliases:
+            await CategoryAlias.objects.abulk_create(
+                [CategoryAlias(alias=alias, category=category) for alias, category in new_aliases.items()],
+                ignore_conflicts=True,
+            )
+            for alias, category in new_aliases.items():
+                CategoryIndex.remember_alias(alias, category)
+
+        if any(result is None for result in results.values()):
+            # Fallback → «Прочее»
+            other = index.find_by_name("Прочее")
+            if other is None:
+                other, _ = await Category.objects.aget_or_create(name="Прочее")
+                CategoryIndex.invalidate()
+            fallback = CategoryMatchResult(
+                category=other,
+                is_exact_match=False,
+                fell_back_to_other=True,
+                confidence=0.0,
+            )
+            results = {name: result or fallback for name, result in results.items()}
+
+        return results
+
+    @staticmethod
+    def _match_in_index(
+        index: CategorySnapshot,
+        normalized: str,
+        fuzzy: bool = True,
+    ) -> CategoryMatchResult | None:
+        """Матчинг по снимку без обращений к БД. None — категория неизвестна."""
         # 1. Точное совпадение по имени
-        category = await Category.objects.filter(name__iexact=normalized).afirst()
+        category = index.find_by_name(normalized)
         if category:
             return CategoryMatchResult(category=category, is_exact_match=True, fell_back_to_other=False)
 
         # 2. Точное совпадение по алиасу
-        alias = await CategoryAlias.objects.filter(
-            alias__iexact=normalized
-        ).select_related("category").afirst()
-        if alias:
-            return CategoryMatchResult(category=alias.category, is_exact_match=True, fell_back_to_other=False)
+        category = index.find_by_alias(normalized)
+        if category:
+            return CategoryMatchResult(category=category, is_exact_match=True, fell_back_to_other=False)
 
         # 3. Частичное совпадение по алиасу → создаём новый алиас
-        alias = await CategoryAlias.objects.filter(
-            alias__icontains=normalized
-        ).select_related("category").afirst()
-        if alias:
-            await CategoryAlias.objects.aget_or_create(alias=normalized, category=alias.category)
-            return CategoryMatchResult(category=alias.category, is_exact_match=False, fell_back_to_other=False)
-
         # 4. Частичное совпадение по имени категории → создаём алиас
-        category = await Category.objects.filter(name__icontains=normalized).afirst()
+        category = index.find_alias_containing(normalized) or index.find_name_containing(normalized)
         if category:
-            await CategoryAlias.objects.aget_or_create(alias=normalized, category=category)
             return CategoryMatchResult(category=category, is_exact_match=False, fell_back_to_other=False)
 
-        # 5. Fallback → «Прочее»
-        category = await Category.objects.filter(name__iexact="Прочее").afirst()
-        if category:
-            return CategoryMatchResult(category=category, is_exact_match=False, fell_back_to_other=True)
+        # 5. Похоже на имя или алиас с опечаткой → алиас не создаём
+        found = index.find_fuzzy(normalized) if fuzzy else None
+        if found:
+            category, score = found
+            return CategoryMatchResult(
+                category=category,
+                is_exact_match=False,
+                fell_back_to_other=False,
+                confidence=score,
+            )
+
+        return None
+
+    @staticmethod
+    async def _predict(index: CategorySnapshot, user_id: int, normalized: str) -> CategoryMatchResult | None:
+        """Категория, которую пользователь обычно выбирает для этого текста."""
+        prediction = await UserCategoryPredictor.predict(user_id, normalized)
+        if prediction is None:
+            return None
+        category_id, share = prediction
+        category = index.by_id.get(category_id)
+        if category is None:
+            return None
+        return CategoryMatchResult(
+            category=category,
+            is_exact_match=True,
+            fell_back_to_other=False,
+            confidence=share,
+            predicted=True,
+        )
 
-        category = await Category.objects.acreate(name="Прочее")
-        return CategoryMatchResult(category=category, is_exact_match=False, fell_back_to_other=True)
+    # None — ещё не проверяли, есть ли в БД расширение pg_trgm
+    _pg_trgm_available: bool | None = None
+
+    @classmethod
+    async def _fuzzy_backend(cls) -> str:
+        """Режим нечёткого поиска из settings.CATEGORY_FUZZY_BACKEND.
+        Если pg_trgm выбран, но расширение не установлено, — поиск в памяти."""
+        backend = getattr(settings, "CATEGORY_FUZZY_BACKEND", FUZZY_BACKEND_MEMORY)
+        if backend != FUZZY_BACKEND_PG_TRGM:
+            return backend
+        if cls._pg_trgm_available is None:
+            cls._pg_trgm_available = await sync_to_async(_pg_trgm_installed)()
+            if not cls._pg_trgm_available:
+                logger.warning("CATEGORY_FUZZY_BACKEND=pg_trgm, но расширение pg_trgm не установлено: поиск в памяти")
+        return FUZZY_BACKEND_PG_TRGM if cls._pg_trgm_available else FUZZY_BACKEND_MEMORY
+
+    @staticmethod
+    async def _match_trigram_db(index: CategorySnapshot, normalized: str) -> CategoryMatchResult | None:
+        """Нечёткий поиск через GIN-индексы pg_trgm — для больших наборов алиасов."""
+        query = normalize_key(normalized)
+        candidates = await sync_to_async(_trigram_candidates)(query)
+        found = best_match(query, [key for key, _ in candidates])
+        if found is None:
+            return None
+        key, score = found
+        category = index.by_id.get(dict(candidates)[key])
+        if category is None:
+            return None
+        return CategoryMatchResult(
+            category=category,
+            is_exact_match=False,
+            fell_back_to_other=False,
+            confidence=score,
+        )
 
     @staticmethod
     async def create_category(name: str) -> Category:
         """Создаёт новую категорию."""
         normalized = name.strip().title()
         category, _ = await Category.objects.aget_or_create(name=normalized)
+        CategoryIndex.invalidate()
         return category
 
     @staticmethod
@@ -72,6 +235,7 @@ class CategoryService:
             alias=normalized,
             category=category,
         )
+        CategoryIndex.invalidate()
         return alias
 
     @staticmethod
@@ -79,6 +243,23 @@ class CategoryService:
         """Возвращает все категории для выбора."""
         return [cat async for cat in Category.objects.all().order_by("name")]
 
+    @staticmethod
+    async def get_top_categories(user_id: int, limit: int) -> list[Category]:
+        """Самые частые категории пользователя (из кеша UserCategoryPredictor),
+        дополненные остальными по алфавиту. «Прочее» не входит."""
+        index = await CategoryIndex.get()
+        top = [
+            index.by_id[category_id]
+            for category_id in await UserCategoryPredictor.top_categories(user_id, limit)
+            if category_id in index.by_id
+        ]
+        for category in index.by_name.values():
+            if len(top) >= limit:
+                break
+            if category not in top and category.name != "Прочее":
+                top.append(category)
+        return top
+
     @staticmethod
     async def get_expense_categories() -> list[Category]:
         """Категории, которые использовались в расходах."""
@@ -114,15 +295,13 @@ class CategoryService:
         """Создаёт категорию с точным именем или находит существующую.
         В отличие от get_or_create, не делает fuzzy-match через алиасы."""
         normalized = name.strip().title()
-        category = await Category.objects.filter(name__iexact=normalized).afirst()
+        index = await CategoryIndex.get()
+        category = index.find_by_name(normalized) or index.find_by_alias(normalized)
         if category:
             return category
-        alias = await CategoryAlias.objects.filter(
-            alias__iexact=normalized
-        ).select_related("category").afirst()
-        if alias:
-            return alias.category
-        category, _ = await Category.objects.aget_or_create(name=normalized)
+        category, created = await Category.objects.aget_or_create(name=normalized)
+        if created:
+            CategoryIndex.invalidate()
         return category
 
     @staticmethod
@@ -131,16 +310,52 @@ class CategoryService:
         normalized = new_name.strip().title()
         category.name = normalized
         await category.asave(update_fields=["name"])
+        CategoryIndex.invalidate()
         return category
 
     @staticmethod
     async def delete_category(category: Category) -> bool:
-        """Удаляет категорию и её алиасы. Записи НЕ удаляются."""
+        """Удаляет категорию и её алиасы. Записи НЕ удаляются —
+        их дневные агрегаты переносятся в «без категории»
+        (сигнал pre_delete, см. signals.detach_category_totals)."""
         await CategoryAlias.objects.filter(category=category).adelete()
         await category.adelete()
+        CategoryIndex.invalidate()
         return True
 
     @staticmethod
     async def category_exists(name: str) -> bool:
         """Проверяет, существует ли категория с таким именем."""
         return await Category.objects.filter(name__iexact=name.strip().title()).aexists()
+
+
+def _pg_trgm_installed() -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+        return cursor.fetchone()[0]
+
+
+def _trigram_candidates(query: str) -> list[tuple[str, int]]:
+    """Имена и алиасы, похожие на query по pg_trgm: (ключ в нижнем регистре, id категории)."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT set_config('pg_trgm.similarity_threshold', %s, true)",
+            [str(PG_TRGM_SIMILARITY_THRESHOLD)],
+        )
+        cursor.execute(
+            f"""
+            SELECT key, category_id FROM (
+                SELECT lower(alias) AS key, category_id
+                FROM {CategoryAlias._meta.db_table}
+                WHERE lower(alias) %% %s
+                UNION ALL
+                SELECT lower(name), id
+                FROM {Category._meta.db_table}
+                WHERE lower(name) %% %s
+            ) AS candidates
+            ORDER BY similarity(key, %s) DESC, key
+            LIMIT %s
+            """,
+            [query, query, query, FUZZY_CANDIDATES],
+        )
+        return cursor.fetchall()
@@ -0,0 +1,211 @@
+"""Поддержка дневных агрегатов DailyCategoryTotal.
+
+Запись: каждое создание/мягкое удаление/восстановление Expense или Income
+превращается в upsert «total += amount, count += 1» (или со знаком минус)
+по ключу (user, day, category, kind). День считается в текущей таймзоне
+Django — так же, как в period_filter.in_period.
+
+Чтение: отчёты и бюджеты суммируют по дням, а не по сырым записям,
+поэтому годовой отчёт — это сотни строк агрегата вместо десятков тысяч.
+"""
+
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Iterable
+
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from project.apps.expenses.models import Category, DailyCategoryTotal, Expense, Income
+
+_TABLE = DailyCategoryTotal._meta.db_table
+_CONSTRAINT = "unique_daily_category_total"
+
+_UPSERT_SQL = f"""
+    INSERT INTO {_TABLE} (user_id, day, category_id, kind, total, count)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON CONFLICT ON CONSTRAINT {_CONSTRAINT} DO UPDATE
+    SET total = {_TABLE}.total + EXCLUDED.total,
+        count = {_TABLE}.count + EXCLUDED.count
+"""
+
+
+def kind_of(record: Expense | Income) -> str:
+    if isinstance(record, Income):
+        return DailyCategoryTotal.KIND_INCOME
+    return DailyCategoryTotal.KIND_EXPENSE
+
+
+class DailyTotalsService:
+    """Инкрементальное обновление и чтение дневных агрегатов."""
+
+    # ─── Запись ────────────────────────────────────────────────
+
+    @staticmethod
+    def apply_sync(records: Iterable[Expense | Income], sign: int = 1) -> None:
+        """Добавляет (sign=1) или вычитает (sign=-1) записи из агрегата.
+        Записи одного ключа сворачиваются заранее — один upsert на ключ."""
+        deltas: dict[tuple, list] = defaultdict(lambda: [Decimal("0.00"), 0])
+        for record in records:
+            key = (
+                record.user_id,
+                timezone.localdate(record.created_at),
+                record.category_id,
+                kind_of(record),
+            )
+            deltas[key][0] += abs(record.amount) * sign
+            deltas[key][1] += sign
+
+        if not deltas:
+            return
+
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                _UPSERT_SQL,
+                [(*key, total, count) for key, (total, count) in deltas.items()],
+            )
+            if sign < 0:
+                # Опустевшие дни не храним
+                cursor.execute(
+                    f"DELETE FROM {_TABLE} WHERE user_id = ANY(%s) AND count <= 0",
+                    [list({key[0] for key in deltas})],
+                )
+
+    @staticmethod
+    @sync_to_async
+    def apply(records: Iterable[Expense | Income], sign: int = 1) -> None:
+        DailyTotalsService.apply_sync(records, sign)
+
+    @staticmethod
+    def detach_category_sync(category: Category) -> None:
+        """Переносит агрегаты категории в «без категории».
+        Вызывается перед удалением категории (у записей category → NULL)."""
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {_TABLE} (user_id, day, category_id, kind, total, count)
+                SELECT user_id, day, NULL, kind, total, count
+                FROM {_TABLE}
+                WHERE category_id = %s
+                ON CONFLICT ON CONSTRAINT {_CONSTRAINT} DO UPDATE
+                SET total = {_TABLE}.total + EXCLUDED.total,
+                    count = {_TABLE}.count + EXCLUDED.count
+                """,
+                [category.id],
+            )
+            cursor.execute(f"DELETE FROM {_TABLE} WHERE category_id = %s", [category.id])
+
+    @staticmethod
+    def rebuild_sync(user_id: int | None = None) -> int:
+        """Пересобирает агрегат с нуля из Expense/Income.
+        Возвращает количество строк агрегата."""
+        tz_name = timezone.get_current_timezone_name()
+        user_condition = "AND user_id = %s" if user_id is not None else ""
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            if user_id is None:
+                cursor.execute(f"DELETE FROM {_TABLE}")
+            else:
+                cursor.execute(f"DELETE FROM {_TABLE} WHERE user_id = %s", [user_id])
+
+            for model, kind in (
+                (Expense, DailyCategoryTotal.KIND_EXPENSE),
+                (Income, DailyCategoryTotal.KIND_INCOME),
+            ):
+                params = [tz_name, kind]
+                if user_id is not None:
+                    params.append(user_id)
+                cursor.execute(
+                    f"""
+                    INSERT INTO {_TABLE} (user_id, day, category_id, kind, total, count)
+                    SELECT user_id, (created_at AT TIME ZONE %s)::date, category_id, %s,
+                           SUM(ABS(amount)), COUNT(*)
+                    FROM {model._meta.db_table}
+                    WHERE deleted_at IS NULL {user_condition}
+                    GROUP BY 1, 2, 3
+                    """,
+                    params,
+                )
+
+            if user_id is None:
+                cursor.execute(f"SELECT COUNT(*) FROM {_TABLE}")
+            else:
+                cursor.execute(f"SELECT COUNT(*) FROM {_TABLE} WHERE user_id = %s", [user_id])
+            return cursor.fetchone()[0]
+
+    # ─── Чтение ────────────────────────────────────────────────
+
+    @staticmethod
+    def _queryset(user_id: int, kind: str, date_from: date | None, date_to: date | None):
+        queryset = DailyCategoryTotal.objects.filter(user_id=user_id, kind=kind)
+        if date_from:
+            queryset = queryset.filter(day__gte=date_from)
+        if date_to:
+            queryset = queryset.filter(day__lte=date_to)
+        return queryset
+
+    @staticmethod
+    def category_summary_sync(
+        user_id: int,
+        kind: str,
+        date_from: date | None,
+        date_to: date | None,
+    ) -> list[tuple[str, Decimal]]:
+        """Суммы по категориям за период, по убыванию."""
+        queryset = (
+            DailyTotalsService._queryset(user_id, kind, date_from, date_to)
+            .values("category__name")
+            .annotate(sum_total=Sum("total"))
+            .filter(sum_total__gt=0)
+            .order_by("-sum_total")
+        )
+        return [
+            (row["category__name"] or "Без категории", row["sum_total"])
+            for row in queryset
+        ]
+
+    @staticmethod
+    def total_sync(
+        user_id: int,
+        kind: str,
+        date_from: date | None,
+        date_to: date | None,
+        category: Category | None = None,
+    ) -> Decimal:
+        """Итог за период (опционально — по одной категории)."""
+        queryset = DailyTotalsService._queryset(user_id, kind, date_from, date_to)
+        if category:
+            queryset = queryset.filter(category=category)
+        return queryset.aggregate(sum_total=Sum("total"))["sum_total"] or Decimal("0.00")
+
+    @staticmethod
+    def monthly_totals_sync(
+        user_id: int,
+        date_from: date | None,
+        date_to: date | None,
+    ) -> dict[str, dict[date, Decimal]]:
+        """Итоги по месяцам для обоих типов одним запросом:
+        {kind: {первое число месяца: сумма}}."""
+        queryset = DailyCategoryTotal.objects.filter(user_id=user_id)
+        if date_from:
+            queryset = queryset.filter(day__gte=date_from)
+        if date_to:
+            queryset = queryset.filter(day__lte=date_to)
+
+        result: dict[str, dict[date, Decimal]] = {
+            DailyCategoryTotal.KIND_EXPENSE: {},
+            DailyCategoryTotal.KIND_INCOME: {},
+        }
+        rows = (
+            queryset.annotate(month=TruncMonth("day"))
+            .values("kind", "month")
+            .annotate(sum_total=Sum("total"))
+            .order_by("month")
+        )
+        for row in rows:
+            result[row["kind"]][row["month"]] = row["sum_total"]
+        return result
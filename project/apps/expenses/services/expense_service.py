@@ -1,48 +1,89 @@
 from aiogram import types
+from asgiref.sync import sync_to_async
+from django.db import transaction
+
 from project.apps.core.models import User
 from project.apps.expenses.models import Expense
-from project.apps.expenses.services.category_service import CategoryService
+from project.apps.expenses.services.category_predictor import UserCategoryPredictor
+from project.apps.expenses.services.category_service import CategoryService, IngestedRecord
+from project.apps.expenses.services.daily_totals_service import DailyTotalsService
 from project.apps.expenses.services.expense_parser import ExpenseParser
 
 
 class ExpenseService:
     @staticmethod
     async def create_from_message(user: User, message: types.Message) -> list[Expense]:
+        """Создаёт расходы из сообщения пакетно (см. ingest_message)."""
+        return [ingested.record for ingested in await ExpenseService.ingest_message(user, message)]
+
+    @staticmethod
+    async def ingest_message(user: User, message: types.Message) -> list[IngestedRecord]:
+        """Создаёт расходы из сообщения и возвращает их вместе с результатом
+        поиска категории — по нему хендлер решает, спрашивать ли категорию.
+
+        Все категории разрешаются за один проход CategoryService.match_many,
+        все строки вставляются одним bulk_create в одной транзакции."""
         items = ExpenseParser.parse(message.text or "")
         if not items:
             return []
 
-        expenses = []
-        for amount, category_name in items:
-            category = await CategoryService.get_or_create(category_name)
-
-            normalized_amount = abs(amount)
+        matches = await CategoryService.match_many(
+            (category_name for _, category_name in items),
+            user_id=user.id,
+        )
+        add_attr = {
+            "message_id": message.message_id,
+            "date": message.date.isoformat() if message.date else None,
+            "raw_text": message.text,
+            "username": message.from_user.username if message.from_user else None,
+            "full_name": message.from_user.full_name if message.from_user else None,
+        }
 
-            expense = await Expense.objects.acreate(
+        expenses = [
+            Expense(
                 user=user,
-                amount=normalized_amount,
-                category=category,
+                amount=abs(amount),
+                category=matches[category_name].category,
                 chat_id=message.chat.id,
-                add_attr={
-                    "message_id": message.message_id,
-                    "date": message.date.isoformat() if message.date else None,
-                    "raw_text": message.text,
-                    "username": message.from_user.username if message.from_user else None,
-                    "full_name": message.from_user.full_name if message.from_user else None,
-                },
+                add_attr={**add_attr, "category_text": category_name, **matches[category_name].record_attrs()},
             )
-            expenses.append(expense)
+            for amount, category_name in items
+        ]
+        created = await ExpenseService.bulk_insert(expenses)
+        for _, category_name in items:
+            # Догадку по опечатке не запоминаем — иначе она станет «точным» предсказанием
+            if not matches[category_name].is_guess:
+                UserCategoryPredictor.observe(user.id, category_name, matches[category_name].category)
+        return [
+            IngestedRecord(record=expense, category_text=category_name, match=matches[category_name])
+            for expense, (_, category_name) in zip(created, items)
+        ]
 
-        return expenses
+    @staticmethod
+    @sync_to_async
+    def bulk_insert(expenses: list[Expense]) -> list[Expense]:
+        """Вставляет расходы одним запросом внутри транзакции
+        и обновляет дневные агрегаты."""
+        with transaction.atomic():
+            created = Expense.objects.bulk_create(expenses)
+            DailyTotalsService.apply_sync(created)
+            return created
 
     @staticmethod
-    async def create_quick(user: User, amount, category, chat_id: int) -> Expense:
-        """Создаёт расход из быстрого ввода (без парсинга сообщения)."""
-        from project.apps.expenses.models import Category as CategoryModel
-        return await Expense.objects.acreate(
-            user=user,
-            amount=abs(amount),
-            category=category,
-            chat_id=chat_id,
-            add_attr={"source": "quick_entry"},
-        )
+    async def create_quick(user: User, amount, category, chat_id: int, category_text: str | None = None) -> Expense:
+        """Создаёт расход из быстрого ввода (без парсинга сообщения).
+
+        category_text — что пользователь ввёл вместо выбора кнопкой; выбор
+        категории учитывается в его истории (UserCategoryPredictor)."""
+        category_text = category_text or (category.name if category else "")
+        created = await ExpenseService.bulk_insert([
+            Expense(
+                user=user,
+                amount=abs(amount),
+                category=category,
+                chat_id=chat_id,
+                add_attr={"source": "quick_entry", "category_text": category_text},
+            ),
+        ])
+        UserCategoryPredictor.observe(user.id, category_text, category)
+        return created[0]
@@ -0,0 +1,231 @@
+"""Выгрузка расходов и доходов в CSV и XLSX.
+
+Стратегия:
+1. Расходы и доходы читаются двумя запросами через .iterator(chunk_size)
+   — на PostgreSQL это server-side курсоры, в памяти не больше одного
+   чанка каждого запроса.
+2. Два потока, уже отсортированные в БД по created_at, сливаются
+   heapq.merge — общая лента без сортировки в Python.
+3. Строки сразу пишутся в файл: CSV через csv.writer, XLSX — потоковой
+   записью XML листа в zip-архив (без зависимостей и без построения
+   книги в памяти). Память не зависит от числа записей.
+4. Текст ячеек приходит от пользователей (сообщения, описания из
+   выписок): в CSV строки, которые Excel принял бы за формулу, получают
+   префикс «'», в XLSX вырезаются управляющие символы, запрещённые в XML 1.0.
+"""
+
+import csv
+import heapq
+import io
+import re
+import zipfile
+from datetime import datetime, tzinfo
+from decimal import Decimal
+from typing import IO, Iterable, Iterator, NamedTuple
+from xml.sax.saxutils import escape
+
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.utils import timezone
+
+from project.apps.core.models import User
+from project.apps.expenses.models import Expense, Income
+
+EXPORT_CHUNK_SIZE = 2_000
+
+FORMAT_CSV = "csv"
+FORMAT_XLSX = "xlsx"
+EXPORT_FORMATS = (FORMAT_CSV, FORMAT_XLSX)
+
+# Начало ячейки, с которого Excel читает её как формулу
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+# Символы, недопустимые в XML 1.0 (таб, перевод строки и возврат каретки разрешены)
+_XML_ILLEGAL_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_HEADER = ("Дата", "Тип", "Сумма", "Категория", "Описание", "Пользователь", "Chat ID")
+
+
+class ExportRow(NamedTuple):
+    created_at: datetime
+    kind: str
+    amount: Decimal
+    category: str
+    description: str
+    user: str
+    chat_id: int | None
+
+    def cells(self, tz: tzinfo) -> tuple:
+        return (
+            timezone.localtime(self.created_at, tz).strftime("%Y-%m-%d %H:%M"),
+            self.kind,
+            self.amount,
+            self.category,
+            self.description,
+            self.user,
+            self.chat_id,
+        )
+
+
+class ExportService:
+    """Потоковая выгрузка записей пользователей (синхронная: вызывать через sync_to_async)."""
+
+    @staticmethod
+    def iter_rows(user_ids: list[int]) -> Iterator[ExportRow]:
+        """Расходы и доходы пользователей по возрастанию даты."""
+        expenses = (
+            Expense.objects.filter(user_id__in=user_ids, deleted_at__isnull=True)
+            .order_by("created_at", "id")
+            .values_list(
+                "created_at", "amount", "category__name", "add_attr__category_text",
+                "user__first_name", "user__username", "user__tg_id", "chat_id",
+            )
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+        incomes = (
+            Income.objects.filter(user_id__in=user_ids, deleted_at__isnull=True)
+            .order_by("created_at", "id")
+            .values_list(
+                "created_at", "amount", "category__name", "description",
+                "user__first_name", "user__username", "user__tg_id", "chat_id",
+            )
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+        return heapq.merge(
+            (_row("Расход", values) for values in expenses),
+            (_row("Доход", values) for values in incomes),
+            key=lambda row: row.created_at,
+        )
+
+    @staticmethod
+    def export_to_file(path: str, user: User, user_ids: list[int], export_format: str) -> int:
+        """Выгрузка записей user_ids в файл path во времени пользователя user."""
+        with open(path, "wb") as output:
+            return ExportService.write(
+                ExportService.iter_rows(user_ids),
+                output,
+                export_format,
+                user_timezone(user),
+            )
+
+    @staticmethod
+    def write(rows: Iterable[ExportRow], output: IO[bytes], export_format: str, tz: tzinfo) -> int:
+        """Пишет строки в output (бинарный файл), возвращает их число.
+        Время записей — в часовом поясе tz."""
+        if export_format == FORMAT_XLSX:
+            return _write_xlsx(rows, output, tz)
+        return _write_csv(rows, output, tz)
+
+
+def user_timezone(user: User) -> tzinfo:
+    try:
+        return ZoneInfo(user.timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.get_default_timezone()
+
+
+def _row(kind: str, values: tuple) -> ExportRow:
+    created_at, amount, category, description, first_name, username, tg_id, chat_id = values
+    return ExportRow(
+        created_at=created_at,
+        kind=kind,
+        amount=abs(amount),
+        category=category or "Без категории",
+        description=description or "",
+        user=first_name or username or str(tg_id),
+        chat_id=chat_id,
+    )
+
+
+def _write_csv(rows: Iterable[ExportRow], output: IO[bytes], tz: tzinfo) -> int:
+    # utf-8-sig и «;» — чтобы Excel открывал файл с кириллицей без мастера импорта
+    count = 0
+    text = io.TextIOWrapper(output, encoding="utf-8-sig", newline="")
+    writer = csv.writer(text, delimiter=";")
+    writer.writerow(_HEADER)
+    for row in rows:
+        writer.writerow([_csv_cell(value) for value in row.cells(tz)])
+        count += 1
+    text.flush()
+    text.detach()
+    return count
+
+
+def _csv_cell(value):
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+# ─── XLSX ──────────────────────────────────────────────────────
+
+_XLSX_STATIC_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Записи" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _xlsx_cell(value) -> str:
+    if value is None:
+        return "<c/>"
+    if isinstance(value, (int, Decimal)):
+        return f"<c><v>{value}</v></c>"
+    return f'<c t="inlineStr"><is><t>{escape(_XML_ILLEGAL_RE.sub("", str(value)))}</t></is></c>'
+
+
+def _xlsx_row(cells: Iterable) -> str:
+    return "<row>" + "".join(_xlsx_cell(value) for value in cells) + "</row>"
+
+
+def _write_xlsx(rows: Iterable[ExportRow], output: IO[bytes], tz: tzinfo) -> int:
+    count = 0
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b"<sheetData>"
+            )
+            buffer = [_xlsx_row(_HEADER)]
+            for row in rows:
+                buffer.append(_xlsx_row(row.cells(tz)))
+                count += 1
+                if len(buffer) >= EXPORT_CHUNK_SIZE:
+                    sheet.write("".join(buffer).encode())
+                    buffer.clear()
+            buffer.append("</sheetData></worksheet>")
+            sheet.write("".join(buffer).encode())
+    return count
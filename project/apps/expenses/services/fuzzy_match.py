@@ -0,0 +1,121 @@
+"""Нечёткий поиск категории по названию с опечаткой.
+
+Стратегия:
+1. Кандидаты отбираются по триграммам, как в pg_trgm: каждое слово
+   дополняется пробелами («  кофе »), строка раскладывается на тройки
+   символов. Из инвертированного индекса берутся FUZZY_CANDIDATES ключей
+   с наибольшим числом общих триграмм.
+2. Кандидаты проверяются расстоянием Дамерау–Левенштейна (перестановка
+   соседних букв — одна правка: «Продкуты» → «Продукты»).
+3. Уверенность = 1 − расстояние / длина более длинной строки. Совпадение
+   принимается, если уверенность не ниже FUZZY_MIN_CONFIDENCE, а запрос не
+   короче FUZZY_MIN_LENGTH: в коротких словах одна правка меняет смысл.
+"""
+
+import heapq
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import chain
+
+FUZZY_MIN_CONFIDENCE = 0.75
+FUZZY_MIN_LENGTH = 4
+
+# Сколько лучших по триграммам кандидатов проверять расстоянием правки
+FUZZY_CANDIDATES = 10
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def padded_trigrams(text: str) -> set[str]:
+    """Триграммы в стиле pg_trgm: по словам, с пробелами по краям слова."""
+    trigrams = set()
+    for word in _WORD_RE.findall(text):
+        padded = f"  {word} "
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Расстояние Дамерау–Левенштейна (вариант OSA) с отсечкой.
+
+    Считается только полоса |i − j| ≤ limit; если расстояние больше limit,
+    возвращает limit + 1, не досчитывая матрицу."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    beyond = limit + 1
+    previous2: list[int] = []
+    previous = [j if j <= limit else beyond for j in range(len(b) + 1)]
+    for i, char_a in enumerate(a, 1):
+        current = [i if i <= limit else beyond] + [beyond] * len(b)
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            char_b = b[j - 1]
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+        # Строка i + 1 опирается на строки i и i − 1 (перестановка)
+        if min(current) > limit and min(previous) >= limit:
+            return beyond
+        previous2, previous = previous, current
+    return min(previous[-1], beyond)
+
+
+def confidence(query: str, key: str) -> float:
+    longest = max(len(query), len(key))
+    if not longest:
+        return 0.0
+    limit = int(longest * (1 - FUZZY_MIN_CONFIDENCE))
+    return 1 - edit_distance(query, key, limit) / longest
+
+
+def best_match(query: str, candidates) -> tuple[str, float] | None:
+    """Лучший из кандидатов с уверенностью не ниже порога.
+    При равной уверенности выигрывает меньший в алфавитном порядке ключ."""
+    if len(query) < FUZZY_MIN_LENGTH:
+        return None
+    best: tuple[str, float] | None = None
+    for key in candidates:
+        score = confidence(query, key)
+        if score < FUZZY_MIN_CONFIDENCE:
+            continue
+        if best is None or score > best[1] or (score == best[1] and key < best[0]):
+            best = (key, score)
+    return best
+
+
+@dataclass
+class FuzzyIndex:
+    """Триграммный индекс для поиска ключа с опечаткой."""
+    keys: list[str] = field(default_factory=list)
+    sizes: list[int] = field(default_factory=list)
+    postings: dict[str, list[int]] = field(default_factory=dict)
+
+    def add(self, key: str) -> None:
+        position = len(self.keys)
+        trigrams = padded_trigrams(key)
+        self.keys.append(key)
+        self.sizes.append(len(trigrams))
+        for trigram in trigrams:
+            self.postings.setdefault(trigram, []).append(position)
+
+    def find(self, query: str) -> tuple[str, float] | None:
+        """Ближайший ключ и уверенность либо None."""
+        if len(query) < FUZZY_MIN_LENGTH:
+            return None
+        trigrams = padded_trigrams(query)
+        shared = Counter(chain.from_iterable(self.postings.get(trigram, ()) for trigram in trigrams))
+        # Ключи с единственной общей триграммой — почти всегда шум, а на
+        # больших индексах их тысячи: сортировать только остальных
+        if len(shared) > FUZZY_CANDIDATES:
+            shared = {position: common for position, common in shared.items() if common > 1} or shared
+        if not shared:
+            return None
+
+        # Похожесть как в pg_trgm: общие триграммы / все триграммы обеих строк
+        def similarity(position: int) -> float:
+            common = shared[position]
+            return common / (len(trigrams) + self.sizes[position] - common)
+
+        candidates = heapq.nlargest(FUZZY_CANDIDATES, shared, key=similarity)
+        return best_match(query, (self.keys[position] for position in candidates))
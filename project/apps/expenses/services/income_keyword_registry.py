@@ -0,0 +1,40 @@
+import logging
+
+from project.apps.expenses.models import IncomeKeyword
+from project.apps.expenses.services.tokenizer import INCOME_KEYWORDS, set_income_keywords
+
+logger = logging.getLogger(__name__)
+
+
+class IncomeKeywordRegistry:
+    """Ключевые слова дохода: встроенные (INCOME_KEYWORDS) и добавленные через админку."""
+
+    _keywords: tuple[str, ...] = INCOME_KEYWORDS
+
+    @classmethod
+    async def load(cls) -> None:
+        """Загружает слова из БД и пересобирает лексер сообщений.
+        Вызывается один раз при старте бота."""
+        extra = [
+            keyword
+            async for keyword in IncomeKeyword.objects.filter(
+                deleted_at__isnull=True,
+            ).values_list("keyword", flat=True)
+        ]
+
+        cls._keywords = INCOME_KEYWORDS + tuple(extra)
+        set_income_keywords(cls._keywords)
+        logger.info(
+            "IncomeKeywordRegistry: загружено %d ключевых слов из БД, %d встроенных",
+            len(extra),
+            len(INCOME_KEYWORDS),
+        )
+
+    @classmethod
+    async def reload(cls) -> None:
+        """Перезагружает слова из БД."""
+        await cls.load()
+
+    @classmethod
+    def get(cls) -> tuple[str, ...]:
+        return cls._keywords
@@ -1,8 +1,12 @@
 from aiogram import types
+from asgiref.sync import sync_to_async
+from django.db import transaction
 
 from project.apps.core.models import User
 from project.apps.expenses.models import Income
-from project.apps.expenses.services.category_service import CategoryService
+from project.apps.expenses.services.category_predictor import UserCategoryPredictor
+from project.apps.expenses.services.category_service import CategoryService, IngestedRecord
+from project.apps.expenses.services.daily_totals_service import DailyTotalsService
 from project.apps.expenses.services.income_parser import IncomeParser
 
 
@@ -11,40 +15,76 @@ class IncomeService:
 
     @staticmethod
     async def create_from_message(user: User, message: types.Message) -> list[Income]:
+        """Создаёт доходы из сообщения пакетно (см. ingest_message)."""
+        return [ingested.record for ingested in await IncomeService.ingest_message(user, message)]
+
+    @staticmethod
+    async def ingest_message(user: User, message: types.Message) -> list[IngestedRecord]:
+        """Создаёт доходы из сообщения вместе с результатами поиска
+        категорий (аналогично ExpenseService.ingest_message)."""
         items = IncomeParser.parse(message.text or "")
         if not items:
             return []
 
-        incomes = []
-        for amount, description in items:
-            category = await CategoryService.get_or_create(description)
+        matches = await CategoryService.match_many(
+            (description for _, description in items),
+            user_id=user.id,
+        )
+        add_attr = {
+            "message_id": message.message_id,
+            "date": message.date.isoformat() if message.date else None,
+            "raw_text": message.text,
+            "username": message.from_user.username if message.from_user else None,
+            "full_name": message.from_user.full_name if message.from_user else None,
+        }
 
-            income = await Income.objects.acreate(
+        incomes = [
+            Income(
                 user=user,
                 amount=abs(amount),
-                category=category,
+                category=matches[description].category,
                 description=description,
                 chat_id=message.chat.id,
-                add_attr={
-                    "message_id": message.message_id,
-                    "date": message.date.isoformat() if message.date else None,
-                    "raw_text": message.text,
-                    "username": message.from_user.username if message.from_user else None,
-                    "full_name": message.from_user.full_name if message.from_user else None,
-                },
+                add_attr={**add_attr, **matches[description].record_attrs()},
             )
-            incomes.append(income)
+            for amount, description in items
+        ]
+        created = await IncomeService.bulk_insert(incomes)
+        for _, description in items:
+            # Догадку по опечатке не запоминаем (см. ExpenseService.ingest_message)
+            if not matches[description].is_guess:
+                UserCategoryPredictor.observe(user.id, description, matches[description].category)
+        return [
+            IngestedRecord(record=income, category_text=description, match=matches[description])
+            for income, (_, description) in zip(created, items)
+        ]
 
-        return incomes
+    @staticmethod
+    @sync_to_async
+    def bulk_insert(incomes: list[Income]) -> list[Income]:
+        """Вставляет доходы одним запросом внутри транзакции
+        и обновляет дневные агрегаты."""
+        with transaction.atomic():
+            created = Income.objects.bulk_create(incomes)
+            DailyTotalsService.apply_sync(created)
+            return created
 
     @staticmethod
-    async def create_quick(user: User, amount, category, chat_id: int) -> Income:
-        """Создаёт доход из быстрого ввода (без парсинга сообщения)."""
-        return await Income.objects.acreate(
-            user=user,
-            amount=abs(amount),
-            category=category,
-            description=category.name,
-            chat_id=chat_id,
-            add_attr={"source": "quick_entry"},
-        )
+    async def create_quick(user: User, amount, category, chat_id: int, category_text: str | None = None) -> Income:
+        """Создаёт доход из быстрого ввода (без парсинга сообщения).
+
+        category_text — что пользователь ввёл вместо выбора кнопкой; выбор
+        категории учитывается в его истории (UserCategoryPredictor)."""
+        category_text = category_text or (category.name if category else "")
+        created = await IncomeService.bulk_insert([
+            Income(
+                user=user,
+                amount=abs(amount),
+                category=category,
+                description=category_text,
+                chat_id=chat_id,
+                add_attr={"source": "quick_entry"},
+            ),
+        ])
+        UserCategoryPredictor.observe(user.id, category_text, category)
+        return created[0]
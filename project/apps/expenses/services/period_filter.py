@@ -0,0 +1,44 @@
+"""Фильтрация по периоду без приведения timestamp к дате.
+
+`created_at__date__gte/__lte` превращается в `(created_at AT TIME ZONE ...)::date`
+для каждой строки, из-за чего индекс (user, created_at) не используется
+как range scan. Здесь диапазон дат переводится в полуоткрытый интервал
+timestamp-границ [начало date_from, начало date_to + 1 день) в текущей
+таймзоне Django — результат тот же, но условие sargable.
+"""
+
+from datetime import date, datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+
+def day_start(day: date) -> datetime:
+    """Начало суток в текущей таймзоне (aware datetime)."""
+    return timezone.make_aware(datetime.combine(day, time.min), timezone.get_current_timezone())
+
+
+def period_bounds(
+    date_from: date | None,
+    date_to: date | None,
+) -> tuple[datetime | None, datetime | None]:
+    """Возвращает (включительная нижняя, исключительная верхняя) границы."""
+    lower = day_start(date_from) if date_from else None
+    upper = day_start(date_to + timedelta(days=1)) if date_to else None
+    return lower, upper
+
+
+def in_period(
+    date_from: date | None,
+    date_to: date | None,
+    field: str = "created_at",
+) -> Q:
+    """Q-условие «field попадает в [date_from, date_to]» по полуоткрытым границам.
+    Любая из границ может быть None — тогда она не ограничивает выборку."""
+    lower, upper = period_bounds(date_from, date_to)
+    condition = Q()
+    if lower is not None:
+        condition &= Q(**{f"{field}__gte": lower})
+    if upper is not None:
+        condition &= Q(**{f"{field}__lt": upper})
+    return condition
@@ -1,48 +1,381 @@
-import asyncio
-from django.core.management.base import BaseCommand
-from aiogram import Bot
-from django.conf import settings
+"""Бэкфилл чата: расходы и доходы из истории сообщений, которые бот не сохранил.
 
+Bot API не отдаёт историю чата, поэтому источник — экспорт чата из
+Telegram Desktop (result.json, формат JSON).
+
+Стратегия:
+1. Экспорт читается потоково: массив messages разбирается по одному
+   объекту (json.JSONDecoder.raw_decode по буферу), весь файл в память
+   не загружается.
+2. Ключи уже сохранённых записей чата (расходы и доходы) загружаются
+   одним запросом на модель в множество; сообщения из него пропускаются.
+   Общая нумерация сообщений у бота и у выгрузившего экспорт пользователя
+   есть только в супергруппах и каналах (chat_id -100…), там ключ —
+   message_id. В личных чатах и обычных группах Telegram нумерует
+   сообщения для каждого аккаунта отдельно, поэтому ключ — содержимое:
+   (tg_id автора, время отправки с точностью до секунды, текст), против
+   add_attr date/raw_text сохранённых записей.
+3. Сообщения обрабатываются пачками по BACKFILL_BATCH_SIZE: разбор теми же
+   парсерами, что и в хендлере; авторы — одним запросом по tg_id
+   (недостающие создаются bulk_create); категории — CategoryService.match_many
+   по уникальным текстам каждого автора, без сохранения алиасов; вставка —
+   bulk_create_backdated с датой сообщения. Пачка записывается одной
+   транзакцией.
+   Экспорт не отличает ботов от людей (у обоих from_id «user<id>»), а
+   отчёты самого бота полны сумм. Поэтому пропускаются сообщения ботов из
+   bot_ids (id бота берётся из токена), пользователей с is_bot в БД и
+   отправленные через inline-ботов (via_bot).
+4. После коммита пачки в файл-чекпоинт пишется id последнего сообщения
+   пачки. Повторный запуск продолжает с него; если процесс упал между
+   коммитом и записью чекпоинта, пачку отсеет множество из п. 2.
+
+Работает синхронно (management-команда recalculate_chat).
+"""
+
+import json
+import logging
+import os
+import re
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from typing import Callable, Iterator
+
+from asgiref.sync import async_to_sync
+from django.db import transaction
 from django.db.models import Q
+from django.utils import timezone
+
+from project.apps.core.models import User
+from project.apps.expenses.models import Expense, Income
+from project.apps.expenses.services.backdated_insert import bulk_create_backdated
+from project.apps.expenses.services.category_predictor import UserCategoryPredictor
+from project.apps.expenses.services.category_service import CategoryService
+from project.apps.expenses.services.expense_parser import ExpenseParser
+from project.apps.expenses.services.income_parser import IncomeParser
+from project.apps.expenses.services.tokenizer import parse_pure_amount
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH_SIZE = 1_000
+
+_READ_SIZE = 1024 * 1024
+_MESSAGES_RE = re.compile(r'"messages"\s*:\s*\[')
+_USER_ID_PREFIX = "user"
+# Префикс id супергрупп и каналов в Bot API
+_SUPERGROUP_PREFIX = "-100"
+
+Progress = Callable[["BackfillResult"], None]
+# message_id или (tg_id, unixtime, текст) — см. п. 2 в docstring модуля
+MessageKey = int | tuple[int, int, str]
+
+
+class ChatExportError(ValueError):
+    """Файл не похож на JSON-экспорт чата из Telegram Desktop."""
+
+
+@dataclass
+class BackfillResult:
+    # id последнего обработанного сообщения — по нему продолжается прерванный запуск
+    last_message_id: int = 0
+    messages: int = 0
+    expenses: int = 0
+    incomes: int = 0
+    known: int = 0
+    skipped: int = 0
+
+
+@dataclass
+class _ParsedMessage:
+    message_id: int
+    tg_id: int
+    author: str
+    sent_at: datetime
+    text: str
+    is_income: bool
+    items: list[tuple[Decimal, str]]
+
+
+class ChatBackfill:
+    """Бэкфилл одного чата из одного файла экспорта."""
+
+    def __init__(
+        self,
+        chat_id: int,
+        export_path: str,
+        checkpoint_path: str | None = None,
+        batch_size: int = BACKFILL_BATCH_SIZE,
+        progress: Progress | None = None,
+        bot_ids: set[int] | None = None,
+    ) -> None:
+        self.chat_id = chat_id
+        self.by_message_id = str(chat_id).startswith(_SUPERGROUP_PREFIX)
+        self.bot_ids = bot_ids or set()
+        self.export_path = export_path
+        self.checkpoint_path = checkpoint_path or f"{export_path}.{chat_id}.checkpoint.json"
+        self.batch_size = batch_size
+        self.progress = progress
+        self.result = BackfillResult()
+        self._users: dict[int, User] = {}
+        self._touched_users: set[int] = set()
+
+    def run(self) -> BackfillResult:
+        self.result = self._load_checkpoint()
+        resume_after = self.result.last_message_id
+        known = self._load_known_keys()
+
+        batch = []
+        for raw in _iter_export_messages(self.export_path):
+            message_id = raw.get("id")
+            if not isinstance(message_id, int) or message_id <= resume_after:
+                continue
+            batch.append(raw)
+            if len(batch) >= self.batch_size:
+                self._process_batch(batch, known)
+                batch = []
+        if batch:
+            self._process_batch(batch, known)
+
+        for user_id in self._touched_users:
+            UserCategoryPredictor.invalidate(user_id)
+        logger.info("Backfill chat %s: %s", self.chat_id, self.result)
+        return self.result
+
+    # ─── Пачка ─────────────────────────────────────────────────
+
+    def _process_batch(self, batch: list[dict], known: set[MessageKey]) -> None:
+        parsed = []
+        for raw in batch:
+            if self._message_key(raw) in known:
+                self.result.known += 1
+                continue
+            message = _parse_message(raw, self.bot_ids)
+            if message is None:
+                self.result.skipped += 1
+                continue
+            parsed.append(message)
+
+        with transaction.atomic():
+            users = self._resolve_users(parsed)
+            authored = [message for message in parsed if not users[message.tg_id].is_bot]
+            self.result.skipped += len(parsed) - len(authored)
+            expenses, incomes = self._build_records(authored, users)
+            bulk_create_backdated(Expense, expenses)
+            bulk_create_backdated(Income, incomes)
+
+        known.update(self._parsed_key(message) for message in authored)
+        self.result.messages += len(batch)
+        self.result.expenses += len(expenses)
+        self.result.incomes += len(incomes)
+        self.result.last_message_id = batch[-1]["id"]
+        self._save_checkpoint()
+        if self.progress is not None:
+            self.progress(self.result)
+
+    def _resolve_users(self, messages: list[_ParsedMessage]) -> dict[int, User]:
+        """Пользователи авторов по tg_id. Ботов из bot_ids среди авторов
+        нет (отсеяны в _parse_message), так что для них User не создаётся."""
+        authors = {message.tg_id: message.author for message in messages if message.tg_id not in self._users}
+        if authors:
+            existing = {user.tg_id: user for user in User.objects.filter(tg_id__in=authors)}
+            missing = [
+                User(tg_id=tg_id, first_name=name[:255] or None)
+                for tg_id, name in authors.items()
+                if tg_id not in existing
+            ]
+            if missing:
+                # Автор писал в чат до того, как начал пользоваться ботом
+                User.objects.bulk_create(missing, ignore_conflicts=True)
+                existing.update(
+                    (user.tg_id, user) for user in User.objects.filter(tg_id__in=[user.tg_id for user in missing])
+                )
+            self._users.update(existing)
+        return self._users
+
+    def _build_records(
+        self,
+        messages: list[_ParsedMessage],
+        users: dict[int, User],
+    ) -> tuple[list[Expense], list[Income]]:
+        texts_by_user: dict[int, dict[str, None]] = {}
+        for message in messages:
+            texts = texts_by_user.setdefault(users[message.tg_id].id, {})
+            texts.update((text, None) for _, text in message.items)
+        matches = {
+            user_id: async_to_sync(CategoryService.match_many)(
+                list(texts),
+                user_id=user_id,
+                persist_aliases=False,
+            )
+            for user_id, texts in texts_by_user.items()
+        }
+
+        expenses, incomes = [], []
+        for message in messages:
+            user = users[message.tg_id]
+            self._touched_users.add(user.id)
+            add_attr = {
+                "message_id": message.message_id,
+                "date": message.sent_at.isoformat(),
+                "raw_text": message.text,
+                "full_name": message.author,
+                "source": "backfill",
+            }
+            for amount, text in message.items:
+                match = matches[user.id][text]
+                common = {
+                    "user": user,
+                    "amount": abs(amount),
+                    "category": match.category,
+                    "chat_id": self.chat_id,
+                    "created_at": message.sent_at,
+                }
+                if message.is_income:
+                    incomes.append(Income(description=text[:255], add_attr={**add_attr, **match.record_attrs()}, **common))
+                else:
+                    expenses.append(
+                        Expense(add_attr={**add_attr, "category_text": text, **match.record_attrs()}, **common)
+                    )
+        return expenses, incomes
+
+    # ─── Состояние ─────────────────────────────────────────────
+
+    def _message_key(self, raw: dict) -> MessageKey | None:
+        if self.by_message_id:
+            return raw["id"]
+        from_id = raw.get("from_id") or ""
+        tg_id = from_id[len(_USER_ID_PREFIX):]
+        if not from_id.startswith(_USER_ID_PREFIX) or not tg_id.isdigit():
+            return None
+        return int(tg_id), int(_message_date(raw).timestamp()), _message_text(raw.get("text"))
+
+    def _parsed_key(self, message: _ParsedMessage) -> MessageKey:
+        if self.by_message_id:
+            return message.message_id
+        return message.tg_id, int(message.sent_at.timestamp()), message.text
+
+    def _load_known_keys(self) -> set[MessageKey]:
+        in_chat = Q(chat_id=self.chat_id) | Q(add_attr__chat_id=self.chat_id)
+        known = set()
+        for model in (Expense, Income):
+            records = model.objects.filter(in_chat)
+            if self.by_message_id:
+                known.update(
+                    records.filter(add_attr__has_key="message_id")
+                    .values_list("add_attr__message_id", flat=True)
+                    .distinct()
+                )
+                continue
+            rows = (
+                records.filter(add_attr__has_key="raw_text")
+                .exclude(add_attr__date=None)
+                .values_list("user__tg_id", "add_attr__date", "add_attr__raw_text")
+                .distinct()
+            )
+            known.update(
+                (tg_id, int(datetime.fromisoformat(date).timestamp()), text)
+                for tg_id, date, text in rows.iterator()
+            )
+        return known
+
+    def _load_checkpoint(self) -> BackfillResult:
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as file:
+                return BackfillResult(**json.load(file))
+        except FileNotFoundError:
+            return BackfillResult()
+
+    def _save_checkpoint(self) -> None:
+        # Запись через временный файл: оборванная запись не портит чекпоинт
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(asdict(self.result), file)
+        os.replace(temp_path, self.checkpoint_path)
 
-from project.apps.core.services.user_start_service import UserService
-from project.apps.expenses.services.expense_service import ExpenseService
-from project.apps.expenses.models import Expense
 
+def bot_id_from_token(token: str | None) -> int | None:
+    """id бота — часть токена до двоеточия."""
+    bot_id, _, _ = (token or "").partition(":")
+    return int(bot_id) if bot_id.isdigit() else None
 
-class Command(BaseCommand):
-    help = "Пересчитать чат: добавить расходы из сообщений, которые не были сохранены"
 
-    def add_arguments(self, parser):
-        parser.add_argument("chat_id", type=int, help="ID чата для пересчёта")
-        parser.add_argument("--limit", type=int, default=1000, help="Сколько сообщений анализировать")
+def _parse_message(raw: dict, bot_ids: set[int]) -> _ParsedMessage | None:
+    """Сообщение экспорта → записи так же, как их разобрал бы хендлер; None —
+    служебное, от бота из bot_ids или через inline-бота, команда, быстрый
+    ввод или без сумм."""
+    from_id = raw.get("from_id") or ""
+    if raw.get("type") != "message" or raw.get("via_bot") or not from_id.startswith(_USER_ID_PREFIX):
+        return None
+    text = _message_text(raw.get("text"))
+    if not text or text.startswith("/") or parse_pure_amount(text) is not None:
+        return None
 
-    def handle(self, *args, **options):
-        chat_id = options["chat_id"]
-        limit = options["limit"]
-        asyncio.run(recalculate_chat(chat_id, limit))
+    is_income = IncomeParser.is_income_message(text)
+    items = IncomeParser.parse(text) if is_income else ExpenseParser.parse(text)
+    if not items:
+        return None
+    try:
+        tg_id = int(from_id[len(_USER_ID_PREFIX):])
+    except ValueError:
+        return None
+    if tg_id in bot_ids:
+        return None
+    return _ParsedMessage(
+        message_id=raw["id"],
+        tg_id=tg_id,
+        author=raw.get("from") or "",
+        sent_at=_message_date(raw),
+        text=text,
+        is_income=is_income,
+        items=items,
+    )
 
 
-async def recalculate_chat(chat_id: int, limit: int):
-    bot = Bot(token=settings.BOT_TOKEN, parse_mode="HTML")
+def _message_text(text) -> str:
+    # Текст с разметкой экспортируется списком строк и объектов {"type", "text"}
+    if isinstance(text, list):
+        return "".join(part if isinstance(part, str) else part.get("text", "") for part in text)
+    return text or ""
 
-    print(f"🔄 Пересчитываем чат {chat_id} (limit={limit})...")
 
-    async for message in bot.get_chat_history(chat_id=chat_id, limit=limit):
-        if not message.text:
-            continue
+def _message_date(raw: dict) -> datetime:
+    if raw.get("date_unixtime"):
+        return datetime.fromtimestamp(int(raw["date_unixtime"]), tz=dt_timezone.utc)
+    # Старые экспорты: только локальное время машины, с которой выгружали
+    return timezone.make_aware(datetime.fromisoformat(raw["date"]))
 
-        exists = await Expense.objects.filter(
-            Q(chat_id=chat_id) | Q(add_attr__chat_id=chat_id),
-            add_attr__message_id=message.message_id,
-        ).aexists()
-        if exists:
-            continue
 
-        user, _ = await UserService.get_or_create_from_aiogram(message.from_user)
+def _iter_export_messages(path: str) -> Iterator[dict]:
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8-sig") as file:
+        buffer = ""
+        while True:
+            match = _MESSAGES_RE.search(buffer)
+            if match:
+                buffer = buffer[match.end():]
+                break
+            chunk = file.read(_READ_SIZE)
+            if not chunk:
+                raise ChatExportError("В файле нет массива messages — нужен экспорт чата в JSON")
+            # Хвост оставляем: ключ мог разрезаться на границе чтения
+            buffer = buffer[-32:] + chunk
 
-        expense = await ExpenseService.create_from_message(user, message)
-        if expense:
-            print(f"✅ Добавлен {expense.amount} ₽ на {expense.category} (msg {message.message_id})")
-        else:
-            print(f"⚠️ Пропущено сообщение {message.message_id}: {message.text[:30]}")
+        position = 0
+        eof = False
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) and buffer[position] == "]":
+                return
+            try:
+                message, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ChatExportError("Экспорт чата обрывается посреди массива messages")
+                chunk = file.read(_READ_SIZE)
+                eof = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            position = end
+            yield message
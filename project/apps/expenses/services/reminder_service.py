@@ -1,78 +1,99 @@
 import calendar
 import logging
-from datetime import date
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import AsyncIterator
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from asgiref.sync import sync_to_async
+from django.db.models import Q
 
+from project.apps.core.models import User
 from project.apps.expenses.models import IncomeSchedule, PlannedExpense
 
 
 logger = logging.getLogger(__name__)
 
+_CHUNK_SIZE = 2000
+
+# Локальное время, в которое пользователь получает дайджест напоминаний
+REMINDER_LOCAL_TIME = time(7, 0)
+
+
+@dataclass
+class ReminderDigest:
+    """Все напоминания одного пользователя за день — одно сообщение."""
+
+    tg_id: int
+    day: date
+    lines: list[str] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return "\n\n".join(self.lines)
+
 
 class ReminderService:
     """Сервис проверки расписаний доходов и предстоящих плановых трат.
-    Предназначен для ежедневного запуска (через aiogram scheduler или cron)."""
+    «Сегодня» для каждого пользователя — дата в его часовом поясе (User.timezone)."""
 
     @staticmethod
-    @sync_to_async
-    def get_todays_income_reminders() -> list[IncomeSchedule]:
-        """Возвращает расписания, у которых сегодня день начисления."""
-        today = date.today()
-        day = today.day
+    def todays_income_schedules_filter(today: date) -> Q:
+        """Условие «сегодня день начисления» с учётом конца месяца:
+        min(day_of_month, последний день) == today.day.
 
-        # Обработка «31-е число в месяце с 30 днями» и т.д.
+        Записано без вычислений над колонкой, чтобы работал индекс по
+        day_of_month: в обычный день — точное равенство, в последний
+        день месяца — day_of_month >= today.day (31-е в 30-дневном месяце)."""
         last_day_of_month = calendar.monthrange(today.year, today.month)[1]
-
-        schedules = list(
+        if today.day == last_day_of_month:
+            return Q(day_of_month__gte=today.day)
+        return Q(day_of_month=today.day)
+
+    @classmethod
+    async def iter_todays_income_reminders(
+        cls,
+        today: date,
+        timezones: list[str],
+    ) -> AsyncIterator[IncomeSchedule]:
+        """Отдаёт расписания пользователей из timezones, у которых
+        в день today (их локальная дата) день начисления, по порядку user_id.
+        Читает БД порциями по _CHUNK_SIZE строк (серверный курсор)."""
+        queryset = (
             IncomeSchedule.objects.filter(
+                cls.todays_income_schedules_filter(today),
                 is_active=True,
                 deleted_at__isnull=True,
+                user__timezone__in=timezones,
             )
             .select_related("user")
+            .order_by("user_id", "id")
         )
-
-        result = []
-        for schedule in schedules:
-            trigger_day = min(schedule.day_of_month, last_day_of_month)
-            if trigger_day == day:
-                result.append(schedule)
-
-        return result
+        async for schedule in queryset.aiterator(chunk_size=_CHUNK_SIZE):
+            yield schedule
 
     @staticmethod
-    @sync_to_async
-    def get_todays_planned_expense_reminders() -> list[PlannedExpense]:
-        """Возвращает плановые траты, запланированные на сегодня."""
-        today = date.today()
-        return list(
-            PlannedExpense.objects.filter(
-                planned_date=today,
-                is_completed=False,
-                deleted_at__isnull=True,
-            )
-            .select_related("user", "category")
-        )
-
-    @staticmethod
-    @sync_to_async
-    def get_upcoming_planned_expenses(days_ahead: int = 3) -> list[PlannedExpense]:
-        """Возвращает плановые траты в ближайшие N дней."""
-        from datetime import timedelta
-
-        today = date.today()
+    async def iter_upcoming_planned_expenses(
+        today: date,
+        timezones: list[str],
+        days_ahead: int = 3,
+    ) -> AsyncIterator[PlannedExpense]:
+        """Отдаёт плановые траты пользователей из timezones на today и
+        ближайшие N дней, по порядку user_id, внутри — по дате.
+        Читает БД порциями по _CHUNK_SIZE строк (серверный курсор)."""
         end_date = today + timedelta(days=days_ahead)
-
-        return list(
+        queryset = (
             PlannedExpense.objects.filter(
                 planned_date__gte=today,
                 planned_date__lte=end_date,
                 is_completed=False,
                 deleted_at__isnull=True,
+                user__timezone__in=timezones,
             )
             .select_related("user", "category")
-            .order_by("planned_date")
+            .order_by("user_id", "planned_date", "id")
         )
+        async for planned in queryset.aiterator(chunk_size=_CHUNK_SIZE):
+            yield planned
 
     @staticmethod
     def format_income_reminder(schedule: IncomeSchedule) -> str:
@@ -89,3 +110,73 @@ class ReminderService:
             f"📋 Плановая трата на сегодня: <b>{planned.description}</b> "
             f"— {planned.amount:.0f} ₽{category_text}"
         )
+
+    @staticmethod
+    def format_upcoming_planned_expense_reminder(planned: PlannedExpense, today: date) -> str:
+        days_left = (planned.planned_date - today).days
+        return (
+            f"📅 Через {days_left} дн.: <b>{planned.description}</b> "
+            f"— {planned.amount:.0f} ₽"
+        )
+
+    @staticmethod
+    async def due_timezones(window_start: datetime, now: datetime) -> dict[date, list[str]]:
+        """Часовые пояса пользователей, в которых локальное REMINDER_LOCAL_TIME
+        наступило в интервале (window_start, now], сгруппированные по
+        локальной дате, за которую нужно отправить напоминания."""
+        result: dict[date, list[str]] = {}
+        async for tz_name in User.objects.values_list("timezone", flat=True).distinct():
+            try:
+                tz = ZoneInfo(tz_name)
+            except (ZoneInfoNotFoundError, ValueError):
+                logger.warning("Неизвестный часовой пояс пользователя: %s", tz_name)
+                continue
+            local_now = now.astimezone(tz)
+            # Последнее наступившее локальное REMINDER_LOCAL_TIME — сегодня или вчера
+            local_day = local_now.date()
+            if local_now.time() < REMINDER_LOCAL_TIME:
+                local_day -= timedelta(days=1)
+            trigger_at = datetime.combine(local_day, REMINDER_LOCAL_TIME, tzinfo=tz)
+            if window_start < trigger_at <= now:
+                result.setdefault(local_day, []).append(tz_name)
+        return result
+
+    @classmethod
+    async def iter_daily_digests(
+        cls,
+        today: date,
+        timezones: list[str],
+        days_ahead: int = 3,
+    ) -> AsyncIterator[ReminderDigest]:
+        """Отдаёт по одному готовому дайджесту на пользователя из timezones
+        за локальную дату today: доходы, плановые траты на сегодня, затем
+        предстоящие.
+
+        Оба потока (расписания доходов и плановые траты) отсортированы по
+        user_id и сливаются на лету, поэтому в памяти — строки одного
+        пользователя и порции курсоров, а не все расписания."""
+        incomes = aiter(cls.iter_todays_income_reminders(today, timezones))
+        planned_expenses = aiter(cls.iter_upcoming_planned_expenses(today, timezones, days_ahead=days_ahead))
+        schedule = await anext(incomes, None)
+        planned = await anext(planned_expenses, None)
+
+        while schedule is not None or planned is not None:
+            user = min(
+                (item.user for item in (schedule, planned) if item is not None),
+                key=lambda candidate: candidate.id,
+            )
+            digest = ReminderDigest(tg_id=user.tg_id, day=today)
+            while schedule is not None and schedule.user_id == user.id:
+                digest.lines.append(cls.format_income_reminder(schedule))
+                schedule = await anext(incomes, None)
+
+            # Плановые траты на сегодня входят и в «предстоящие» — берём один запрос
+            upcoming = []
+            while planned is not None and planned.user_id == user.id:
+                if planned.planned_date == today:
+                    digest.lines.append(cls.format_planned_expense_reminder(planned))
+                else:
+                    upcoming.append(cls.format_upcoming_planned_expense_reminder(planned, today))
+                planned = await anext(planned_expenses, None)
+            digest.lines += upcoming
+            yield digest
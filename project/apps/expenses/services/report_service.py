@@ -1,3 +1,4 @@
+from dataclasses import dataclass, field
 from datetime import date, datetime
 from decimal import Decimal
 
@@ -5,7 +6,27 @@ from asgiref.sync import sync_to_async
 from django.db.models import Q, Sum
 from django.db.models.functions import Abs
 
-from project.apps.expenses.models import Expense, Income
+from project.apps.expenses.models import DailyCategoryTotal, Expense
+from project.apps.expenses.services.daily_totals_service import DailyTotalsService
+from project.apps.expenses.services.period_filter import in_period
+
+
+@dataclass(frozen=True)
+class PeriodSnapshot:
+    """Срез расходов и доходов пользователя за период.
+    Итоги считаются из строк по категориям, без повторной агрегации в SQL."""
+    date_from: date
+    date_to: date
+    expense_summary: list[tuple[str, Decimal]] = field(default_factory=list)
+    income_summary: list[tuple[str, Decimal]] = field(default_factory=list)
+
+    @property
+    def expense_total(self) -> Decimal:
+        return sum((amount for _, amount in self.expense_summary), Decimal("0.00"))
+
+    @property
+    def income_total(self) -> Decimal:
+        return sum((amount for _, amount in self.income_summary), Decimal("0.00"))
 
 
 class ReportService:
@@ -69,10 +90,9 @@ class ReportService:
     ) -> list[Expense]:
         return list(
             Expense.objects.filter(
+                in_period(date_from, date_to),
                 user_id=user_id,
                 deleted_at__isnull=True,
-                created_at__date__gte=date_from,
-                created_at__date__lte=date_to,
             )
             .select_related("category")
             .order_by("created_at")
@@ -85,13 +105,7 @@ class ReportService:
         date_from: date,
         date_to: date,
     ) -> Decimal:
-        result = Expense.objects.filter(
-            user_id=user_id,
-            deleted_at__isnull=True,
-            created_at__date__gte=date_from,
-            created_at__date__lte=date_to,
-        ).aggregate(total=Sum(Abs("amount")))
-        return result["total"] or Decimal("0.00")
+        return DailyTotalsService.total_sync(user_id, DailyCategoryTotal.KIND_EXPENSE, date_from, date_to)
 
     @staticmethod
     @sync_to_async
@@ -100,21 +114,9 @@ class ReportService:
         date_from: date,
         date_to: date,
     ) -> list[tuple[str, Decimal]]:
-        queryset = (
-            Expense.objects.filter(
-                user_id=user_id,
-                deleted_at__isnull=True,
-                created_at__date__gte=date_from,
-                created_at__date__lte=date_to,
-            )
-            .values("category__name")
-            .annotate(total=Sum(Abs("amount")))
-            .order_by("-total")
+        return DailyTotalsService.category_summary_sync(
+            user_id, DailyCategoryTotal.KIND_EXPENSE, date_from, date_to,
         )
-        return [
-            (row["category__name"] or "Без категории", row["total"])
-            for row in queryset
-        ]
 
     # ─── Доходы ────────────────────────────────────────────────
 
@@ -125,13 +127,7 @@ class ReportService:
         date_from: date,
         date_to: date,
     ) -> Decimal:
-        result = Income.objects.filter(
-            user_id=user_id,
-            deleted_at__isnull=True,
-            created_at__date__gte=date_from,
-            created_at__date__lte=date_to,
-        ).aggregate(total=Sum("amount"))
-        return result["total"] or Decimal("0.00")
+        return DailyTotalsService.total_sync(user_id, DailyCategoryTotal.KIND_INCOME, date_from, date_to)
 
     @staticmethod
     @sync_to_async
@@ -140,21 +136,42 @@ class ReportService:
         date_from: date,
         date_to: date,
     ) -> list[tuple[str, Decimal]]:
-        queryset = (
-            Income.objects.filter(
-                user_id=user_id,
-                deleted_at__isnull=True,
-                created_at__date__gte=date_from,
-                created_at__date__lte=date_to,
+        return DailyTotalsService.category_summary_sync(
+            user_id, DailyCategoryTotal.KIND_INCOME, date_from, date_to,
+        )
+
+    # ─── Полный срез за период ────────────────────────────────
+
+    @staticmethod
+    @sync_to_async
+    def get_period_snapshot(
+        user_id: int,
+        date_from: date,
+        date_to: date,
+        include_expenses: bool = True,
+        include_incomes: bool = True,
+    ) -> PeriodSnapshot:
+        """Возвращает расходы и доходы по категориям за период.
+        Читает дневные агрегаты: не более двух сгруппированных запросов
+        и один переход в sync-поток."""
+        expense_summary = []
+        if include_expenses:
+            expense_summary = DailyTotalsService.category_summary_sync(
+                user_id, DailyCategoryTotal.KIND_EXPENSE, date_from, date_to,
             )
-            .values("category__name")
-            .annotate(total=Sum("amount"))
-            .order_by("-total")
+
+        income_summary = []
+        if include_incomes:
+            income_summary = DailyTotalsService.category_summary_sync(
+                user_id, DailyCategoryTotal.KIND_INCOME, date_from, date_to,
+            )
+
+        return PeriodSnapshot(
+            date_from=date_from,
+            date_to=date_to,
+            expense_summary=expense_summary,
+            income_summary=income_summary,
         )
-        return [
-            (row["category__name"] or "Без категории", row["total"])
-            for row in queryset
-        ]
 
     # ─── Форматирование отчётов ───────────────────────────────
 
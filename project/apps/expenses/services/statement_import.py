@@ -0,0 +1,324 @@
+"""Импорт банковской выписки из CSV.
+
+Стратегия:
+1. Файл читается потоково: кодировка (UTF-8 или cp1251) и разделитель
+   определяются по началу файла, строки разбираются пачками по
+   IMPORT_CHUNK_SIZE — в памяти одна пачка, а не вся выписка.
+2. Колонки находятся по заголовку (дата, сумма, описание, категория,
+   статус) — подходят выгрузки основных банков. Отрицательная сумма —
+   расход, положительная — доход; неуспешные операции пропускаются.
+3. Дубликаты отсекаются по хешу содержимого (дата, сумма, описание и
+   номер повтора такой же операции в файле): хеши уже импортированных
+   записей пользователя загружаются одним запросом, повторный импорт
+   той же или пересекающейся выписки ничего не задваивает. Пачка пишется
+   под advisory-блокировкой пользователя (pg_advisory_xact_lock), и её
+   хеши перепроверяются в БД: одновременные импорты тоже не задваивают.
+4. Категории разрешаются CategoryService.match_many по уникальным текстам
+   пачки; результат кешируется на весь импорт. Алиасы из описаний
+   операций не сохраняются (persist_aliases=False).
+5. Расходы и доходы пачки вставляются bulk_create_backdated (дата
+   операции, а не импорта) в одной транзакции с дневными агрегатами;
+   хеши пачки считаются загруженными после коммита. После пачки вызывается
+   progress(строк обработано, доля файла).
+
+Работает синхронно: из бота — в отдельном потоке через
+sync_to_async(thread_sensitive=False), из management-команды — напрямую.
+"""
+
+import csv
+import hashlib
+import io
+import logging
+import os
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, tzinfo
+from decimal import Decimal
+from typing import Callable, Iterator
+
+from asgiref.sync import async_to_sync
+from django.db import connection, transaction
+from django.utils import timezone
+
+from project.apps.core.models import User
+from project.apps.expenses.models import Expense, Income
+from project.apps.expenses.services.backdated_insert import bulk_create_backdated
+from project.apps.expenses.services.category_predictor import UserCategoryPredictor
+from project.apps.expenses.services.category_service import CategoryMatchResult, CategoryService
+from project.apps.expenses.services.export_service import user_timezone
+from project.apps.expenses.services.tokenizer import normalize_number
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = 5_000
+
+_SNIFF_BYTES = 64 * 1024
+
+# Заголовки колонок в выгрузках банков, в нижнем регистре
+_DATE_COLUMNS = ("дата операции", "дата платежа", "дата", "date", "transaction date")
+_AMOUNT_COLUMNS = ("сумма операции", "сумма платежа", "сумма", "amount")
+_DESCRIPTION_COLUMNS = ("описание", "назначение платежа", "назначение", "контрагент", "description", "merchant")
+_CATEGORY_COLUMNS = ("категория", "category")
+_STATUS_COLUMNS = ("статус", "status")
+
+_FAILED_STATUSES = {"failed", "отклонена", "отклонено", "ошибка"}
+
+_DATE_FORMATS = (
+    "%d.%m.%Y %H:%M:%S",
+    "%d.%m.%Y %H:%M",
+    "%d.%m.%Y",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+)
+
+# Ограничение Expense.amount / Income.amount: max_digits=10, decimal_places=2
+_MAX_AMOUNT = Decimal("1e8")
+
+Progress = Callable[[int, float], None]
+
+
+class StatementFormatError(ValueError):
+    """Файл не похож на выписку: не найдены колонки даты и суммы."""
+
+
+@dataclass
+class ImportResult:
+    expenses: int = 0
+    incomes: int = 0
+    duplicates: int = 0
+    skipped: int = 0
+
+    @property
+    def rows(self) -> int:
+        return self.expenses + self.incomes + self.duplicates + self.skipped
+
+
+@dataclass
+class _StatementRow:
+    occurred_at: datetime
+    amount: Decimal
+    text: str
+    import_hash: str
+
+
+@dataclass
+class _Columns:
+    date: int
+    amount: int
+    description: int | None
+    category: int | None
+    status: int | None
+
+    @classmethod
+    def from_header(cls, header: list[str]) -> "_Columns":
+        names = [name.strip().lower() for name in header]
+
+        def find(candidates: tuple[str, ...]) -> int | None:
+            for candidate in candidates:
+                if candidate in names:
+                    return names.index(candidate)
+            return None
+
+        date_column = find(_DATE_COLUMNS)
+        amount_column = find(_AMOUNT_COLUMNS)
+        if date_column is None or amount_column is None:
+            raise StatementFormatError(f"Не найдены колонки даты и суммы в заголовке: {header}")
+        return cls(
+            date=date_column,
+            amount=amount_column,
+            description=find(_DESCRIPTION_COLUMNS),
+            category=find(_CATEGORY_COLUMNS),
+            status=find(_STATUS_COLUMNS),
+        )
+
+
+class StatementImporter:
+    """Импорт одной выписки одного пользователя."""
+
+    def __init__(self, user: User, chat_id: int | None = None, progress: Progress | None = None) -> None:
+        self.user = user
+        self.chat_id = chat_id
+        self.progress = progress
+        self.tz: tzinfo = user_timezone(user)
+        self.result = ImportResult()
+        self._matches: dict[str, CategoryMatchResult] = {}
+        self._occurrences: Counter = Counter()
+        self._date_format: str | None = None
+        self._known_hashes: set[str] = set()
+
+    def run(self, path: str) -> ImportResult:
+        self._known_hashes = self._load_known_hashes()
+        size = os.path.getsize(path) or 1
+        with open(path, "rb") as raw:
+            text = io.TextIOWrapper(raw, encoding=_detect_encoding(raw), newline="")
+            reader = csv.reader(text, dialect=_detect_dialect(text))
+            header = next(reader, None)
+            if header is None:
+                raise StatementFormatError("Пустой файл")
+            columns = _Columns.from_header(header)
+
+            for chunk in _chunks(reader, IMPORT_CHUNK_SIZE):
+                rows = [self._parse(cells, columns) for cells in chunk]
+                self._import_chunk([row for row in rows if row is not None])
+                if self.progress is not None:
+                    self.progress(self.result.rows, min(raw.tell() / size, 1.0))
+
+        # Таблица предсказаний пользователя перечитается с импортированными записями
+        UserCategoryPredictor.invalidate(self.user.id)
+        logger.info("Statement import for user %s: %s", self.user.id, self.result)
+        return self.result
+
+    # ─── Разбор ────────────────────────────────────────────────
+
+    def _parse(self, cells: list[str], columns: _Columns) -> _StatementRow | None:
+        try:
+            if columns.status is not None and cells[columns.status].strip().lower() in _FAILED_STATUSES:
+                self.result.skipped += 1
+                return None
+            occurred_at = self._parse_date(cells[columns.date])
+            amount = _parse_amount(cells[columns.amount])
+            description = cells[columns.description].strip() if columns.description is not None else ""
+            category = cells[columns.category].strip() if columns.category is not None else ""
+        except IndexError:
+            occurred_at = amount = None
+        if occurred_at is None or not amount or abs(amount) >= _MAX_AMOUNT:
+            self.result.skipped += 1
+            return None
+
+        content = f"{occurred_at.isoformat()}|{amount}|{description.lower()}"
+        # Одинаковые операции в один день (два кофе по 200) различаются номером повтора
+        self._occurrences[content] += 1
+        import_hash = hashlib.sha1(f"{content}|{self._occurrences[content]}".encode()).hexdigest()
+        return _StatementRow(
+            occurred_at=occurred_at,
+            amount=amount,
+            text=category or description or "Без категории",
+            import_hash=import_hash,
+        )
+
+    def _parse_date(self, raw: str) -> datetime | None:
+        raw = raw.strip()
+        formats = (self._date_format, *_DATE_FORMATS) if self._date_format else _DATE_FORMATS
+        for date_format in formats:
+            try:
+                parsed = datetime.strptime(raw, date_format)
+            except ValueError:
+                continue
+            self._date_format = date_format
+            return timezone.make_aware(parsed, self.tz)
+        return None
+
+    # ─── Запись ────────────────────────────────────────────────
+
+    def _load_known_hashes(self) -> set[str]:
+        known = set()
+        for model in (Expense, Income):
+            known.update(
+                model.objects.filter(
+                    user=self.user,
+                    add_attr__has_key="import_hash",
+                ).values_list("add_attr__import_hash", flat=True)
+            )
+        return known
+
+    def _import_chunk(self, rows: list[_StatementRow]) -> None:
+        fresh = [row for row in rows if row.import_hash not in self._known_hashes]
+        self.result.duplicates += len(rows) - len(fresh)
+        if not fresh:
+            return
+
+        unknown = list(dict.fromkeys(row.text for row in fresh if row.text not in self._matches))
+        if unknown:
+            matches = async_to_sync(CategoryService.match_many)(
+                unknown,
+                user_id=self.user.id,
+                persist_aliases=False,
+            )
+            self._matches.update(matches)
+
+        with transaction.atomic():
+            # Два импорта одного пользователя одновременно (двойная отправка
+            # файла, пересекающиеся выписки) видели одно и то же множество
+            # хешей: пачки пишутся по очереди, и хеши перепроверяются в БД
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", [self.user.id])
+            hashes = [row.import_hash for row in fresh]
+            stored = set()
+            for model in (Expense, Income):
+                stored.update(
+                    model.objects.filter(user=self.user, add_attr__import_hash__in=hashes)
+                    .values_list("add_attr__import_hash", flat=True)
+                )
+            expenses, incomes = self._build_records([row for row in fresh if row.import_hash not in stored])
+            bulk_create_backdated(Expense, expenses)
+            bulk_create_backdated(Income, incomes)
+        # Хеши — только после коммита: пачка, откатившаяся с ошибкой, не числится загруженной
+        self._known_hashes.update(hashes)
+        self.result.duplicates += len(stored)
+        self.result.expenses += len(expenses)
+        self.result.incomes += len(incomes)
+
+    def _build_records(self, rows: list[_StatementRow]) -> tuple[list[Expense], list[Income]]:
+        expenses, incomes = [], []
+        for row in rows:
+            match = self._matches[row.text]
+            add_attr = {"source": "statement", "import_hash": row.import_hash, **match.record_attrs()}
+            common = {
+                "user": self.user,
+                "amount": abs(row.amount),
+                "category": match.category,
+                "chat_id": self.chat_id,
+                "created_at": row.occurred_at,
+            }
+            if row.amount < 0:
+                expenses.append(Expense(add_attr={**add_attr, "category_text": row.text}, **common))
+            else:
+                incomes.append(Income(description=row.text[:255], add_attr=add_attr, **common))
+        return expenses, incomes
+
+
+def _parse_amount(raw: str) -> Decimal | None:
+    # «−1 234,50 ₽», «-1234.50», «+500»
+    cleaned = raw.strip().replace("−", "-").replace("₽", "").replace("RUB", "").strip()
+    negative = cleaned.startswith("-")
+    number = normalize_number(cleaned.lstrip("+-"))
+    if number is None or not number.is_finite():
+        return None
+    number = number.quantize(Decimal("0.01"))
+    return -number if negative else number
+
+
+def _detect_encoding(raw) -> str:
+    sample = raw.read(_SNIFF_BYTES)
+    raw.seek(0)
+    try:
+        # Обрезанный на границе символа хвост не считается ошибкой
+        sample.decode("utf-8-sig")
+    except UnicodeDecodeError as error:
+        if error.start < len(sample) - 3:
+            return "cp1251"
+    return "utf-8-sig"
+
+
+def _detect_dialect(text: io.TextIOWrapper) -> type[csv.Dialect]:
+    sample = text.read(_SNIFF_BYTES)
+    text.seek(0)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=";,\t")
+    except csv.Error:
+        return csv.excel
+
+
+def _chunks(reader, size: int) -> Iterator[list[list[str]]]:
+    chunk = []
+    for cells in reader:
+        if not any(cell.strip() for cell in cells):
+            continue
+        chunk.append(cells)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,225 @@
+"""Общий лексер сообщений с расходами и доходами.
+
+Сообщение разбивается на непустые строки, каждая строка разбирается
+одним проходом скомпилированного регулярного выражения на токены:
+- сумма с необязательным знаком и валютой;
+- ключевое слово-маркер дохода (доход, зарплата, ...).
+
+ExpenseParser, IncomeParser и распознавание «голого числа»
+(parse_pure_amount) работают поверх этого потока токенов. Результат кешируется по тексту:
+хендлер и сервисы разбирают одно и то же сообщение несколько раз
+(проверка на доход, затем parse), а лексится оно один раз.
+
+Набор ключевых слов — встроенный INCOME_KEYWORDS плюс слова из админки;
+его заменяет IncomeKeywordRegistry через set_income_keywords().
+"""
+
+import re
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Iterable, NamedTuple
+
+INCOME_KEYWORDS = (
+    "доход",
+    "зарплата",
+    "аванс",
+    "приход",
+    "получил",
+    "получила",
+    "заработал",
+    "заработала",
+    "перевод",
+    "премия",
+    "гонорар",
+    "возврат",
+    "кэшбэк",
+    "кешбэк",
+    "cashback",
+)
+
+_CURRENCY = r"₽|руб(?:\.|лей)?|rub|r"
+
+_TOKENIZE_CACHE_SIZE = 256
+
+
+def _keyword_pattern(keywords: Iterable[str]) -> str:
+    """Регулярка по префиксному дереву ключевых слов.
+
+    Вместо перечисления «доход|зарплата|заработал|...» общие префиксы
+    вынесены: «за(?:работал(?:а)?|рплата)». Движок регулярок проходит
+    дерево за один спуск с каждой позиции, и стоимость проверки почти не
+    зависит от числа слов (плоское перечисление пробует каждое слово
+    по очереди). Из нескольких слов с одной позиции выбирается самое
+    длинное: «получила», а не «получил»."""
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return _trie_pattern(trie)
+
+
+def _trie_pattern(node: dict) -> str:
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+    if "" in node:
+        pattern = f"(?:{pattern})?"
+    return pattern
+
+
+def _compile_token_re(keywords: tuple[str, ...]) -> re.Pattern:
+    # Строка лексится в нижнем регистре: регулярка без IGNORECASE заметно
+    # быстрее, а опережающая проверка первого символа отсекает позиции,
+    # с которых не может начаться ни сумма, ни ключевое слово.
+    token_start = "".join(re.escape(char) for char in sorted({keyword[0] for keyword in keywords}))
+    return re.compile(
+        rf"""
+        (?=[-+\s\d{token_start}])
+        (?:
+            (?P<sign>[+-]?)
+            \s*
+            (?P<num>\d[\d\s.,]*)
+            \s*
+            (?P<cur>(?:{_CURRENCY})?)
+        |
+            (?P<keyword>{_keyword_pattern(keywords)})
+        )
+        """,
+        re.VERBOSE,
+    )
+
+
+_TOKEN_RE = _compile_token_re(INCOME_KEYWORDS)
+
+
+def set_income_keywords(keywords: Iterable[str]) -> None:
+    """Заменяет набор ключевых слов дохода (встроенные + из админки).
+
+    Слова приводятся к нижнему регистру; пустые и начинающиеся не с
+    буквы пропускаются — с цифры или знака начинается сумма."""
+    global _TOKEN_RE
+    normalized = tuple(dict.fromkeys(
+        keyword.strip().lower() for keyword in keywords if keyword.strip()[:1].isalpha()
+    ))
+    _TOKEN_RE = _compile_token_re(normalized or INCOME_KEYWORDS)
+    tokenize.cache_clear()
+
+
+def normalize_number(raw: str) -> Decimal | None:
+    """Нормализация числовой строки в Decimal.
+
+    Пробелы (в том числе неразрывные) — разделители тысяч. Последняя
+    точка или запятая считается десятичным разделителем, только если
+    после неё 1–2 цифры; иначе все точки и запятые — разделители тысяч."""
+    cleaned = raw.strip().replace("\xa0", "").replace(" ", "")
+
+    sep_pos = max(cleaned.rfind("."), cleaned.rfind(","))
+    if sep_pos >= 0 and 1 <= len(cleaned) - sep_pos - 1 <= 2:
+        sep = cleaned[sep_pos]
+        other = "," if sep == "." else "."
+        cleaned = cleaned.replace(other, "").replace(sep, ".")
+    else:
+        cleaned = cleaned.replace(".", "").replace(",", "")
+
+    try:
+        return Decimal(cleaned)
+    except InvalidOperation:
+        return None
+
+
+class Line(NamedTuple):
+    """Непустая строка сообщения и её токены.
+
+    Токены — объекты re.Match по строке в нижнем регистре; позиции
+    совпадают с позициями в text. У суммы группы sign, num и cur
+    (start() учитывает знак и пробелы перед числом), у ключевого слова
+    совпадение целиком. Отдельные объекты токенов не создаются: на
+    коротких сообщениях это заметная доля времени разбора."""
+
+    text: str
+    amounts: tuple[re.Match, ...]
+    keywords: tuple[re.Match, ...]
+
+    def cut(self, start: int, end: int, drop_keywords: bool = False) -> str:
+        """Текст строки без фрагмента [start, end).
+
+        С drop_keywords убирает и ключевые слова дохода, стоящие в
+        получившемся тексте отдельными словами."""
+        text = self.text[:start] + self.text[end:]
+        if drop_keywords and self.keywords:
+            shift = end - start
+            kept = []
+            position = 0
+            for keyword in self.keywords:
+                kw_start = keyword.start() if keyword.end() <= start else keyword.start() - shift
+                kw_end = kw_start + len(keyword[0])
+                if _is_word_char(text, kw_start - 1) or _is_word_char(text, kw_end):
+                    continue
+                kept.append(text[position:kw_start])
+                position = kw_end
+            kept.append(text[position:])
+            text = "".join(kept)
+        return text.strip()
+
+
+class TokenizedMessage(NamedTuple):
+    lines: tuple[Line, ...]
+
+    @property
+    def starts_with_plus(self) -> bool:
+        """Сообщение начинается с «+сумма»."""
+        if not self.lines or not self.lines[0].amounts:
+            return False
+        first = self.lines[0].amounts[0]
+        return first.start() == 0 and first["sign"] == "+"
+
+    @property
+    def has_income_keyword(self) -> bool:
+        return any(line.keywords for line in self.lines)
+
+
+def _is_word_char(text: str, index: int) -> bool:
+    if index < 0 or index >= len(text):
+        return False
+    char = text[index]
+    return char.isalnum() or char == "_"
+
+
+@lru_cache(maxsize=_TOKENIZE_CACHE_SIZE)
+def tokenize(text: str | None) -> TokenizedMessage:
+    lines = []
+    for raw_line in (text or "").splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        amounts = []
+        keywords = []
+        lowered = line.lower()
+        if len(lowered) != len(line):
+            # Редкие символы (например, «İ») при lower() превращаются в два —
+            # позиции токенов должны совпадать с исходной строкой
+            lowered = "".join(char.lower() if len(char.lower()) == 1 else char for char in line)
+        for match in _TOKEN_RE.finditer(lowered):
+            if match.lastgroup == "keyword":
+                keywords.append(match)
+            else:
+                amounts.append(match)
+        lines.append(Line(line, tuple(amounts), tuple(keywords)))
+    return TokenizedMessage(tuple(lines))
+
+
+def parse_pure_amount(text: str | None) -> Decimal | None:
+    """Сумма, если сообщение — одиночное положительное число без категории
+    (в боте с него начинается быстрый ввод), иначе None."""
+    lines = tokenize(text).lines
+    if len(lines) != 1 or len(lines[0].amounts) != 1:
+        return None
+    line = lines[0]
+    token = line.amounts[0]
+    if token["sign"] or token.start() != 0 or token.end() != len(line.text):
+        return None
+    amount = normalize_number(token["num"])
+    return amount if amount is not None and amount > 0 else None
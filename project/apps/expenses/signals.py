@@ -0,0 +1,15 @@
+"""Сигналы приложения expenses (подключаются в ExpensesConfig.ready)."""
+
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from project.apps.expenses.models import Category
+from project.apps.expenses.services.daily_totals_service import DailyTotalsService
+
+
+@receiver(pre_delete, sender=Category, dispatch_uid="expenses_detach_category_totals")
+def detach_category_totals(sender, instance: Category, **kwargs) -> None:
+    """Записи категории остаются с category=NULL (SET_NULL), поэтому их
+    дневные агрегаты переносятся в «без категории» — при удалении из
+    сервиса, админки или shell одинаково."""
+    DailyTotalsService.detach_category_sync(instance)
@@ -106,4 +106,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 STATIC_ROOT = BASE_DIR / "static"
 
 MEDIA_URL = "/media/"
-MEDIA_ROOT = BASE_DIR / "media"
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / "media"
+
+# Нечёткий поиск категорий с опечаткой: memory | pg_trgm | off
+CATEGORY_FUZZY_BACKEND = os.getenv("CATEGORY_FUZZY_BACKEND", "memory")